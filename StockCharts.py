@@ -8,20 +8,41 @@ Features comprehensive technical analysis tools and real-time data.
 
 import sys
 import os
+import argparse
+import multiprocessing
 import webbrowser
 import logging
+import re
+import time
 from pathlib import Path
 
 # Dash and Plotly imports
 import dash
-from dash import dcc, html, Input, Output, State
+import flask
+from dash import dcc, html, Input, Output, State, Patch, ClientsideFunction
+from dash.exceptions import PreventUpdate
 import pandas as pd
 
 # Local imports
-from config import COLORS, DEFAULTS, APP_CONFIG
+from config import (
+    COLORS, DEFAULTS, APP_CONFIG, CHART_CONFIG, WATCHLIST, DATA_PROVIDER,
+    REFRESH_CONFIG, METRICS_CONFIG, INTERVALS, SHARED_CACHE, TIME_RANGES,
+    COMPARISON_CONFIG
+)
+from utils.comparison import ComparisonPanels, performance
 from utils.data_fetcher import StockDataFetcher
-from utils.time_utils import get_date_range_from_data
+from utils.indicators import indicator_cache
+from utils.providers import create_provider
+from utils.metrics import (
+    PAYLOAD_BYTES, REGISTRY, STAGE_SECONDS, RequestProfiler, instrumented,
+    stage_timer
+)
+from utils.prewarm import WatchlistWarmer
+from utils.refresh import RefreshScheduler
+from utils.time_utils import slice_time_range
+from components.batch_render import FORMATS, BatchRenderer, write_report
 from components.chart_builder import ChartBuilder
+from components.indicator_registry import get_indicator_specs
 from components.ui_components import UIComponents
 
 # Configure logging
@@ -46,12 +67,21 @@ def resource_path(relative_path):
 class StockChartsApp:
     """Main application class for StockCharts Pro."""
 
-    def __init__(self):
-        self.data_fetcher = StockDataFetcher()
-        self.chart_builder = ChartBuilder()
+    def __init__(self, provider=None, shared_cache=None):
+        self.data_fetcher = StockDataFetcher(
+            provider=provider, shared_cache=shared_cache)
+        # Client-side mode charts the full history with its own point budget
+        self.clientside_ranges = CHART_CONFIG['clientside_time_range']
+        self.comparison_panels = ComparisonPanels(
+            self.data_fetcher, COMPARISON_CONFIG['cache_max_bytes'])
+        self.chart_builder = ChartBuilder(
+            {'max_points': CHART_CONFIG['clientside_max_points']}
+            if self.clientside_ranges else None)
         self.ui_components = UIComponents()
         self.app = self._create_app()
         self._setup_callbacks()
+        if METRICS_CONFIG['enabled']:
+            self._setup_metrics()
 
     def _create_app(self):
         """Create and configure the Dash application."""
@@ -79,100 +109,418 @@ class StockChartsApp:
     def _setup_callbacks(self):
         """Setup all Dash callbacks."""
 
+        chart_outputs = [Output('main-chart', 'figure'),
+                         Output('error-display', 'children'),
+                         Output('error-display', 'className'),
+                         Output('loading-output', 'children'),
+                         Output('chart-meta', 'data'),
+                         Output('chart-state', 'data'),
+                         Output('range-data', 'data')]
+        patch_outputs = [Output(output.component_id, output.component_property,
+                                allow_duplicate=True)
+                         for output in chart_outputs]
+
         @self.app.callback(
-            [Output('main-chart', 'figure'),
-             Output('error-display', 'children'),
-             Output('error-display', 'className'),
-             Output('loading-output', 'children')],
+            chart_outputs,
             [Input('stock-symbol', 'value'),
-             Input('time-range', 'value'),
-             Input('indicators', 'value')]
+             Input('interval', 'value'),
+             Input('compare-symbols', 'value')],
+            [State('time-range', 'value'),
+             State('indicators', 'value')]
         )
-        def update_chart(stock_symbol, time_range, selected_indicators):
-            """Update the main chart based on user inputs."""
-            try:
-                # Validate inputs
-                if not stock_symbol or not stock_symbol.strip():
-                    return self._create_empty_chart(), "", "error-message", ""
+        @instrumented('update_chart')
+        def update_chart(stock_symbol, interval, compare, time_range,
+                         selected_indicators):
+            """Render the full chart when the symbol, interval or comparison changes."""
+            return self._render_chart(stock_symbol, time_range, selected_indicators,
+                                      interval, compare)
+
+        if self.clientside_ranges:
+            # Range switches only change axis ranges, in the browser
+            self.app.clientside_callback(
+                ClientsideFunction(namespace='stockcharts',
+                                   function_name='setTimeRange'),
+                Output('main-chart', 'figure', allow_duplicate=True),
+                Input('time-range', 'value'),
+                [State('range-data', 'data'),
+                 State('main-chart', 'figure')],
+                prevent_initial_call=True
+            )
+
+            @self.app.callback(
+                patch_outputs,
+                Input('time-range', 'value'),
+                [State('stock-symbol', 'value'),
+                 State('indicators', 'value'),
+                 State('interval', 'value'),
+                 State('compare-symbols', 'value')],
+                prevent_initial_call=True
+            )
+            @instrumented('update_comparison_range')
+            def update_comparison_range(time_range, stock_symbol, selected_indicators,
+                                        interval, compare):
+                """Re-measure a comparison from the new range's start on the server."""
+                if not self._compare_symbols(compare, stock_symbol):
+                    raise PreventUpdate
+                return self._render_chart(stock_symbol, time_range, selected_indicators,
+                                          interval, compare)
+        else:
+            @self.app.callback(
+                patch_outputs,
+                Input('time-range', 'value'),
+                [State('stock-symbol', 'value'),
+                 State('indicators', 'value'),
+                 State('interval', 'value'),
+                 State('compare-symbols', 'value'),
+                 State('chart-state', 'data')],
+                prevent_initial_call=True
+            )
+            @instrumented('update_time_range')
+            def update_time_range(time_range, stock_symbol, selected_indicators,
+                                  interval, compare, chart_state):
+                """Send only the new data arrays and axis ranges."""
+                # Comparisons are re-measured from the range's start
+                if (self._compare_symbols(compare, stock_symbol)
+                        or not self._can_patch(chart_state, stock_symbol, interval)):
+                    return self._render_chart(
+                        stock_symbol, time_range, selected_indicators, interval,
+                        compare)
+
+                try:
+                    symbol = chart_state['symbol']
+                    time_range = time_range or DEFAULTS['time_range']
+                    hist_data = self.data_fetcher.get_stock_history(
+                        symbol, chart_state['interval'])
+                    filtered_data, error_msg = self._filter_time_range(
+                        hist_data, time_range)
+                    if error_msg:
+                        return self._error_outputs(error_msg)
+
+                    indicators = chart_state['indicators']
+                    patch = Patch()
+                    self.chart_builder.patch_time_range(
+                        patch, hist_data, filtered_data, symbol, indicators)
+
+                    state = {**chart_state, 'time_range': time_range}
+                    return (patch, "", "error-message", "", dash.no_update,
+                            state, dash.no_update)
+
+                except Exception as e:
+                    logger.error(f"Error updating time range: {str(e)}", exc_info=True)
+                    return self._error_outputs(
+                        f"An error occurred while loading the chart: {str(e)}")
 
-                stock_symbol = stock_symbol.strip().upper()
-                time_range = time_range or DEFAULTS['time_range']
-                selected_indicators = selected_indicators or []
+        @self.app.callback(
+            patch_outputs,
+            Input('indicators', 'value'),
+            [State('stock-symbol', 'value'),
+             State('time-range', 'value'),
+             State('interval', 'value'),
+             State('compare-symbols', 'value'),
+             State('chart-state', 'data')],
+            prevent_initial_call=True
+        )
+        @instrumented('update_indicators')
+        def update_indicators(selected_indicators, stock_symbol, time_range,
+                              interval, compare, chart_state):
+            """Send only the traces of indicators switched on or off."""
+            # Comparisons do not draw indicators
+            if self._compare_symbols(compare, stock_symbol):
+                raise PreventUpdate
+            if not self._can_patch(chart_state, stock_symbol, interval):
+                return self._render_chart(stock_symbol, time_range, selected_indicators,
+                                          interval)
 
-                logger.info(
-                    f"Updating chart for {stock_symbol} with time range {time_range}")
+            try:
+                symbol = chart_state['symbol']
+                selected = self._selected_indicators(selected_indicators)
+                shown = chart_state['indicators']
+                added = [name for name in selected if name not in shown]
+                removed = [name for name in shown if name not in selected]
+                if not added and not removed:
+                    raise PreventUpdate
+
+                # Adding or removing a pane changes the subplot layout
+                if self.chart_builder.changes_panes(added + removed):
+                    return self._render_chart(
+                        symbol, time_range, selected_indicators,
+                        chart_state['interval'])
+
+                hist_data = self.data_fetcher.get_stock_history(
+                    symbol, chart_state['interval'])
+                if self.clientside_ranges:
+                    # The chart holds the full history
+                    filtered_data = hist_data
+                else:
+                    filtered_data, error_msg = self._filter_time_range(
+                        hist_data, chart_state['time_range'])
+                    if error_msg:
+                        return self._error_outputs(error_msg)
+
+                patch = Patch()
+                self.chart_builder.patch_indicators(
+                    patch, hist_data, filtered_data, symbol, selected,
+                    added, removed)
+
+                state = {**chart_state, 'indicators': selected}
+                return (patch, "", "error-message", "", dash.no_update,
+                        state, dash.no_update)
+
+            except PreventUpdate:
+                raise
+            except Exception as e:
+                logger.error(f"Error updating indicators: {str(e)}", exc_info=True)
+                return self._error_outputs(
+                    f"An error occurred while loading the chart: {str(e)}")
 
-                # Fetch stock data
-                hist_data, stock_info = self.data_fetcher.get_stock_data(
+        @self.app.callback(
+            Output('main-chart', 'figure', allow_duplicate=True),
+            Input('chart-meta', 'data'),
+            [State('stock-symbol', 'value'),
+             State('chart-state', 'data')],
+            prevent_initial_call=True
+        )
+        @instrumented('update_chart_title')
+        def update_chart_title(chart_meta, stock_symbol, chart_state):
+            """Fill in the chart title once the stock info has loaded."""
+            if not chart_meta or not chart_meta.get('info_pending'):
+                raise PreventUpdate
+
+            symbol = chart_meta['symbol']
+            stock_info = self.data_fetcher.get_stock_info(symbol)
+
+            # The user moved on to another symbol while the info was loading
+            if (stock_symbol or '').strip().upper() != symbol:
+                raise PreventUpdate
+
+            patch = Patch()
+            self.chart_builder.apply_symbol_info(
+                patch, stock_info, chart_state['indicators'] if chart_state else None)
+            return patch
+
+    def _setup_metrics(self):
+        """Serve Prometheus metrics on /metrics and time callback responses."""
+        server = self.app.server
+        profiler = (RequestProfiler(METRICS_CONFIG['profile_dir'],
+                                    METRICS_CONFIG['profile_top'])
+                    if METRICS_CONFIG['profiling'] else None)
+        REGISTRY.set_collector('caches', self._cache_metrics)
+
+        @server.route('/metrics')
+        def metrics():
+            return flask.Response(
+                REGISTRY.render(),
+                content_type='text/plain; version=0.0.4; charset=utf-8')
+
+        @server.before_request
+        def start_request():
+            flask.g.stockcharts_started = time.perf_counter()
+            if profiler is not None and profiler.wanted(flask.request):
+                flask.g.stockcharts_profile = profiler.start()
+
+        @server.after_request
+        def finish_request(response):
+            callback = flask.g.get('stockcharts_callback')
+            if callback is not None and not response.direct_passthrough:
+                PAYLOAD_BYTES.observe(len(response.get_data()), callback=callback)
+                # Whatever the callback did not spend is Dash serializing
+                # the outputs into the response
+                elapsed = time.perf_counter() - flask.g.stockcharts_started
+                STAGE_SECONDS.observe(
+                    max(elapsed - flask.g.stockcharts_callback_seconds, 0.0),
+                    stage='serialize')
+
+            profile = flask.g.pop('stockcharts_profile', None)
+            if profile is not None:
+                path = profiler.finish(profile, callback or flask.request.path)
+                if path is not None:
+                    response.headers['X-StockCharts-Profile-File'] = str(path)
+            return response
+
+        @server.teardown_request
+        def abandon_profile(error):
+            # A request that did not reach finish_request must not keep the
+            # profiler busy
+            profile = flask.g.pop('stockcharts_profile', None)
+            if profile is not None:
+                profiler.discard(profile)
+
+    def _cache_metrics(self):
+        """Cache counters for the metrics registry."""
+        caches = {
+            'history': self.data_fetcher.cache.stats(),
+            'resampled': self.data_fetcher.resampled_cache.stats(),
+            'comparison': self.comparison_panels.stats(),
+            'info': self.data_fetcher.info_cache.stats(),
+            'indicators': indicator_cache.stats(),
+        }
+        for counter in ('hits', 'misses', 'evictions', 'stale_hits'):
+            yield (f'stockcharts_cache_{counter}_total', 'counter',
+                   f'Cache {counter.replace("_", " ")}',
+                   [({'cache': name}, stats[counter])
+                    for name, stats in caches.items()])
+        yield ('stockcharts_cache_bytes', 'gauge', 'Bytes held by the cache',
+               [({'cache': name}, stats['bytes']) for name, stats in caches.items()])
+        yield ('stockcharts_cache_entries', 'gauge', 'Entries held by the cache',
+               [({'cache': name}, stats['entries']) for name, stats in caches.items()])
+
+    def _render_chart(self, stock_symbol, time_range, selected_indicators,
+                      interval=None, compare=None):
+        """Build the full chart; returns the outputs of the chart callbacks."""
+        try:
+            # Validate inputs
+            if not stock_symbol or not stock_symbol.strip():
+                return self._create_empty_chart(), "", "error-message", "", None, None, None
+
+            stock_symbol = stock_symbol.strip().upper()
+            time_range = time_range or DEFAULTS['time_range']
+            interval = interval or DEFAULTS['interval']
+            if interval not in INTERVALS:
+                return self._error_outputs(f"Unknown bar interval '{interval}'.")
+            selected_indicators = self._selected_indicators(selected_indicators)
+
+            compare_symbols = self._compare_symbols(compare, stock_symbol)
+            if compare_symbols:
+                return self._render_comparison(
+                    [stock_symbol] + compare_symbols, time_range, interval,
+                    selected_indicators)
+
+            logger.info(
+                f"Updating chart for {stock_symbol} with time range {time_range}"
+                f" and {interval} bars")
+
+            # Fetch stock history; info is loaded in the background
+            with stage_timer('history'):
+                hist_data = self.data_fetcher.get_stock_history(
+                    stock_symbol, interval)
+            with stage_timer('info'):
+                stock_info = self.data_fetcher.get_stock_info(
+                    stock_symbol, wait=False)
+            info_pending = stock_info is None
+            if info_pending:
+                stock_info = self.data_fetcher.placeholder_info(
                     stock_symbol)
 
-                if hist_data is None or hist_data.empty:
-                    error_msg = f"No data found for symbol '{stock_symbol}'. Please check the ticker symbol."
-                    return self._create_empty_chart(), error_msg, "error-message show", ""
-
-                # Get date range for filtering
-                start_date, end_date = get_date_range_from_data(
-                    hist_data, time_range)
-
-                if start_date is None or end_date is None:
-                    error_msg = "Unable to determine date range for the selected period."
-                    return self._create_empty_chart(), error_msg, "error-message show", ""
-
-                # Filter data for the selected time range
-                filtered_data = hist_data[
-                    (hist_data.index >= start_date) & (
-                        hist_data.index <= end_date)
-                ].copy()
-
-                if filtered_data.empty:
-                    error_msg = f"No data available for the selected time period."
-                    return self._create_empty_chart(), error_msg, "error-message show", ""
+            if hist_data is None or hist_data.empty:
+                if interval != DEFAULTS['interval']:
+                    return self._error_outputs(
+                        f"No {INTERVALS[interval]['label'].lower()} data found for "
+                        f"symbol '{stock_symbol}'.")
+                return self._error_outputs(
+                    f"No data found for symbol '{stock_symbol}'. Please check the ticker symbol.")
+
+            if self.clientside_ranges:
+                # Full history zoomed to the range; the browser re-zooms it
+                with stage_timer('figure'):
+                    figure, range_data = self.chart_builder.create_history_chart(
+                        hist_data, stock_info, time_range, selected_indicators)
+            else:
+                with stage_timer('time_range'):
+                    filtered_data, error_msg = self._filter_time_range(
+                        hist_data, time_range)
+                if error_msg:
+                    return self._error_outputs(error_msg)
 
                 # Create the chart with selected indicators
-                figure = self._create_chart_with_indicators(
-                    hist_data, stock_info, filtered_data, selected_indicators
-                )
-
-                return figure, "", "error-message", ""
-
-            except Exception as e:
-                logger.error(f"Error updating chart: {str(e)}", exc_info=True)
-                error_msg = f"An error occurred while loading the chart: {str(e)}"
-                return self._create_empty_chart(), error_msg, "error-message show", ""
+                with stage_timer('figure'):
+                    figure = self._create_chart_with_indicators(
+                        hist_data, stock_info, filtered_data, selected_indicators
+                    )
+                range_data = None
+
+            chart_meta = {'symbol': stock_symbol,
+                          'info_pending': info_pending}
+            # What the rendered figure shows, for the patching callbacks
+            chart_state = {'symbol': stock_symbol,
+                           'interval': interval,
+                           'time_range': time_range,
+                           'indicators': selected_indicators}
+            return (figure, "", "error-message", "", chart_meta, chart_state,
+                    range_data)
+
+        except Exception as e:
+            logger.error(f"Error updating chart: {str(e)}", exc_info=True)
+            return self._error_outputs(
+                f"An error occurred while loading the chart: {str(e)}")
+
+    def _render_comparison(self, symbols, time_range, interval, selected_indicators):
+        """Build the performance comparison of ``symbols``; returns the chart callback outputs."""
+        logger.info(
+            f"Comparing {', '.join(symbols)} over {time_range} with {interval} bars")
+
+        with stage_timer('history'):
+            closes, missing = self.comparison_panels.get(symbols, interval)
+        if closes is None:
+            return self._error_outputs(
+                f"No data found for symbols {', '.join(missing)}.")
+
+        with stage_timer('time_range'):
+            changes = performance(closes, time_range)
+        if changes.empty:
+            return self._error_outputs("No data available for the selected time period.")
+
+        with stage_timer('figure'):
+            figure = self.chart_builder.create_comparison_chart(changes)
+
+        # Symbols without data are reported but do not block the comparison
+        error_msg, error_class = "", "error-message"
+        if missing:
+            error_msg = f"No data found for {', '.join(missing)}."
+            error_class = "error-message show"
+
+        chart_meta = {'symbol': symbols[0], 'info_pending': False}
+        chart_state = {'symbol': symbols[0],
+                       'interval': interval,
+                       'time_range': time_range,
+                       'indicators': selected_indicators,
+                       'compare': symbols[1:]}
+        return (figure, error_msg, error_class, "", chart_meta, chart_state, None)
+
+    def _error_outputs(self, error_msg):
+        """Outputs of the chart callbacks for an error message."""
+        return (self._create_empty_chart(), error_msg, "error-message show", "",
+                None, None, None)
+
+    @staticmethod
+    def _can_patch(chart_state, stock_symbol, interval=None):
+        """Whether the rendered figure shows ``stock_symbol`` at ``interval`` and can be patched."""
+        return (bool(chart_state)
+                and not chart_state.get('compare')
+                and chart_state['symbol'] == (stock_symbol or '').strip().upper()
+                and chart_state.get('interval') == (interval or DEFAULTS['interval']))
+
+    @staticmethod
+    def _compare_symbols(compare, stock_symbol):
+        """Symbols from the comparison input, without the main symbol and duplicates."""
+        main = (stock_symbol or '').strip().upper()
+        symbols = [s.strip().upper() for s in re.split(r'[,\s]+', compare or '')]
+        symbols = [s for s in dict.fromkeys(symbols) if s and s != main]
+        return symbols[:COMPARISON_CONFIG['max_symbols'] - 1]
+
+    @staticmethod
+    def _selected_indicators(selected_indicators):
+        """Registered indicators from the checklist value, in drawing order."""
+        return [spec.key for spec in get_indicator_specs(selected_indicators or [])]
+
+    @staticmethod
+    def _filter_time_range(hist_data, time_range):
+        """
+        Select the rows of the time range.
+
+        Returns:
+            tuple: (filtered_data, error_msg); error_msg is None on success
+        """
+        # Positional slice of the calendar range; no rows are copied
+        filtered_data = slice_time_range(hist_data, time_range)
+
+        if filtered_data.empty:
+            return None, "No data available for the selected time period."
+        return filtered_data, None
 
     def _create_chart_with_indicators(self, hist_data, stock_info, filtered_data, selected_indicators):
         """Create chart with selected technical indicators."""
-        # Create a modified chart builder that respects indicator selections
-        chart_builder = ChartBuilder()
-
-        # Temporarily modify the chart builder methods based on selections
-        original_methods = {}
-
-        if 'ma' not in selected_indicators:
-            original_methods['_add_moving_averages'] = chart_builder._add_moving_averages
-            chart_builder._add_moving_averages = lambda fig, data: None
-
-        if 'bb' not in selected_indicators:
-            original_methods['_add_bollinger_bands'] = chart_builder._add_bollinger_bands
-            chart_builder._add_bollinger_bands = lambda fig, data: None
-
-        if 'rsi' not in selected_indicators:
-            original_methods['_add_rsi_chart'] = chart_builder._add_rsi_chart
-            chart_builder._add_rsi_chart = lambda fig, data: None
-
-        if 'macd' not in selected_indicators:
-            original_methods['_add_macd_chart'] = chart_builder._add_macd_chart
-            chart_builder._add_macd_chart = lambda fig, data: None
-
-        # Create the chart
-        figure = chart_builder.create_main_chart(
-            hist_data, stock_info, filtered_data)
-
-        # Restore original methods
-        for method_name, method in original_methods.items():
-            setattr(chart_builder, method_name, method)
-
-        return figure
+        return self.chart_builder.create_main_chart(
+            hist_data, stock_info, filtered_data, indicators=selected_indicators)
 
     def _create_empty_chart(self):
         """Create an empty chart for error states."""
@@ -200,6 +548,27 @@ class StockChartsApp:
 
         return fig
 
+    def prewarm(self, symbols):
+        """Start pre-loading symbols in the background and return the warmer."""
+        warmer = WatchlistWarmer(
+            self.data_fetcher, symbols,
+            batch_size=WATCHLIST['batch_size'],
+            max_workers=WATCHLIST['max_workers']
+        )
+        self.data_fetcher.metric_symbols = frozenset(warmer.symbols)
+        warmer.start()
+        return warmer
+
+    def start_refresh(self):
+        """Start refreshing the most requested symbols in the background."""
+        scheduler = RefreshScheduler(
+            self.data_fetcher,
+            interval=REFRESH_CONFIG['interval'],
+            top_n=REFRESH_CONFIG['top_n']
+        )
+        scheduler.start()
+        return scheduler
+
     def run(self, debug=None, host=None, port=None):
         """Run the application."""
         debug = debug if debug is not None else APP_CONFIG['debug']
@@ -221,14 +590,132 @@ class StockChartsApp:
             except Exception as e:
                 logger.warning(f"Could not open browser: {e}")
 
-        # Run the server
-        self.app.run_server(debug=debug, host=host, port=port)
-
-
-def main():
+        # Run the development server; use wsgi.py for multi-worker serving
+        self.app.run(debug=debug, host=host, port=port)
+
+
+def _add_provider_args(parser):
+    """Add the market data source options."""
+    parser.add_argument(
+        '--provider', choices=['yfinance', 'local', 'synthetic'],
+        default=DATA_PROVIDER['name'],
+        help="Market data source (default: %(default)s)")
+    parser.add_argument(
+        '--data-dir', default=DATA_PROVIDER['options']['directory'],
+        help="Directory of per-symbol Parquet/CSV files for the local provider")
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="StockCharts Pro - Professional Stock Analysis",
+        epilog="Run 'StockCharts.py render --help' to render charts to files "
+               "without starting the server.")
+    parser.add_argument(
+        '--watchlist',
+        help="Comma-separated symbols to pre-load at startup "
+             "(default: WATCHLIST in config.py)")
+    parser.add_argument(
+        '--no-prewarm', action='store_true',
+        help="Start without pre-loading the watchlist")
+    parser.add_argument(
+        '--no-refresh', action='store_true',
+        help="Do not refresh frequently requested symbols in the background")
+    _add_provider_args(parser)
+    return parser.parse_args(argv)
+
+
+def parse_render_args(argv=None):
+    """Parse the arguments of the ``render`` command."""
+    parser = argparse.ArgumentParser(
+        prog='StockCharts.py render',
+        description="Render the charts of many symbols to files on a process pool")
+    parser.add_argument(
+        'symbols', nargs='*', help="Symbols to render")
+    parser.add_argument(
+        '--symbols-file',
+        help="File with one symbol per line; '#' starts a comment")
+    parser.add_argument(
+        '--time-range', default=DEFAULTS['time_range'], choices=list(TIME_RANGES),
+        help="Time range of the charts (default: %(default)s)")
+    parser.add_argument(
+        '--interval', default=DEFAULTS['interval'], choices=list(INTERVALS),
+        help="Bar interval (default: %(default)s)")
+    parser.add_argument(
+        '--indicators', default=','.join(DEFAULTS['indicators']),
+        help="Comma-separated indicators to draw (default: %(default)s)")
+    parser.add_argument(
+        '--format', nargs='+', default=['html'], choices=FORMATS, dest='formats',
+        help="Output formats; images need kaleido (default: html)")
+    parser.add_argument(
+        '--output-dir', default='charts',
+        help="Directory for the rendered files (default: %(default)s)")
+    parser.add_argument(
+        '--workers', type=int, default=os.cpu_count(),
+        help="Worker processes (default: %(default)s)")
+    parser.add_argument(
+        '--cache-dir', default=SHARED_CACHE['directory'],
+        help="History cache shared by the workers (default: %(default)s)")
+    parser.add_argument(
+        '--no-prefetch', action='store_true',
+        help="Let each worker load its symbols instead of bulk-downloading first")
+    parser.add_argument(
+        '--plotlyjs', choices=['cdn', 'directory', 'inline'], default='cdn',
+        help="How HTML files load plotly.js (default: %(default)s)")
+    parser.add_argument(
+        '--report', help="Write per-symbol timings as JSON to this file")
+    _add_provider_args(parser)
+
+    args = parser.parse_args(argv)
+    if args.symbols_file:
+        with open(args.symbols_file) as handle:
+            args.symbols += [line.split('#')[0].strip() for line in handle]
+    args.symbols = [symbol for symbol in args.symbols if symbol.strip()]
+    if not args.symbols:
+        parser.error("no symbols given")
+    return args
+
+
+def render_main(argv=None):
+    """Render charts to files without starting the server."""
+    args = parse_render_args(argv)
+    renderer = BatchRenderer(
+        args.provider, {**DATA_PROVIDER['options'], 'directory': args.data_dir},
+        output_dir=args.output_dir, formats=args.formats,
+        time_range=args.time_range, interval=args.interval,
+        indicators=[key.strip() for key in args.indicators.split(',') if key.strip()],
+        workers=args.workers, cache_dir=args.cache_dir,
+        prefetch=not args.no_prefetch,
+        include_plotlyjs=True if args.plotlyjs == 'inline' else args.plotlyjs)
+    summary = renderer.run(args.symbols)
+    if args.report:
+        write_report(summary, args.report)
+        logger.info(f"Report written to {args.report}")
+    return 1 if summary['failed'] else 0
+
+
+def main(argv=None):
     """Main entry point for the application."""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == 'render':
+        sys.exit(render_main(argv[1:]))
+
+    args = parse_args(argv)
     try:
-        app = StockChartsApp()
+        provider = create_provider(
+            args.provider,
+            **{**DATA_PROVIDER['options'], 'directory': args.data_dir})
+        app = StockChartsApp(provider=provider)
+
+        if not args.no_prewarm and (args.watchlist or WATCHLIST['enabled']):
+            symbols = (args.watchlist.split(',') if args.watchlist
+                       else WATCHLIST['symbols'])
+            # Runs on a daemon thread so the server accepts requests meanwhile
+            app.prewarm(symbols)
+
+        if not args.no_refresh and REFRESH_CONFIG['enabled']:
+            app.start_refresh()
+
         app.run()
     except KeyboardInterrupt:
         logger.info("Application stopped by user")
@@ -238,4 +725,6 @@ def main():
 
 
 if __name__ == '__main__':
+    # Needed by the render worker processes of a frozen executable
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,67 @@
+// Client-side callbacks for StockCharts Pro
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    stockcharts: {
+        /**
+         * Zoom the full-history chart to a time range without a server
+         * round trip. Mirrors ChartBuilder.time_window_layout.
+         *
+         * Returns a copy of the figure with a new layout; its trace data is
+         * shared, so only the changed axes are copied.
+         *
+         * @param {string} timeRange - Selected time range
+         * @param {Object} rangeData - Contents of the range-data store
+         * @param {Object} figure - Current main-chart figure
+         * @returns {Object} Updated main-chart figure
+         */
+        setTimeRange: function(timeRange, rangeData, figure) {
+            if (!figure || !rangeData || !rangeData.windows[timeRange]) {
+                return window.dash_clientside.no_update;
+            }
+
+            const first = rangeData.windows[timeRange][0];
+            const last = rangeData.windows[timeRange][1];
+            const axes = rangeData.axes;
+            const layout = Object.assign({}, figure.layout);
+            const setRange = function(key, range) {
+                layout[key] = Object.assign({}, layout[key], {range: range});
+            };
+
+            axes.x.forEach(function(key) {
+                setRange(key, [rangeData.dates[first], rangeData.dates[last]]);
+            });
+
+            let high = -Infinity;
+            let low = Infinity;
+            let volume = 0;
+            for (let i = first; i <= last; i++) {
+                high = Math.max(high, rangeData.high[i]);
+                low = Math.min(low, rangeData.low[i]);
+                volume += rangeData.volume[i];
+            }
+
+            const priceOffset = (high - low) * rangeData.price_offset_percentage;
+            const volumeMax = volume / (last - first + 1) / rangeData.volume_percentage;
+            setRange(axes.price, [low - priceOffset, high + priceOffset]);
+            setRange(axes.volume, [0, volumeMax]);
+
+            // Indicator panes without a fixed range, e.g. MACD
+            rangeData.panes.forEach(function(pane) {
+                let paneLow = Infinity;
+                let paneHigh = -Infinity;
+                for (let i = first; i <= last; i++) {
+                    if (pane.low[i] !== null) {
+                        paneLow = Math.min(paneLow, pane.low[i]);
+                    }
+                    if (pane.high[i] !== null) {
+                        paneHigh = Math.max(paneHigh, pane.high[i]);
+                    }
+                }
+                if (paneLow <= paneHigh) {
+                    const padding = (paneHigh - paneLow) * 0.05;
+                    setRange(pane.axis, [paneLow - padding, paneHigh + padding]);
+                }
+            });
+            return Object.assign({}, figure, {layout: layout});
+        }
+    }
+});
@@ -0,0 +1,284 @@
+"""
+Benchmark of the chart pipeline, stage by stage.
+
+Times each stage of the symbol-change callback on its own, offline:
+cache lookup, time range resolution, each registered indicator, figure
+construction and JSON serialisation. Data is synthetic, or read from a
+directory of Parquet/CSV fixtures with ``--data-dir``. Each stage is warmed
+up once (so numba compilation is excluded), then timed; peak memory is
+measured in a separate traced run. ``--plain-payload`` builds the figure
+without ``compact_payload``, for comparing serialization against it.
+
+Usage:
+    python -m benchmarks.bench_pipeline [--sizes 1000 10000 100000]
+        [--plain-payload] [--output results.json] [--baseline baseline.json]
+"""
+import argparse
+import importlib.util
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import plotly
+import plotly.io.json as plotly_json
+
+from components.chart_builder import ChartBuilder
+from components.indicator_registry import get_indicator_specs
+from utils.data_fetcher import StockDataFetcher
+from utils.data_store import HistoryStore
+from utils.indicators import INDICATOR_FUNCTIONS, indicator_cache
+from utils import indicators
+from utils.providers import LocalDirectoryProvider, SyntheticProvider
+from utils.shared_cache import SharedHistoryCache
+from utils.time_utils import get_date_range_from_data, slice_time_range
+
+SYMBOL = 'BENCH'
+
+
+def make_fetcher(provider):
+    """A fetcher that only uses the in-memory cache."""
+    scratch = tempfile.gettempdir()
+    return StockDataFetcher(
+        store=HistoryStore(scratch, enabled=False), provider=provider,
+        shared_cache=SharedHistoryCache(scratch, enabled=False))
+
+
+def load_history(bars: int, data_dir=None, symbol=SYMBOL) -> pd.DataFrame:
+    """Synthetic history of ``bars`` bars, or the last ``bars`` of a fixture."""
+    if data_dir is None:
+        return SyntheticProvider(bars=bars).get_history(symbol)
+    history = LocalDirectoryProvider(data_dir).get_history(symbol)
+    if history is None:
+        raise SystemExit(f"No fixture for {symbol} in {data_dir}")
+    return history.iloc[-bars:]
+
+
+def stages(fetcher, builder, symbol: str, time_range: str):
+    """
+    The pipeline stages in callback order.
+
+    Returns:
+        list: (name, function) pairs; a function returning bytes or str
+            records its length as the payload size
+    """
+    state = {}
+
+    def cache_lookup():
+        state['history'] = fetcher.get_stock_history(symbol)
+
+    def date_range():
+        return get_date_range_from_data(state['history'], time_range)
+
+    def time_range_slice():
+        state['filtered'] = slice_time_range(state['history'], time_range)
+
+    def create_main_chart():
+        # Cold indicator cache: the chart computes every indicator
+        indicator_cache.clear()
+        state['figure'] = builder.create_main_chart(
+            state['history'], {'symbol': symbol, 'shortName': symbol},
+            state['filtered'])
+
+    def to_json():
+        return state['figure'].to_json()
+
+    pipeline = [
+        ('cache_lookup', cache_lookup),
+        ('date_range', date_range),
+        ('time_range_slice', time_range_slice),
+    ]
+    for spec in get_indicator_specs():
+        pipeline.append((f'indicator:{spec.key}', _indicator_stage(spec, state)))
+    pipeline += [
+        ('create_main_chart', create_main_chart),
+        ('to_json', to_json),
+    ]
+    return pipeline
+
+
+def _indicator_stage(spec, state):
+    """Compute each distinct calculation of an indicator on the full history."""
+    calls = {}
+    for trace in spec.traces:
+        params = spec.trace_params(trace)
+        calls[tuple(sorted(params.items()))] = params
+    function = INDICATOR_FUNCTIONS[spec.function]
+
+    def run():
+        for params in calls.values():
+            function(state['history'], **params)
+
+    return run
+
+
+def measure(function, repeat: int) -> dict:
+    """Time ``function`` and trace its peak memory."""
+    result = function()  # Warm-up, also records the payload
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'time_s': min(times),
+        'median_s': statistics.median(times),
+        'peak_bytes': peak,
+        'payload_bytes': len(result) if isinstance(result, (bytes, str)) else None,
+    }
+
+
+def run(sizes, repeat: int = 5, time_range: str = 'max', data_dir=None,
+        symbol: str = SYMBOL, compact_payload: bool = True) -> dict:
+    """
+    Benchmark every stage at each size.
+
+    Returns:
+        dict: ``meta`` describing the environment and ``results``, one
+            record per (bars, stage)
+    """
+    builder = ChartBuilder({'compact_payload': compact_payload})
+    results = []
+    for bars in sizes:
+        fetcher = make_fetcher(SyntheticProvider(bars=bars))
+        fetcher.ingest_history(symbol, load_history(bars, data_dir, symbol))
+        for stage, function in stages(fetcher, builder, symbol, time_range):
+            record = {'bars': bars, 'stage': stage, **measure(function, repeat)}
+            results.append(record)
+
+    return {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'plotly': plotly.__version__,
+            'indicator_backend': indicators.BACKEND,
+            'json_engine': _json_engine(),
+            'compact_payload': compact_payload,
+            'data': data_dir or 'synthetic',
+            'time_range': time_range,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def _json_engine() -> str:
+    """The JSON encoder plotly (and Dash) serialize figures with."""
+    engine = plotly_json.config.default_engine
+    if engine == 'auto':
+        engine = 'orjson' if importlib.util.find_spec('orjson') else 'json'
+    return engine
+
+
+def compare(current: dict, baseline: dict, threshold: float,
+            min_delta: float = 0.0005) -> list:
+    """
+    Match results to a baseline by (bars, stage).
+
+    A stage regressed when it is more than ``threshold`` slower and also
+    ``min_delta`` seconds slower, so timer noise on sub-millisecond stages
+    is not reported.
+
+    Returns:
+        list: (record, baseline record or None, time ratio, regressed)
+    """
+    previous = {(r['bars'], r['stage']): r for r in baseline['results']}
+    rows = []
+    for record in current['results']:
+        base = previous.get((record['bars'], record['stage']))
+        ratio = record['time_s'] / base['time_s'] if base and base['time_s'] else None
+        regressed = (ratio is not None and ratio > 1 + threshold
+                     and record['time_s'] - base['time_s'] > min_delta)
+        rows.append((record, base, ratio, regressed))
+    return rows
+
+
+def _format_bytes(value) -> str:
+    if value is None:
+        return '-'
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if value < 1024 or unit == 'GB':
+            return f"{value:.0f} {unit}" if unit == 'B' else f"{value:.1f} {unit}"
+        value /= 1024
+
+
+def print_report(results: dict, comparison=None):
+    header = f"{'bars':>8}  {'stage':<22} {'time (ms)':>10} {'peak':>10} {'payload':>10}"
+    if comparison is not None:
+        header += f" {'baseline':>10} {'ratio':>7}"
+    print(header)
+
+    rows = comparison or [(record, None, None, False) for record in results['results']]
+    for record, base, ratio, regressed in rows:
+        line = (f"{record['bars']:>8}  {record['stage']:<22} "
+                f"{record['time_s'] * 1000:>10.2f} "
+                f"{_format_bytes(record['peak_bytes']):>10} "
+                f"{_format_bytes(record['payload_bytes']):>10}")
+        if comparison is not None:
+            line += (f" {base['time_s'] * 1000:>10.2f}" if base else f" {'-':>10}")
+            line += f" {ratio:>6.2f}x" if ratio is not None else f" {'-':>7}"
+            if regressed:
+                line += "  REGRESSION"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--time-range', default='max',
+                        help="Selected time range (default: %(default)s)")
+    parser.add_argument('--data-dir',
+                        help="Directory of Parquet/CSV fixtures instead of synthetic data")
+    parser.add_argument('--symbol', default=SYMBOL,
+                        help="Fixture symbol (default: %(default)s)")
+    parser.add_argument('--plain-payload', action='store_true',
+                        help="Serialize dates and values as before compact_payload")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    parser.add_argument('--baseline', help="Compare against saved JSON results")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Slowdown reported as a regression (default: %(default)s)")
+    parser.add_argument('--min-delta-ms', type=float, default=0.5,
+                        help="Smallest slowdown reported as a regression (default: %(default)s)")
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help="Exit with status 1 if any stage regressed")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.repeat, args.time_range, args.data_dir,
+                  args.symbol, not args.plain_payload)
+
+    comparison = None
+    if args.baseline:
+        with open(args.baseline) as handle:
+            comparison = compare(results, json.load(handle), args.threshold,
+                                 args.min_delta_ms / 1000)
+    print_report(results, comparison)
+
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(results, handle, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.fail_on_regression and comparison and any(row[3] for row in comparison):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Micro-benchmark of figure trace construction.
+
+Compares the original trace-building path (per-row colour loop, colour
+list comprehension, pandas objects passed to every trace) with the
+vectorized ChartBuilder path on synthetic history. Downsampling is
+disabled so both paths draw every bar.
+
+Usage:
+    python -m benchmarks.bench_trace_building [--sizes 1000 10000 100000]
+"""
+import argparse
+import time
+
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from components.chart_builder import ChartBuilder
+from components.indicator_registry import get_indicator_specs
+from utils.indicators import (
+    calculate_bollinger_bands, calculate_macd, calculate_moving_average,
+    calculate_rsi
+)
+from utils.providers import SyntheticProvider
+
+
+def _make_figure():
+    return make_subplots(
+        rows=3, cols=1, shared_xaxes=True,
+        specs=[[{"secondary_y": False}], [{"secondary_y": True}],
+               [{"secondary_y": False}]]
+    )
+
+
+def build_legacy(builder: ChartBuilder, data):
+    """Build the traces the way ChartBuilder did before vectorization."""
+    fig = _make_figure()
+    colors = builder.colors
+
+    fig.add_trace(go.Candlestick(
+        x=data.index, open=data['Open'], high=data['High'],
+        low=data['Low'], close=data['Close'], name='Price'), row=2, col=1)
+
+    volume_colors = []
+    for i in range(len(data)):
+        if data['Close'].iloc[i] >= data['Open'].iloc[i]:
+            volume_colors.append(colors['success'])
+        else:
+            volume_colors.append(colors['danger'])
+    fig.add_trace(go.Bar(
+        x=data.index, y=data['Volume'], name='Volume',
+        marker={'color': volume_colors, 'opacity': 0.6}, yaxis='y2'),
+        secondary_y=True, row=2, col=1)
+
+    for period in (20, 50):
+        ma = calculate_moving_average(data, period)
+        fig.add_trace(go.Scatter(x=ma.index, y=ma, name=f'MA{period}'),
+                      row=2, col=1)
+
+    upper, _, lower = calculate_bollinger_bands(data)
+    fig.add_trace(go.Scatter(x=upper.index, y=upper, name='BB Upper'), row=2, col=1)
+    fig.add_trace(go.Scatter(x=lower.index, y=lower, name='BB Lower',
+                             fill='tonexty'), row=2, col=1)
+
+    rsi = calculate_rsi(data)
+    fig.add_trace(go.Scatter(x=rsi.index, y=rsi, name='RSI'), row=1, col=1)
+
+    macd_line, signal_line, histogram = calculate_macd(data)
+    fig.add_trace(go.Scatter(x=macd_line.index, y=macd_line, name='MACD'),
+                  row=3, col=1)
+    fig.add_trace(go.Scatter(x=signal_line.index, y=signal_line, name='Signal'),
+                  row=3, col=1)
+    histogram_colors = ['green' if val >= 0 else 'red' for val in histogram]
+    fig.add_trace(go.Bar(x=histogram.index, y=histogram, name='Histogram',
+                         marker={'color': histogram_colors, 'opacity': 0.6}),
+                  row=3, col=1)
+    return fig
+
+
+def build_vectorized(builder: ChartBuilder, data):
+    """Build the same traces through the current ChartBuilder methods."""
+    specs = get_indicator_specs()
+    fig = builder._new_figure(specs)
+    builder._fill_chart(fig, data, data, None, specs)
+    return go.Figure(fig, _validate=False)
+
+
+def _time(function, repeat: int) -> float:
+    """Best wall-clock time of ``repeat`` runs, in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes, repeat: int = 3):
+    builder = ChartBuilder()
+    builder.config = dict(builder.config, max_points=None)
+
+    print(f"{'bars':>8} {'legacy (s)':>12} {'vectorized (s)':>15} {'speedup':>8}")
+    for bars in sizes:
+        data = SyntheticProvider(bars=bars).get_history('BENCH')
+        legacy = _time(lambda: build_legacy(builder, data), repeat)
+        vectorized = _time(lambda: build_vectorized(builder, data), repeat)
+        print(f"{bars:>8} {legacy:>12.3f} {vectorized:>15.3f} "
+              f"{legacy / vectorized:>7.1f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+    run(args.sizes, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+"""
+Headless batch rendering of charts to files.
+
+Charts are built with ``ChartBuilder`` directly, without Dash, one symbol
+per task on a process pool. The parent process first bulk-downloads the
+histories into the shared on-disk history cache (``utils/shared_cache.py``)
+and loads the symbols' info; the workers then read the memory-mapped
+histories instead of downloading them again.
+"""
+import importlib.util
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from config import DEFAULTS, INTERVALS, SHARED_CACHE, WATCHLIST
+from components.chart_builder import ChartBuilder
+from utils.data_fetcher import StockDataFetcher
+from utils.prewarm import WatchlistWarmer
+from utils.providers import create_provider, safe_file_stem
+from utils.shared_cache import SharedHistoryCache
+from utils.time_utils import slice_time_range
+
+IMAGE_FORMATS = ('png', 'svg', 'pdf')
+FORMATS = ('html', 'json') + IMAGE_FORMATS
+
+# Per-process state of a pool worker, set by _init_worker
+_worker = {}
+
+
+def image_export_available() -> bool:
+    """Whether plotly can export static images (needs kaleido)."""
+    return importlib.util.find_spec('kaleido') is not None
+
+
+class BatchRenderer:
+    """
+    Render the charts of many symbols to HTML, JSON or image files.
+
+    Args:
+        provider_name (str): Data provider, see ``create_provider``
+        provider_options (dict): Options of the data provider
+        output_dir (str): Directory the files are written to
+        formats (iterable): Any of ``FORMATS``; image formats are skipped
+            when no image exporter is installed
+        time_range (str): Time range of the charts
+        interval (str): Bar interval, a key of INTERVALS
+        indicators (iterable): Indicator keys to draw
+        workers (int): Worker processes (default: CPU count)
+        cache_dir (str): Shared history cache directory
+        prefetch (bool): Bulk-download histories before rendering
+        include_plotlyjs: How HTML files get plotly.js, as for
+            ``Figure.write_html`` ('cdn', 'directory' or True to inline)
+    """
+
+    def __init__(self, provider_name: str, provider_options: dict,
+                 output_dir: str = 'charts', formats: Iterable[str] = ('html',),
+                 time_range: str = DEFAULTS['time_range'],
+                 interval: str = DEFAULTS['interval'],
+                 indicators: Iterable[str] = DEFAULTS['indicators'],
+                 workers: Optional[int] = None,
+                 cache_dir: str = SHARED_CACHE['directory'],
+                 prefetch: bool = True, include_plotlyjs='cdn'):
+        self.logger = logging.getLogger(__name__)
+        self.provider_name = provider_name
+        self.provider_options = dict(provider_options)
+        self.output_dir = Path(output_dir).expanduser()
+        self.time_range = time_range
+        self.interval = interval
+        self.indicators = list(indicators)
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.cache_dir = cache_dir
+        self.prefetch = prefetch
+        self.include_plotlyjs = include_plotlyjs
+
+        self.formats = list(dict.fromkeys(formats))
+        unknown = [f for f in self.formats if f not in FORMATS]
+        if unknown:
+            raise ValueError(f"Unknown output format(s): {', '.join(unknown)}")
+        images = [f for f in self.formats if f in IMAGE_FORMATS]
+        if images and not image_export_available():
+            self.logger.warning(
+                f"kaleido is not installed; skipping {', '.join(images)} output")
+            self.formats = [f for f in self.formats if f not in IMAGE_FORMATS]
+        if not self.formats:
+            raise ValueError("No output format available")
+
+    def run(self, symbols: Iterable[str]) -> dict:
+        """
+        Render every symbol.
+
+        Returns:
+            dict: ``results`` with one record per symbol (status, timings
+                in seconds, bars and files written) and the totals:
+                ``rendered``, ``failed``, ``prefetch_s``, ``elapsed_s``,
+                ``throughput`` (charts per second) and ``workers``
+        """
+        symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+        started = time.perf_counter()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        infos = {}
+        if self.prefetch and symbols:
+            infos = self._prefetch(symbols)
+        prefetch_s = time.perf_counter() - started
+
+        job = {
+            'output_dir': str(self.output_dir),
+            'formats': self.formats,
+            'time_range': self.time_range,
+            'interval': self.interval,
+            'indicators': self.indicators,
+            'include_plotlyjs': self.include_plotlyjs,
+        }
+        results = []
+        workers = min(self.workers, len(symbols)) or 1
+        self.logger.info(f"Rendering {len(symbols)} chart(s) on {workers} process(es)")
+
+        # Spawned workers behave alike on every platform and do not inherit
+        # the parent's threads
+        with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(self.provider_name, self.provider_options,
+                          self.cache_dir)) as executor:
+            futures = {executor.submit(render_symbol, symbol, job, infos.get(symbol)): symbol
+                       for symbol in symbols}
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:  # The worker process died
+                    result = {'symbol': symbol, 'status': 'error', 'error': str(e),
+                              'seconds': None, 'files': []}
+                results.append(result)
+                self._log_result(result, len(results), len(symbols))
+
+        elapsed = time.perf_counter() - started
+        order = {symbol: position for position, symbol in enumerate(symbols)}
+        rendered = [r for r in results if r['status'] == 'ok']
+        summary = {
+            'results': sorted(results, key=lambda r: order[r['symbol']]),
+            'rendered': len(rendered),
+            'failed': [r['symbol'] for r in results if r['status'] != 'ok'],
+            'prefetch_s': prefetch_s,
+            'elapsed_s': elapsed,
+            'throughput': len(rendered) / elapsed if elapsed else None,
+            'workers': workers,
+        }
+        self.logger.info(
+            f"Rendered {len(rendered)}/{len(symbols)} chart(s) in {elapsed:.1f}s "
+            f"({summary['throughput'] or 0:.2f} charts/s, prefetch {prefetch_s:.1f}s)")
+        if summary['failed']:
+            self.logger.warning(f"Could not render: {', '.join(summary['failed'])}")
+        return summary
+
+    def _prefetch(self, symbols: List[str]) -> dict:
+        """
+        Load the histories into the shared cache and get the symbols' info.
+
+        Returns:
+            dict: Info per symbol, for the workers
+        """
+        fetcher = StockDataFetcher(
+            provider=create_provider(self.provider_name, **self.provider_options),
+            shared_cache=SharedHistoryCache(self.cache_dir, ttl=SHARED_CACHE['ttl']))
+
+        # Intraday bars are not shared; each worker fetches its own
+        if INTERVALS[self.interval]['source'] == '1d':
+            WatchlistWarmer(fetcher, symbols, batch_size=WATCHLIST['batch_size'],
+                            max_workers=WATCHLIST['max_workers']).run()
+        else:
+            for symbol in symbols:
+                fetcher.prefetch_stock_info(symbol)
+
+        # The info was requested alongside the histories; wait for the rest
+        return {symbol: fetcher.get_stock_info(symbol) for symbol in symbols}
+
+    def _log_result(self, result: dict, done: int, total: int):
+        if result['status'] == 'ok':
+            self.logger.info(
+                f"[{done}/{total}] {result['symbol']}: {result['seconds']:.2f}s "
+                f"(load {result['load_s']:.2f}s, render {result['render_s']:.2f}s, "
+                f"write {result['write_s']:.2f}s, {result['bars']} bars)")
+        else:
+            self.logger.warning(
+                f"[{done}/{total}] {result['symbol']}: {result['error']}")
+
+
+def write_report(summary: dict, path: str):
+    """Write a ``BatchRenderer.run`` summary as JSON."""
+    with open(path, 'w') as handle:
+        json.dump(summary, handle, indent=2)
+
+
+def _init_worker(provider_name: str, provider_options: dict, cache_dir: str):
+    """Create the fetcher and chart builder of a pool worker."""
+    _worker['fetcher'] = StockDataFetcher(
+        provider=create_provider(provider_name, **provider_options),
+        shared_cache=SharedHistoryCache(cache_dir, ttl=SHARED_CACHE['ttl']))
+    _worker['builder'] = ChartBuilder()
+
+
+def render_symbol(symbol: str, job: dict, info: Optional[dict] = None) -> dict:
+    """
+    Render the chart of one symbol in a pool worker.
+
+    Args:
+        symbol (str): Stock ticker symbol
+        job (dict): Output directory, formats, time range, interval,
+            indicators and ``include_plotlyjs``
+        info (dict): Symbol info loaded by the parent, if any
+
+    Returns:
+        dict: Status, timings in seconds, bars and files written
+    """
+    fetcher = _worker['fetcher']
+    started = time.perf_counter()
+    result = {'symbol': symbol, 'status': 'ok', 'error': None, 'files': [],
+              'pid': os.getpid()}
+    try:
+        hist = fetcher.get_stock_history(symbol, job['interval'])
+        if hist is None or hist.empty:
+            return {**result, 'status': 'no data', 'error': 'No data found',
+                    'seconds': time.perf_counter() - started}
+        filtered = slice_time_range(hist, job['time_range'])
+        if filtered.empty:
+            return {**result, 'status': 'no data',
+                    'error': 'No data in the selected time range',
+                    'seconds': time.perf_counter() - started}
+        info = info or fetcher.get_stock_info(symbol)
+        loaded = time.perf_counter()
+
+        fig = _worker['builder'].create_main_chart(
+            hist, info, filtered, indicators=job['indicators'])
+        rendered = time.perf_counter()
+
+        stem = safe_file_stem(symbol)
+        for fmt in job['formats']:
+            path = Path(job['output_dir']) / f"{stem}.{fmt}"
+            if fmt == 'html':
+                fig.write_html(path, include_plotlyjs=job['include_plotlyjs'])
+            elif fmt == 'json':
+                path.write_text(fig.to_json())
+            else:
+                fig.write_image(path)
+            result['files'].append(str(path))
+        finished = time.perf_counter()
+
+        result.update(load_s=loaded - started, render_s=rendered - loaded,
+                      write_s=finished - rendered, seconds=finished - started,
+                      bars=len(filtered))
+    except Exception as e:
+        result.update(status='error', error=str(e),
+                      seconds=time.perf_counter() - started)
+    return result
@@ -1,237 +1,643 @@
+import copy
+from concurrent.futures import ThreadPoolExecutor
+
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+import numpy as np
 import pandas as pd
-from config import COLORS, CHART_CONFIG
-from utils.indicators import (
-    calculate_rsi, calculate_moving_average,
-    calculate_bollinger_bands, calculate_macd
+from config import COLORS, CHART_CONFIG, INDICATOR_CONFIG, TIME_RANGES
+from components.indicator_registry import (
+    INDICATOR_REGISTRY, IndicatorSpec, get_indicator_specs
+)
+from utils.indicators import INDICATOR_FUNCTIONS, indicator_cache
+from utils.time_utils import get_date_range_from_data
+from utils.metrics import stage_timer
+from utils.downsampling import (
+    downsample_ohlcv, downsample_series, downsample_buckets
 )
 
+try:
+    # plotly >= 6 serializes NumPy arrays as base64 typed arrays
+    from _plotly_utils.utils import convert_to_base64
+    TYPED_ARRAYS = True
+except ImportError:
+    TYPED_ARRAYS = False
+
+
+# Figure skeletons keyed by colour scheme, registry and subplot panes,
+# shared by all ChartBuilders
+_SKELETONS = {}
+
+# Independent indicators are computed concurrently; the NumPy and numba
+# kernels release the GIL
+_indicator_executor = ThreadPoolExecutor(
+    max_workers=INDICATOR_CONFIG['workers'], thread_name_prefix='indicators')
+
+_FLOAT32_MAX = float(np.finfo(np.float32).max)
+
 
 class ChartBuilder:
     """Build interactive stock charts with technical indicators."""
 
-    def __init__(self):
+    def __init__(self, config: dict = None):
         self.colors = COLORS
-        self.config = CHART_CONFIG
+        # Optional overrides of CHART_CONFIG entries, e.g. ``max_points``
+        self.config = {**CHART_CONFIG, **config} if config else CHART_CONFIG
 
     def create_main_chart(self, data: pd.DataFrame, symbol_info: dict,
-                          filtered_data: pd.DataFrame) -> go.Figure:
+                          filtered_data: pd.DataFrame, indicators=None,
+                          as_dict: bool = False):
         """
         Create the main stock chart with subplots.
 
+        Only the selected indicators are computed, and only the panes of
+        selected indicators (e.g. RSI, MACD) are laid out.
+
         Args:
             data (pd.DataFrame): Full historical data
             symbol_info (dict): Stock information
             filtered_data (pd.DataFrame): Filtered data for the selected time range
+            indicators (iterable): ``IndicatorSpec`` objects or registry keys
+                to draw (default: all registered indicators)
+            as_dict (bool): Return the figure dict instead of a ``go.Figure``
 
         Returns:
-            go.Figure: Complete chart figure
+            go.Figure: Complete chart figure (a dict if ``as_dict``)
         """
-        # Create subplots: RSI on top, main chart on bottom
-        fig = make_subplots(
-            rows=3, cols=1,
-            shared_xaxes=True,
-            row_heights=[0.2, 0.6, 0.2],
-            vertical_spacing=0.05,
-            specs=[
-                [{"secondary_y": False}],  # RSI
-                [{"secondary_y": True}],   # Main chart with volume
-                [{"secondary_y": False}]   # MACD
-            ],
-            subplot_titles=(
-                'RSI', f'{symbol_info.get("shortName", symbol_info["symbol"])}', 'MACD')
-        )
+        specs = get_indicator_specs(indicators)
 
-        # Add main chart components
-        self._add_candlestick_chart(fig, filtered_data)
-        self._add_volume_chart(fig, filtered_data)
-        self._add_moving_averages(fig, filtered_data)
-        self._add_bollinger_bands(fig, filtered_data)
+        # Copy of the cached layout with empty slots for every trace
+        fig = self._new_figure(specs)
+        display_data = self._fill_chart(
+            fig, data, filtered_data, symbol_info['symbol'], specs)
 
-        # Add technical indicators
-        self._add_rsi_chart(fig, filtered_data)
-        self._add_macd_chart(fig, filtered_data)
+        # Fill in the title and the data dependent axis ranges
+        self._update_chart_layout(fig, symbol_info, display_data, specs)
 
-        # Update layout and styling
-        self._update_chart_layout(fig, symbol_info, filtered_data)
+        if as_dict:
+            return fig
+        # The skeleton was validated when it was built and the arrays are
+        # plain NumPy, so skip plotly's validation pass
+        return go.Figure(fig, _validate=False)
 
-        return fig
+    def create_history_chart(self, data: pd.DataFrame, symbol_info: dict,
+                             time_range: str, indicators=None):
+        """
+        Chart the full history, zoomed to a time range.
 
-    def _add_candlestick_chart(self, fig: go.Figure, data: pd.DataFrame):
-        """Add candlestick chart to the main subplot."""
-        fig.add_trace(
-            go.Candlestick(
-                x=data.index,
-                open=data['Open'],
-                high=data['High'],
-                low=data['Low'],
-                close=data['Close'],
-                name='Price',
-                increasing_line_color=self.colors['success'],
-                decreasing_line_color=self.colors['danger'],
-                increasing_fillcolor=self.colors['success'],
-                decreasing_fillcolor=self.colors['danger']
-            ),
-            row=2, col=1
-        )
+        The returned range data lets the browser switch time ranges by
+        only changing axis ranges (see ``assets/clientside.js``).
 
-    def _add_volume_chart(self, fig: go.Figure, data: pd.DataFrame):
-        """Add volume chart as secondary y-axis."""
-        # Color volume bars based on price movement
-        colors = []
-        for i in range(len(data)):
-            if data['Close'].iloc[i] >= data['Open'].iloc[i]:
-                colors.append(self.colors['success'])
-            else:
-                colors.append(self.colors['danger'])
-
-        fig.add_trace(
-            go.Bar(
-                x=data.index,
-                y=data['Volume'],
-                name='Volume',
-                marker={'color': colors, 'opacity': 0.6},
-                yaxis='y2'
-            ),
-            secondary_y=True,
-            row=2, col=1
-        )
+        Args:
+            data (pd.DataFrame): Full historical data
+            symbol_info (dict): Stock information
+            time_range (str): Initially displayed time range
+            indicators (iterable): Indicators to draw (default: all)
 
-    def _add_moving_averages(self, fig: go.Figure, data: pd.DataFrame):
-        """Add moving average lines."""
-        ma20 = calculate_moving_average(data, 20)
-        ma50 = calculate_moving_average(data, 50)
-
-        fig.add_trace(
-            go.Scatter(
-                x=data.index,
-                y=ma20,
-                name='MA20',
-                line=dict(color=self.colors['info'], width=2),
-                opacity=0.8
-            ),
-            row=2, col=1
-        )
+        Returns:
+            tuple: (go.Figure, range data dict for the ``range-data`` store)
+        """
+        fig = self.create_main_chart(data, symbol_info, data, indicators,
+                                     as_dict=True)
+        range_data = self.time_range_data(
+            fig, data, symbol_info['symbol'], indicators)
+        for path, value in self.time_window_layout(range_data, time_range):
+            target = fig['layout']
+            for key in path[:-1]:
+                target = target.setdefault(key, {})
+            target[path[-1]] = value
+        return go.Figure(fig, _validate=False), range_data
+
+    def time_range_data(self, fig: dict, data: pd.DataFrame, symbol: str,
+                        indicators=None) -> dict:
+        """
+        Collect what is needed to zoom a full-history chart in the browser.
 
-        fig.add_trace(
-            go.Scatter(
-                x=data.index,
-                y=ma50,
-                name='MA50',
-                line=dict(color=self.colors['warning'], width=2),
-                opacity=0.8
-            ),
-            row=2, col=1
-        )
+        Holds the displayed dates, the per-bar values the y-axis ranges are
+        computed from, and the first and last displayed bar of every time
+        range in ``TIME_RANGES``.
 
-    def _add_bollinger_bands(self, fig: go.Figure, data: pd.DataFrame):
-        """Add Bollinger Bands."""
-        upper, middle, lower = calculate_bollinger_bands(data)
-
-        # Add upper band
-        fig.add_trace(
-            go.Scatter(
-                x=data.index,
-                y=upper,
-                name='BB Upper',
-                line=dict(color=self.colors['tertiary'], width=1, dash='dash'),
-                opacity=0.6
-            ),
-            row=2, col=1
-        )
+        Args:
+            fig (dict): Figure dict made by ``create_main_chart`` from ``data``
+            data (pd.DataFrame): Full historical data
+            symbol (str): Stock ticker symbol
+            indicators (iterable): Indicators drawn on ``fig`` (default: all)
 
-        # Add lower band with fill
-        fig.add_trace(
-            go.Scatter(
-                x=data.index,
-                y=lower,
-                name='BB Lower',
-                line=dict(color=self.colors['tertiary'], width=1, dash='dash'),
-                fill='tonexty',
-                fillcolor=f"rgba(125, 126, 117, 0.1)",
-                opacity=0.6
-            ),
-            row=2, col=1
-        )
+        Returns:
+            dict: JSON serialisable range data
+        """
+        max_points = self.config['max_points']
+        display_data = downsample_ohlcv(data, max_points)
+        index = display_data.index
+
+        windows = {}
+        for time_range in TIME_RANGES:
+            start_date, end_date = get_date_range_from_data(data, time_range)
+            if start_date is None:
+                continue
+            # Bars are bucketed on long histories; take the bucket holding
+            # the start date
+            first = max(int(index.searchsorted(start_date, side='right')) - 1, 0)
+            last = int(index.searchsorted(end_date, side='right')) - 1
+            windows[time_range] = [first, last]
+
+        # Per-bar bounds over all traces of each autoranged indicator pane
+        specs = [spec for spec in get_indicator_specs(indicators)
+                 if spec.pane and spec.y_range is None]
+        results = self._compute_indicators(specs, data, data, symbol)
+        panes = []
+        for spec in specs:
+            values = np.vstack([
+                self._trace_series(spec, trace, results).to_numpy(dtype=np.float64)
+                for trace in spec.traces
+            ])
+            with np.errstate(invalid='ignore'):
+                low = downsample_buckets(pd.Series(
+                    np.fmin.reduce(values), index=data.index), max_points, 'min')
+                high = downsample_buckets(pd.Series(
+                    np.fmax.reduce(values), index=data.index), max_points, 'max')
+            panes.append({
+                'axis': self._axis_key(fig, self._slot(spec, 0)),
+                'low': _json_list(low),
+                'high': _json_list(high),
+            })
+
+        return {
+            'dates': np.datetime_as_string(self._date_array(index)).tolist(),
+            'high': display_data['High'].tolist(),
+            'low': display_data['Low'].tolist(),
+            'volume': display_data['Volume'].astype(float).tolist(),
+            'panes': panes,
+            'windows': windows,
+            'price_offset_percentage': self.config['price_offset_percentage'],
+            'volume_percentage': self.config['volume_percentage'],
+            'axes': {
+                'x': [key for key in fig['layout'] if key.startswith('xaxis')],
+                'price': self._axis_key(fig, 'price'),
+                'volume': self._axis_key(fig, 'volume'),
+            },
+        }
 
-    def _add_rsi_chart(self, fig: go.Figure, data: pd.DataFrame):
-        """Add RSI indicator to top subplot."""
-        rsi = calculate_rsi(data, self.config['rsi_period'])
+    @staticmethod
+    def time_window_layout(range_data: dict, time_range: str) -> list:
+        """
+        Get the layout changes that zoom a full-history chart to a time range.
 
-        fig.add_trace(
-            go.Scatter(
-                x=data.index,
-                y=rsi,
-                name='RSI',
-                line=dict(color='purple', width=2)
-            ),
-            row=1, col=1
-        )
+        Mirrors ``setTimeRange`` in ``assets/clientside.js``, which applies
+        the same changes in the browser.
 
-        # Add RSI reference lines
-        fig.add_hline(y=70, line_dash="dash", line_color="red",
-                      opacity=0.7, row=1, col=1)
-        fig.add_hline(y=30, line_dash="dash", line_color="green",
-                      opacity=0.7, row=1, col=1)
-        fig.add_hline(y=50, line_dash="dot", line_color="gray",
-                      opacity=0.5, row=1, col=1)
-
-    def _add_macd_chart(self, fig: go.Figure, data: pd.DataFrame):
-        """Add MACD indicator to bottom subplot."""
-        macd_line, signal_line, histogram = calculate_macd(data)
-
-        # MACD line
-        fig.add_trace(
-            go.Scatter(
-                x=data.index,
-                y=macd_line,
-                name='MACD',
-                line=dict(color='blue', width=2)
-            ),
-            row=3, col=1
-        )
+        Args:
+            range_data (dict): Result of ``time_range_data``
+            time_range (str): Time range to show
 
-        # Signal line
-        fig.add_trace(
-            go.Scatter(
-                x=data.index,
-                y=signal_line,
-                name='Signal',
-                line=dict(color='red', width=2)
-            ),
-            row=3, col=1
-        )
+        Returns:
+            list: (layout path, value) pairs
+        """
+        window = range_data['windows'].get(time_range)
+        if window is None:
+            return []
+        first, last = window
+        axes = range_data['axes']
+
+        high = max(range_data['high'][first:last + 1])
+        low = min(range_data['low'][first:last + 1])
+        price_offset = (high - low) * range_data['price_offset_percentage']
+        volume = range_data['volume'][first:last + 1]
+        volume_max = sum(volume) / len(volume) / range_data['volume_percentage']
+
+        changes = [((key, 'range'), [range_data['dates'][first],
+                                     range_data['dates'][last]])
+                   for key in axes['x']]
+        changes += [
+            ((axes['price'], 'range'), [low - price_offset, high + price_offset]),
+            ((axes['volume'], 'range'), [0, volume_max]),
+        ]
+
+        for pane in range_data['panes']:
+            pane_low = [v for v in pane['low'][first:last + 1] if v is not None]
+            pane_high = [v for v in pane['high'][first:last + 1] if v is not None]
+            if pane_low and pane_high:
+                padding = (max(pane_high) - min(pane_low)) * 0.05
+                changes.append(((pane['axis'], 'range'),
+                                [min(pane_low) - padding, max(pane_high) + padding]))
+        return changes
+
+    def patch_time_range(self, patch, data: pd.DataFrame,
+                         filtered_data: pd.DataFrame, symbol: str, indicators):
+        """
+        Update a rendered chart to a new time range.
+
+        Only the data of the drawn traces and the axis ranges are sent;
+        layout, styling and hidden slots are left as they are.
+
+        Args:
+            patch (dash.Patch): Patch of the rendered figure
+            data (pd.DataFrame): Full historical data
+            filtered_data (pd.DataFrame): Data for the new time range
+            symbol (str): Stock ticker symbol
+            indicators (iterable): Indicators currently drawn
+        """
+        specs = get_indicator_specs(indicators)
+        fig = self._new_figure(specs)
+        display_data = self._fill_chart(fig, data, filtered_data, symbol, specs)
+        self._copy_slots(fig, patch, ('price', 'volume') + self._slots_for(specs))
+
+        for key, axis_range in self._axis_ranges(fig, display_data).items():
+            patch['layout'][key]['range'] = axis_range
+        # Drop any zoom on the previous range
+        for key in fig['layout']:
+            if key.startswith('xaxis'):
+                patch['layout'][key]['autorange'] = True
+
+    def patch_indicators(self, patch, data: pd.DataFrame,
+                         filtered_data: pd.DataFrame, symbol: str, indicators,
+                         added=(), removed=()):
+        """
+        Add and remove overlay indicators on a rendered chart.
+
+        Removed indicators get their empty, hidden skeleton slots back;
+        price, volume and untouched indicators are not sent. Indicators with
+        their own pane change the layout and need a full chart instead (see
+        ``changes_panes``).
 
-        # Histogram
-        colors = ['green' if val >= 0 else 'red' for val in histogram]
-        fig.add_trace(
-            go.Bar(
-                x=data.index,
-                y=histogram,
-                name='Histogram',
-                marker={'color': colors, 'opacity': 0.6}
+        Args:
+            patch (dash.Patch): Patch of the rendered figure
+            data (pd.DataFrame): Full historical data
+            filtered_data (pd.DataFrame): Data for the displayed time range
+            symbol (str): Stock ticker symbol
+            indicators (iterable): Indicators drawn after the change
+            added (iterable): Indicators to draw
+            removed (iterable): Indicators to remove
+        """
+        added = get_indicator_specs(added)
+        removed = get_indicator_specs(removed)
+        if self.changes_panes(added + removed):
+            raise ValueError("Indicators with their own pane need a full chart")
+
+        fig = self._new_figure(get_indicator_specs(indicators))
+        if added:
+            self._fill_chart(fig, data, filtered_data, symbol, added, price=False)
+        self._copy_slots(fig, patch, self._slots_for(added) + self._slots_for(removed))
+
+    def create_comparison_chart(self, performance: pd.DataFrame) -> go.Figure:
+        """
+        Chart the percent performance of several symbols as lines.
+
+        Args:
+            performance (pd.DataFrame): Percent change per symbol, e.g. from
+                ``utils.comparison.performance``
+
+        Returns:
+            go.Figure: One line per symbol around a 0% reference line
+        """
+        symbols = list(performance.columns)
+        traces = []
+        for symbol in symbols:
+            series = downsample_series(performance[symbol], self.config['max_points'])
+            traces.append(go.Scatter(
+                x=self._x_array(series.index),
+                y=self._y_array(series.to_numpy(dtype=np.float64)),
+                mode='lines', name=symbol, uid=f"compare.{symbol}",
+                hovertemplate='%{y:.2f}%'))
+
+        fig = go.Figure(traces)
+        fig.add_hline(y=0, line_dash='dot', line_color=self.colors['tertiary'])
+        fig.update_layout(
+            title={
+                'text': ' vs '.join(symbols),
+                'x': 0.5,
+                'font': {'size': 20, 'color': self.colors['dark']}
+            },
+            plot_bgcolor=self.colors['background'],
+            paper_bgcolor=self.colors['paper'],
+            font={'color': self.colors['dark']},
+            height=800,
+            showlegend=True,
+            hovermode='x unified',
+            legend=dict(
+                orientation="h",
+                yanchor="bottom",
+                y=1.02,
+                xanchor="right",
+                x=1
             ),
-            row=3, col=1
+            margin=dict(l=80, r=80, t=100, b=80)
         )
+        fig.update_xaxes(type='date', title="Date", showgrid=True,
+                         gridcolor='rgba(255,255,255,0.3)', gridwidth=1)
+        fig.update_yaxes(title="Performance", ticksuffix='%', showgrid=True,
+                         gridcolor='rgba(255,255,255,0.3)', gridwidth=1)
+        return fig
 
-    def _update_chart_layout(self, fig: go.Figure, symbol_info: dict,
-                             filtered_data: pd.DataFrame):
-        """Update chart layout and styling."""
-        # Calculate price range for main chart
-        price_offset = (filtered_data['High'].max(
-        ) - filtered_data['Low'].min()) * self.config['price_offset_percentage']
-        min_price = filtered_data['Low'].min() - price_offset
-        max_price = filtered_data['High'].max() + price_offset
+    @staticmethod
+    def changes_panes(indicators) -> bool:
+        """Whether any of the indicators is drawn in its own subplot pane."""
+        return any(spec.pane for spec in get_indicator_specs(indicators))
 
-        # Calculate volume scaling
-        avg_volume = filtered_data['Volume'].mean()
-        volume_max = avg_volume / self.config['volume_percentage']
+    def apply_symbol_info(self, fig, symbol_info: dict, indicators=None):
+        """
+        Update the chart and price subplot titles from stock info.
+
+        Works on a figure as well as on a ``dash.Patch`` of one, so the
+        titles can be filled in once the info has loaded in the background.
+
+        Args:
+            fig: Figure, figure dict or ``dash.Patch`` to update
+            symbol_info (dict): Stock information
+            indicators (iterable): Indicators drawn on the figure
+                (default: all registered indicators)
+        """
+        fig['layout']['title']['text'] = self._get_title(symbol_info)
+        # Subplot titles are annotations in row order; the panes above the
+        # price chart come first
+        price_row = len(self._panes(get_indicator_specs(indicators), 'above'))
+        fig['layout']['annotations'][price_row]['text'] = self._get_short_name(
+            symbol_info)
+
+    def _get_short_name(self, symbol_info: dict) -> str:
+        """Get the display name for a symbol."""
+        return symbol_info.get('shortName') or symbol_info['symbol']
+
+    def _get_title(self, symbol_info: dict) -> str:
+        """Get the chart title for a symbol."""
+        return f"{self._get_short_name(symbol_info)} ({symbol_info['symbol']})"
+
+    def _get_indicator(self, name: str, data: pd.DataFrame,
+                       history: pd.DataFrame = None, symbol: str = None, **params):
+        """
+        Get indicator values for the displayed data.
+
+        With ``history`` and ``symbol`` the indicator comes from the shared
+        indicator cache, computed on the full history; otherwise it is
+        computed on ``data`` directly.
+        """
+        if history is None or symbol is None:
+            return INDICATOR_FUNCTIONS[name](data, **params)
+        return indicator_cache.get(symbol, name, history, view=data.index, **params)
+
+    def _fill_chart(self, fig: dict, data: pd.DataFrame,
+                    filtered_data: pd.DataFrame, symbol: str, specs,
+                    price: bool = True) -> pd.DataFrame:
+        """
+        Fill the trace slots of a figure dict.
+
+        Indicators are computed on the full history and sliced to the view.
+
+        Returns:
+            pd.DataFrame: The displayed (possibly downsampled) bars
+        """
+        # Keep the payload bounded on long ranges
+        display_data = downsample_ohlcv(filtered_data, self.config['max_points'])
+
+        # One x array shared by every trace drawn on the displayed bars
+        x = self._x_array(display_data.index)
+
+        # Add main chart components
+        if price:
+            self._add_candlestick_chart(fig, display_data, x)
+            self._add_volume_chart(fig, display_data, x)
+
+        # Add technical indicators
+        results = self._compute_indicators(specs, filtered_data, data, symbol)
+        for spec in specs:
+            self._add_indicator(fig, spec, results, x, data, filtered_data.index, symbol)
+
+        return display_data
+
+    def _compute_indicators(self, specs, data: pd.DataFrame,
+                            history: pd.DataFrame = None, symbol: str = None) -> dict:
+        """
+        Compute every distinct (function, params) the specs' traces need.
+
+        Returns:
+            dict: Results keyed by ``_task_key``
+        """
+        with stage_timer('indicators'):
+            return self._run_indicator_tasks(specs, data, history, symbol)
+
+    def _run_indicator_tasks(self, specs, data, history, symbol) -> dict:
+        """Run the indicator calculations, concurrently when there are several."""
+        tasks = {}
+        for spec in specs:
+            for trace in spec.traces:
+                params = spec.trace_params(trace)
+                tasks.setdefault(self._task_key(spec, trace), (spec.function, params))
+
+        def _run(task):
+            name, params = task
+            return self._get_indicator(name, data, history, symbol, **params)
+
+        if len(tasks) < 2:
+            return {key: _run(task) for key, task in tasks.items()}
+        futures = {key: _indicator_executor.submit(_run, task)
+                   for key, task in tasks.items()}
+        return {key: future.result() for key, future in futures.items()}
+
+    @staticmethod
+    def _task_key(spec: IndicatorSpec, trace) -> tuple:
+        """Identify the calculation a trace needs."""
+        return spec.function, tuple(sorted(spec.trace_params(trace).items()))
+
+    def _trace_series(self, spec: IndicatorSpec, trace, results: dict) -> pd.Series:
+        """Get the series a trace draws from the computed results."""
+        result = results[self._task_key(spec, trace)]
+        return result if trace.output is None else result[trace.output]
+
+    @staticmethod
+    def _slot(spec, position) -> str:
+        """Get the slot id of an indicator trace; also its plotly uid."""
+        return f"{spec.key}.{position}"
+
+    def _slots_for(self, specs) -> tuple:
+        """Get the trace slots drawn by the given indicators."""
+        return tuple(self._slot(spec, position)
+                     for spec in specs for position in range(len(spec.traces)))
+
+    @staticmethod
+    def _slot_index(fig: dict, slot: str) -> int:
+        """Get the position of a trace slot in the figure's data."""
+        for index, trace in enumerate(fig['data']):
+            if trace.get('uid') == slot:
+                return index
+        raise KeyError(f"No trace slot {slot!r} in figure")
+
+    def _copy_slots(self, fig: dict, patch, slots):
+        """Copy trace slots into a patch."""
+        for slot in slots:
+            index = self._slot_index(fig, slot)
+            patch['data'][index] = _encode_arrays(dict(fig['data'][index]))
+
+    @staticmethod
+    def _date_array(index: pd.Index) -> np.ndarray:
+        """
+        Convert an index to a NumPy array plotly can take without conversion.
+
+        Timezone-aware dates become naive wall-clock datetime64 values, which
+        is how plotly displays them anyway. Bars are stamped to the second;
+        nanosecond values would serialize with nine extra digits each.
+        """
+        if isinstance(index, pd.DatetimeIndex):
+            if index.tz is not None:
+                index = index.tz_localize(None)
+            return index.to_numpy().astype('datetime64[s]', copy=False)
+        return np.asarray(index)
+
+    def _x_array(self, index: pd.Index) -> np.ndarray:
+        """
+        Get the x values of a trace.
+
+        With ``compact_payload`` dates are sent as float64 epoch milliseconds,
+        which plotly serializes as a base64 typed array instead of one ISO
+        string per bar; the date axes are typed explicitly in the skeleton.
+        """
+        x = self._date_array(index)
+        if self.config.get('compact_payload') and x.dtype.kind == 'M':
+            return x.astype('datetime64[ms]').view(np.int64).astype(np.float64)
+        return x
+
+    def _y_array(self, values) -> np.ndarray:
+        """
+        Get the values of a trace in the smallest typed array plotly can send.
+
+        With ``compact_payload`` floats become float32 when they fit its
+        range (seven significant digits are well below a pixel), and integers
+        too wide for a 32-bit typed array become float64, as plotly.js has
+        no 64-bit integer arrays. Without typed arrays (plotly < 6) values
+        are sent as text, where float32 only adds rounding noise.
+        """
+        values = np.asarray(values)
+        if not self.config.get('compact_payload') or not TYPED_ARRAYS:
+            return values
+        if values.dtype.kind == 'f':
+            finite = values[np.isfinite(values)]
+            if finite.size == 0 or np.abs(finite).max() <= _FLOAT32_MAX:
+                return values.astype(np.float32, copy=False)
+        elif values.dtype.kind in 'iu' and values.dtype.itemsize > 4:
+            info = np.iinfo(np.int32 if values.dtype.kind == 'i' else np.uint32)
+            if len(values) and (values.min() < info.min or values.max() > info.max):
+                return values.astype(np.float64)
+            return values.astype(info.dtype)
+        return values
+
+    def _line_xy(self, series: pd.Series, x: np.ndarray):
+        """
+        Get x/y arrays for a line trace.
+
+        Series within the point budget reuse the shared x array; longer ones
+        are reduced with LTTB and get their own x.
+        """
+        if len(series) == len(x):
+            return x, self._y_array(series.to_numpy(dtype=np.float64))
+        thinned = downsample_series(series, self.config['max_points'])
+        return (self._x_array(thinned.index),
+                self._y_array(thinned.to_numpy(dtype=np.float64)))
+
+    def _bucket_y(self, series: pd.Series, how: str = 'absmax') -> np.ndarray:
+        """Get y values reduced to the displayed buckets, aligned with the shared x."""
+        return self._y_array(downsample_buckets(
+            series, self.config['max_points'], how).to_numpy(dtype=np.float64))
+
+    @staticmethod
+    def _two_colour_marker(condition: np.ndarray, false_colour: str,
+                           true_colour: str, opacity: float = 0.6) -> dict:
+        """Build a bar marker coloured per element by a boolean array."""
+        return {
+            'color': condition.astype(np.float64),
+            'colorscale': [[0, false_colour], [1, true_colour]],
+            'cmin': 0,
+            'cmax': 1,
+            'opacity': opacity,
+        }
+
+    def _new_figure(self, specs) -> dict:
+        """
+        Get a fresh copy of the figure skeleton to fill in.
+
+        The plotly template is shared with the skeleton rather than copied;
+        it is never modified.
+        """
+        with stage_timer('skeleton'):
+            skeleton = self._get_skeleton(specs)
+            layout = {key: copy.deepcopy(value)
+                      for key, value in skeleton['layout'].items() if key != 'template'}
+            layout['template'] = skeleton['layout']['template']
+            return {'data': copy.deepcopy(skeleton['data']), 'layout': layout}
+
+    def _get_skeleton(self, specs) -> dict:
+        """Get the cached figure skeleton for the specs' panes, building it on first use."""
+        panes = tuple(spec.key for spec in specs if spec.pane)
+        key = (tuple(sorted(self.colors.items())),
+               tuple(map(id, INDICATOR_REGISTRY.values())), panes)
+        skeleton = _SKELETONS.get(key)
+        if skeleton is None:
+            skeleton = _SKELETONS[key] = self._build_skeleton(
+                get_indicator_specs(panes))
+        return skeleton
+
+    @staticmethod
+    def _panes(specs, position: str) -> list:
+        """Get the specs drawn in their own pane on one side of the price chart."""
+        return [spec for spec in specs
+                if spec.pane and spec.pane_position == position]
+
+    def _build_skeleton(self, pane_specs) -> dict:
+        """
+        Build the data independent part of the chart.
+
+        Subplots for the price chart and the given indicator panes, styling,
+        reference lines and one hidden, empty trace per slot: price, volume,
+        every registered overlay indicator and the pane indicators. Each
+        trace's ``uid`` is its slot id. Filling a slot makes it visible.
+        """
+        above = self._panes(pane_specs, 'above')
+        below = self._panes(pane_specs, 'below')
+        rows = above + [None] + below
+        price_row = len(above) + 1
+
+        # The price chart is three times the height of an indicator pane
+        fig = make_subplots(
+            rows=len(rows), cols=1,
+            shared_xaxes=True,
+            row_heights=[0.6 if spec is None else 0.2 for spec in rows],
+            vertical_spacing=0.05,
+            specs=[[{"secondary_y": spec is None}] for spec in rows],
+            # The price title is replaced per symbol by apply_symbol_info
+            subplot_titles=[spec.pane if spec else 'Price' for spec in rows]
+        )
+
+        fig.add_trace(go.Candlestick(
+            name='Price',
+            uid='price',
+            visible=False,
+            increasing_line_color=self.colors['success'],
+            decreasing_line_color=self.colors['danger'],
+            increasing_fillcolor=self.colors['success'],
+            decreasing_fillcolor=self.colors['danger']
+        ), row=price_row, col=1)
+        fig.add_trace(go.Bar(name='Volume', uid='volume', visible=False),
+                      secondary_y=True, row=price_row, col=1)
+
+        overlays = [spec for spec in INDICATOR_REGISTRY.values() if not spec.pane]
+        for spec in overlays + [spec for spec in rows if spec is not None]:
+            row = rows.index(spec) + 1 if spec.pane else price_row
+            for position, trace in enumerate(spec.traces):
+                trace_type = go.Bar if trace.kind == 'bar' else go.Scatter
+                fig.add_trace(trace_type(
+                    name=trace.name, uid=self._slot(spec, position),
+                    visible=False, **trace.style
+                ), row=row, col=1)
+
+            for y, line in spec.reference_lines:
+                fig.add_hline(y=y, row=row, col=1, **line)
+
+            if spec.pane:
+                fig.update_yaxes(title=spec.pane, row=row, col=1)
+                if spec.y_range is not None:
+                    fig.update_yaxes(range=spec.y_range, row=row, col=1)
 
-        # Update layout
         fig.update_layout(
             title={
-                'text': f"{symbol_info.get('shortName', symbol_info['symbol'])} ({symbol_info['symbol']})",
+                'text': '',
                 'x': 0.5,
                 'font': {'size': 20, 'color': self.colors['dark']}
             },
@@ -251,19 +657,18 @@ class ChartBuilder:
         )
 
         # Update axes
-        fig.update_yaxes(range=[0, 100], title="RSI", row=1, col=1)
-        fig.update_yaxes(range=[min_price, max_price],
-                         title="Price ($)", row=2, col=1)
-        fig.update_yaxes(range=[0, volume_max],
-                         title="Volume", secondary_y=True, row=2, col=1)
-        fig.update_yaxes(title="MACD", row=3, col=1)
-
-        # Remove range slider and update x-axis
+        fig.update_yaxes(title="Price ($)", row=price_row, col=1)
+        fig.update_yaxes(title="Volume", secondary_y=True, row=price_row, col=1)
+
+        # Remove range slider and update x-axis. The axes are typed as dates
+        # so epoch millisecond x values (compact_payload) are not taken as
+        # plain numbers
         fig.update_layout(xaxis_rangeslider_visible=False)
-        fig.update_xaxes(title="Date", row=3, col=1)
+        fig.update_xaxes(type='date')
+        fig.update_xaxes(title="Date", row=len(rows), col=1)
 
         # Style grid
-        for row in [1, 2, 3]:
+        for row in range(1, len(rows) + 1):
             fig.update_yaxes(
                 showgrid=True,
                 gridcolor='rgba(255,255,255,0.3)',
@@ -278,3 +683,118 @@ class ChartBuilder:
                 row=row,
                 col=1
             )
+
+        return fig.to_dict()
+
+    def _fill_trace(self, fig: dict, slot: str, **values):
+        """Set the data of a trace slot and show it."""
+        trace = fig['data'][self._slot_index(fig, slot)]
+        trace.update(values)
+        trace['visible'] = True
+
+    def _axis_key(self, fig: dict, slot: str) -> str:
+        """Get the layout key of the y-axis a trace slot is drawn on."""
+        return 'yaxis' + fig['data'][self._slot_index(fig, slot)]['yaxis'][1:]
+
+    def _add_candlestick_chart(self, fig: dict, data: pd.DataFrame,
+                               x: np.ndarray = None):
+        """Add candlestick chart to the main subplot."""
+        self._fill_trace(
+            fig, 'price',
+            x=x if x is not None else self._x_array(data.index),
+            open=self._y_array(data['Open'].to_numpy()),
+            high=self._y_array(data['High'].to_numpy()),
+            low=self._y_array(data['Low'].to_numpy()),
+            close=self._y_array(data['Close'].to_numpy())
+        )
+
+    def _add_volume_chart(self, fig: dict, data: pd.DataFrame,
+                          x: np.ndarray = None):
+        """Add volume chart as secondary y-axis."""
+        # Color volume bars based on price movement. A numeric 0/1 array
+        # mapped through a two-colour scale avoids per-element validation
+        # of colour strings.
+        rising = data['Close'].to_numpy() >= data['Open'].to_numpy()
+
+        self._fill_trace(
+            fig, 'volume',
+            x=x if x is not None else self._x_array(data.index),
+            y=self._y_array(data['Volume'].to_numpy()),
+            marker=self._two_colour_marker(
+                rising, self.colors['danger'], self.colors['success'])
+        )
+
+    def _add_indicator(self, fig: dict, spec: IndicatorSpec, results: dict,
+                       x: np.ndarray, history: pd.DataFrame = None,
+                       view: pd.Index = None, symbol: str = None):
+        """
+        Fill the trace slots of one indicator from its computed results.
+
+        With ``history``, ``view`` and ``symbol`` the points LTTB keeps of
+        long lines come from the indicator cache.
+        """
+        for position, trace in enumerate(spec.traces):
+            series = self._trace_series(spec, trace, results)
+            if trace.reduce == 'line':
+                if (len(series) != len(x) and history is not None
+                        and symbol is not None):
+                    series = indicator_cache.get_thinned(
+                        symbol, spec.function, history, view,
+                        self.config['max_points'], trace.output,
+                        **spec.trace_params(trace))
+                trace_x, y = self._line_xy(series, x)
+            else:
+                trace_x, y = x, self._bucket_y(series, trace.reduce)
+
+            values = {'x': trace_x, 'y': y}
+            if trace.sign_colors:
+                values['marker'] = self._two_colour_marker(y >= 0, *trace.sign_colors)
+            self._fill_trace(fig, self._slot(spec, position), **values)
+
+    def _update_chart_layout(self, fig: dict, symbol_info: dict,
+                             filtered_data: pd.DataFrame, specs):
+        """Fill in the title and the price and volume axis ranges."""
+        self.apply_symbol_info(fig, symbol_info, specs)
+        for key, axis_range in self._axis_ranges(fig, filtered_data).items():
+            fig['layout'][key]['range'] = axis_range
+
+    def _axis_ranges(self, fig: dict, filtered_data: pd.DataFrame) -> dict:
+        """Get the price and volume axis ranges keyed by layout axis name."""
+        # Calculate price range for main chart
+        price_offset = (filtered_data['High'].max(
+        ) - filtered_data['Low'].min()) * self.config['price_offset_percentage']
+        min_price = filtered_data['Low'].min() - price_offset
+        max_price = filtered_data['High'].max() + price_offset
+
+        # Calculate volume scaling
+        avg_volume = filtered_data['Volume'].mean()
+        volume_max = avg_volume / self.config['volume_percentage']
+
+        return {
+            self._axis_key(fig, 'price'): [float(min_price), float(max_price)],
+            self._axis_key(fig, 'volume'): [0, float(volume_max)],
+        }
+
+
+def _encode_arrays(trace: dict) -> dict:
+    """
+    Encode the NumPy arrays of a trace dict in place, as go.Figure.to_dict() does.
+
+    Arrays become base64 typed arrays where plotly supports them, and
+    plain lists otherwise.
+    """
+    if TYPED_ARRAYS:
+        convert_to_base64(trace)
+        return trace
+    for key, value in trace.items():
+        if isinstance(value, np.ndarray):
+            trace[key] = value.tolist()
+        elif isinstance(value, dict):
+            _encode_arrays(value)
+    return trace
+
+
+def _json_list(series: pd.Series) -> list:
+    """Convert a float series to a list with None for NaN."""
+    values = series.to_numpy(dtype=np.float64)
+    return np.where(np.isnan(values), None, values).tolist()
@@ -0,0 +1,167 @@
+"""
+Registry of the technical indicators the chart can draw.
+
+Each indicator is described once by an ``IndicatorSpec``: which function
+computes it, with which parameters, whether it overlays the price chart or
+gets its own subplot pane, and how each of its traces is styled. The chart
+builder, the callbacks and the indicator checklist all read this registry,
+so a new indicator only needs a calculation function in
+``utils.indicators.INDICATOR_FUNCTIONS`` and a ``register_indicator`` call.
+"""
+from collections import OrderedDict
+from typing import Iterable, List, Optional
+
+from config import COLORS, CHART_CONFIG
+
+
+class TraceSpec:
+    """
+    One trace drawn for an indicator.
+
+    Args:
+        name (str): Legend name; unique across the registry
+        output (int): Position in the indicator's result tuple, or None when
+            the indicator returns a single series
+        params (dict): Parameters overriding the indicator's own
+        style (dict): Plotly trace properties (line, opacity, fill, ...)
+        kind (str): 'scatter' or 'bar'
+        reduce (str): How long series are downsampled: 'line' (LTTB) or a
+            bucket reduction, 'max', 'min' or 'absmax'
+        sign_colors (tuple): (negative, positive) bar colours by sign
+    """
+
+    def __init__(self, name: str, output: Optional[int] = None,
+                 params: Optional[dict] = None, style: Optional[dict] = None,
+                 kind: str = 'scatter', reduce: str = 'line',
+                 sign_colors: Optional[tuple] = None):
+        self.name = name
+        self.output = output
+        self.params = params or {}
+        self.style = style or {}
+        self.kind = kind
+        self.reduce = reduce
+        self.sign_colors = sign_colors
+
+
+class IndicatorSpec:
+    """
+    A selectable indicator.
+
+    Args:
+        key (str): Identifier used in the indicator checklist
+        label (str): Checklist label
+        function (str): Calculation function, a key of INDICATOR_FUNCTIONS
+        params (dict): Calculation parameters shared by all traces
+        traces (list): ``TraceSpec`` for each drawn trace, in drawing order
+        pane (str): Title of the indicator's own subplot, or None to overlay
+            the price chart
+        pane_position (str): 'above' or 'below' the price chart
+        y_range (list): Fixed y-axis range of the pane (default: autorange)
+        reference_lines (list): (y, line properties) horizontal lines drawn
+            across the pane
+    """
+
+    def __init__(self, key: str, label: str, function: str,
+                 params: Optional[dict] = None, traces: Iterable[TraceSpec] = (),
+                 pane: Optional[str] = None, pane_position: str = 'below',
+                 y_range: Optional[list] = None, reference_lines: Iterable = ()):
+        self.key = key
+        self.label = label
+        self.function = function
+        self.params = params or {}
+        self.traces = list(traces)
+        self.pane = pane
+        self.pane_position = pane_position
+        self.y_range = y_range
+        self.reference_lines = list(reference_lines)
+
+    def trace_params(self, trace: TraceSpec) -> dict:
+        """Get the calculation parameters of one trace."""
+        return {**self.params, **trace.params}
+
+
+# Registered indicators in drawing order
+INDICATOR_REGISTRY = OrderedDict()
+
+
+def register_indicator(spec: IndicatorSpec) -> IndicatorSpec:
+    """
+    Add an indicator to the registry, replacing one with the same key.
+
+    Args:
+        spec (IndicatorSpec): Indicator to register
+
+    Returns:
+        IndicatorSpec: The registered spec
+    """
+    INDICATOR_REGISTRY[spec.key] = spec
+    return spec
+
+
+def get_indicator_specs(indicators=None) -> List[IndicatorSpec]:
+    """
+    Resolve indicators to specs in registry order.
+
+    Args:
+        indicators (iterable): Keys or specs (default: all registered);
+            unknown keys are ignored
+
+    Returns:
+        list: Selected specs
+    """
+    if indicators is None:
+        return list(INDICATOR_REGISTRY.values())
+    keys = {item.key if isinstance(item, IndicatorSpec) else item
+            for item in indicators}
+    return [spec for key, spec in INDICATOR_REGISTRY.items() if key in keys]
+
+
+register_indicator(IndicatorSpec(
+    key='ma', label='Moving Averages', function='ma',
+    traces=[
+        TraceSpec('MA20', params={'period': 20}, style={
+            'line': dict(color=COLORS['info'], width=2), 'opacity': 0.8}),
+        TraceSpec('MA50', params={'period': 50}, style={
+            'line': dict(color=COLORS['warning'], width=2), 'opacity': 0.8}),
+    ]
+))
+
+# Bucket envelopes keep both bands on the shared dates for the fill
+register_indicator(IndicatorSpec(
+    key='bb', label='Bollinger Bands', function='bb',
+    traces=[
+        TraceSpec('BB Upper', output=0, reduce='max', style={
+            'line': dict(color=COLORS['tertiary'], width=1, dash='dash'),
+            'opacity': 0.6}),
+        TraceSpec('BB Lower', output=2, reduce='min', style={
+            'line': dict(color=COLORS['tertiary'], width=1, dash='dash'),
+            'fill': 'tonexty',
+            'fillcolor': "rgba(125, 126, 117, 0.1)",
+            'opacity': 0.6}),
+    ]
+))
+
+register_indicator(IndicatorSpec(
+    key='rsi', label='RSI', function='rsi',
+    params={'period': CHART_CONFIG['rsi_period']},
+    pane='RSI', pane_position='above', y_range=[0, 100],
+    traces=[
+        TraceSpec('RSI', style={'line': dict(color='purple', width=2)}),
+    ],
+    reference_lines=[
+        (70, dict(line_dash="dash", line_color="red", opacity=0.7)),
+        (30, dict(line_dash="dash", line_color="green", opacity=0.7)),
+        (50, dict(line_dash="dot", line_color="gray", opacity=0.5)),
+    ]
+))
+
+register_indicator(IndicatorSpec(
+    key='macd', label='MACD', function='macd',
+    pane='MACD', pane_position='below',
+    traces=[
+        TraceSpec('MACD', output=0, style={'line': dict(color='blue', width=2)}),
+        TraceSpec('Signal', output=1, style={'line': dict(color='red', width=2)}),
+        TraceSpec('Histogram', output=2, kind='bar', reduce='absmax',
+                  sign_colors=('red', 'green')),
+    ]
+))
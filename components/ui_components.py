@@ -1,6 +1,7 @@
 import dash
 from dash import dcc, html
-from config import COLORS, DEFAULTS
+from config import COLORS, DEFAULTS, INTERVALS
+from components.indicator_registry import get_indicator_specs
 
 
 class UIComponents:
@@ -45,12 +46,27 @@ class UIComponents:
                         ),
                     ], className='input-group'),
 
+                    # Symbols compared with the main one
+                    html.Div([
+                        html.Label('Compare With:', className='input-label'),
+                        dcc.Input(
+                            id='compare-symbols',
+                            type='text',
+                            placeholder='Comma-separated tickers (e.g., MSFT, ^GSPC)',
+                            value='',
+                            className='stock-input',
+                            debounce=True
+                        ),
+                    ], className='input-group'),
+
                     # Time range dropdown
                     html.Div([
                         html.Label('Time Range:', className='input-label'),
                         dcc.Dropdown(
                             id='time-range',
                             options=[
+                                {'label': '1 Day', 'value': 'day'},
+                                {'label': '1 Week', 'value': 'week'},
                                 {'label': '1 Month', 'value': 'month'},
                                 {'label': '3 Months', 'value': '3 months'},
                                 {'label': '6 Months', 'value': '6 months'},
@@ -67,6 +83,21 @@ class UIComponents:
                         ),
                     ], className='input-group'),
 
+                    # Bar interval dropdown
+                    html.Div([
+                        html.Label('Interval:', className='input-label'),
+                        dcc.Dropdown(
+                            id='interval',
+                            options=[
+                                {'label': interval['label'], 'value': value}
+                                for value, interval in INTERVALS.items()
+                            ],
+                            value=self.defaults['interval'],
+                            className='time-dropdown',
+                            clearable=False
+                        ),
+                    ], className='input-group'),
+
                     # Indicator toggles
                     html.Div([
                         html.Label('Technical Indicators:',
@@ -74,12 +105,10 @@ class UIComponents:
                         dcc.Checklist(
                             id='indicators',
                             options=[
-                                {'label': ' Moving Averages', 'value': 'ma'},
-                                {'label': ' Bollinger Bands', 'value': 'bb'},
-                                {'label': ' RSI', 'value': 'rsi'},
-                                {'label': ' MACD', 'value': 'macd'},
+                                {'label': f' {spec.label}', 'value': spec.key}
+                                for spec in get_indicator_specs()
                             ],
-                            value=['ma', 'rsi', 'macd'],
+                            value=self.defaults['indicators'],
                             className='indicator-checklist',
                             inline=True
                         ),
@@ -103,6 +132,15 @@ class UIComponents:
             # Error display
             html.Div(id='error-display', className='error-message'),
 
+            # Symbol of the rendered chart and whether its info is pending
+            dcc.Store(id='chart-meta'),
+
+            # Symbol, interval, time range and indicators the rendered chart shows
+            dcc.Store(id='chart-state'),
+
+            # Full-history series for client-side time range switching
+            dcc.Store(id='range-data'),
+
         ], className='app-container')
 
     def _create_header(self):
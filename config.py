@@ -1,4 +1,5 @@
 # Configuration settings for StockCharts application
+import os
 
 # Color scheme
 COLORS = {
@@ -23,7 +24,17 @@ CHART_CONFIG = {
     'price_offset_percentage': 0.01,
     'chart_height': 600,
     'subplot_heights': [0.3, 0.7],
-    'vertical_spacing': 0.1
+    'vertical_spacing': 0.1,
+    'max_points': 1500,  # Point budget per trace; longer ranges are downsampled (None disables)
+    # Send the full history once per symbol and switch time ranges in the
+    # browser instead of on the server
+    'clientside_time_range': os.environ.get(
+        'STOCKCHARTS_CLIENTSIDE_RANGES', '').lower() in ('1', 'true', 'yes'),
+    'clientside_max_points': 5000,  # Point budget of the full-history chart
+    # Send trace values as float32 typed arrays and dates as epoch
+    # milliseconds instead of ISO strings (needs plotly >= 6)
+    'compact_payload': os.environ.get(
+        'STOCKCHARTS_COMPACT_PAYLOAD', '1').lower() not in ('0', 'false', 'no')
 }
 
 # Time range mappings
@@ -45,10 +56,31 @@ TIME_RANGES = {
     'max': 'max'
 }
 
+# Bar intervals offered in the UI. Intervals whose source is themselves are
+# downloaded; the others are resampled from their source (see
+# utils/resampling.py) rather than downloaded separately
+INTERVALS = {
+    '5m': {'label': '5 Minutes', 'source': '5m'},
+    '15m': {'label': '15 Minutes', 'source': '5m'},
+    '30m': {'label': '30 Minutes', 'source': '5m'},
+    '1h': {'label': '1 Hour', 'source': '5m'},
+    '1d': {'label': 'Daily', 'source': '1d'},
+    '1wk': {'label': 'Weekly', 'source': '1d'},
+    '1mo': {'label': 'Monthly', 'source': '1d'},
+    '3mo': {'label': 'Quarterly', 'source': '1d'},
+}
+
+INTERVAL_CONFIG = {
+    'intraday_ttl': 60,                   # Seconds before intraday bars are re-fetched
+    'resampled_max_bytes': 64 * 1024 * 1024  # Resampled histories cached per symbol and interval
+}
+
 # Default values
 DEFAULTS = {
     'stock_symbol': '^DJI',  # Changed to Dow Jones Industrial Average
-    'time_range': 'ytd'
+    'time_range': 'ytd',
+    'interval': '1d',
+    'indicators': ['ma', 'rsi', 'macd']
 }
 
 # App settings
@@ -57,3 +89,92 @@ APP_CONFIG = {
     'host': '127.0.0.1',
     'port': 8050
 }
+
+# Local on-disk history store (one Parquet file per symbol)
+DATA_STORE = {
+    'enabled': True,
+    'directory': os.environ.get(
+        'STOCKCHARTS_DATA_DIR',
+        os.path.join(os.path.expanduser('~'), '.stockcharts', 'history')
+    )
+}
+
+# In-memory history cache
+CACHE_CONFIG = {
+    'max_bytes': 256 * 1024 * 1024,  # Budget measured from DataFrame memory usage
+    'ttl': 15 * 60,                  # Seconds before a symbol is re-fetched
+    'stale_ttl': 15 * 60,            # Expired copies served this long while re-fetching in the background
+    'info_max_bytes': 16 * 1024 * 1024,
+    'info_ttl': 24 * 60 * 60,        # Company metadata rarely changes
+    'info_workers': 4,               # Background threads loading metadata
+    'history_workers': 8             # Threads loading the histories of a comparison
+}
+
+# In-memory form of cached history; only these columns are kept
+HISTORY_FORMAT = {
+    'columns': ['Open', 'High', 'Low', 'Close', 'Volume'],
+    'price_dtype': 'float32'  # 'float64' keeps full precision at twice the memory
+}
+
+# History cache shared by the worker processes of a multi-worker deployment
+# (see wsgi.py); memory-mapped Arrow files, one per symbol
+SHARED_CACHE = {
+    'enabled': os.environ.get(
+        'STOCKCHARTS_SHARED_CACHE', '').lower() in ('1', 'true', 'yes'),
+    'directory': os.environ.get(
+        'STOCKCHARTS_SHARED_CACHE_DIR',
+        os.path.join(os.path.expanduser('~'), '.stockcharts', 'shared')
+    ),
+    'ttl': CACHE_CONFIG['ttl']
+}
+
+# Background refresh of the most requested symbols
+REFRESH_CONFIG = {
+    'enabled': True,
+    'interval': 5 * 60,   # Seconds between refreshes; bounds the staleness of hot symbols
+    'top_n': 20,          # Hottest symbols refreshed per cycle
+    'half_life': 30 * 60  # Seconds for a past request to count half as much
+}
+
+# Symbols pre-loaded at startup (override with --watchlist)
+WATCHLIST = {
+    'enabled': True,
+    'symbols': ['^DJI', '^GSPC', '^IXIC', 'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA'],
+    'batch_size': 10,    # Symbols per bulk download request
+    'max_workers': 4     # Concurrent bulk download requests
+}
+
+# Percent-performance comparison of several symbols
+COMPARISON_CONFIG = {
+    'max_symbols': 10,                 # Symbols per comparison, including the main one
+    'cache_max_bytes': 32 * 1024 * 1024  # Aligned close panels cached per symbol set
+}
+
+# Source of market data: 'yfinance', 'local' (directory of Parquet/CSV files
+# named after the symbol) or 'synthetic' (random-walk series for benchmarks)
+DATA_PROVIDER = {
+    'name': os.environ.get('STOCKCHARTS_PROVIDER', 'yfinance'),
+    'options': {
+        'directory': os.environ.get('STOCKCHARTS_PROVIDER_DIR', 'data'),
+        'bars': 10000,
+        'seed': 0
+    }
+}
+
+# Prometheus metrics on /metrics and per-request profiling
+METRICS_CONFIG = {
+    'enabled': True,
+    # Profile requests sent with the X-StockCharts-Profile header or the
+    # stockcharts_profile cookie; off by default since any client could ask
+    'profiling': os.environ.get(
+        'STOCKCHARTS_PROFILING', '').lower() in ('1', 'true', 'yes'),
+    'profile_dir': os.path.join(os.path.expanduser('~'), '.stockcharts', 'profiles'),
+    'profile_top': 25  # Functions logged per profile
+}
+
+# Technical indicator computation
+INDICATOR_CONFIG = {
+    'cache_max_bytes': 64 * 1024 * 1024,  # Indicators cached per symbol/params/last bar
+    'backend': os.environ.get('STOCKCHARTS_INDICATOR_BACKEND', 'auto'),  # 'auto', 'numba' or 'pandas'
+    'workers': 4  # Threads computing a chart's indicators concurrently
+}
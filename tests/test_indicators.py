@@ -0,0 +1,116 @@
+"""
+Parity of the numba and pandas indicator backends.
+
+The numba backend runs its kernels as plain Python when numba is not
+installed, so both code paths are compared either way.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import indicators
+
+ATOL = 1e-9
+
+
+def make_history(values):
+    """History with a 'Close' column of ``values`` on business days."""
+    index = pd.bdate_range('2020-01-01', periods=len(values))
+    return pd.DataFrame({'Close': np.asarray(values, dtype=float)}, index=index)
+
+
+def random_walk(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100 + rng.normal(0, 1, n).cumsum()
+
+
+def with_gaps(values, seed=1):
+    values = np.array(values, dtype=float)
+    rng = np.random.default_rng(seed)
+    values[rng.choice(len(values), len(values) // 10, replace=False)] = np.nan
+    # A gap longer than a window
+    values[100:130] = np.nan
+    return values
+
+
+def with_flat(values):
+    values = np.array(values, dtype=float)
+    # Flat stretches longer than a window, after volatile prices
+    values[200:240] = 1234.5
+    values[300:330] = values[299]
+    return values
+
+
+SERIES = {
+    'random_walk': random_walk(500),
+    'nan_gaps': with_gaps(random_walk(500)),
+    'flat_windows': with_flat(random_walk(500) * 10),
+    'short': random_walk(5),
+    'single': random_walk(1),
+    'two': random_walk(2),
+}
+
+CASES = [
+    ('rsi', {'period': 14}),
+    ('ma', {'period': 20}),
+    ('bb', {'period': 20, 'std_dev': 2}),
+    ('macd', {'fast_period': 12, 'slow_period': 26, 'signal_period': 9}),
+]
+
+
+def compute(backend, name, data, params, monkeypatch):
+    monkeypatch.setattr(indicators, 'BACKEND', backend)
+    result = indicators.INDICATOR_FUNCTIONS[name](data, **params)
+    return result if isinstance(result, tuple) else (result,)
+
+
+@pytest.mark.parametrize('series', list(SERIES))
+@pytest.mark.parametrize('name, params', CASES, ids=[case[0] for case in CASES])
+def test_backends_match(name, params, series, monkeypatch):
+    data = make_history(SERIES[series])
+    expected = compute('pandas', name, data, params, monkeypatch)
+    actual = compute('numba', name, data, params, monkeypatch)
+
+    assert len(actual) == len(expected)
+    for got, want in zip(actual, expected):
+        assert len(got) == len(want)
+        np.testing.assert_allclose(got.to_numpy(dtype=float), want.to_numpy(dtype=float),
+                                   rtol=1e-9, atol=ATOL, equal_nan=True)
+
+
+@pytest.mark.parametrize('backend', ['pandas', 'numba'])
+def test_bollinger_width_is_zero_on_flat_windows(backend, monkeypatch):
+    data = make_history(SERIES['flat_windows'])
+    upper, _, lower = compute(backend, 'bb', data, {'period': 20}, monkeypatch)
+    width = (upper - lower).to_numpy()
+
+    # Windows lying entirely in a flat stretch
+    assert (width[219:240] == 0).all()
+    assert (width[319:330] == 0).all()
+    # Volatile prices after the flat stretch widen the bands again
+    assert (width[241:260] > 0).all()
+
+
+@pytest.mark.parametrize('series', ['random_walk', 'nan_gaps', 'flat_windows'])
+@pytest.mark.parametrize('name, params', CASES, ids=[case[0] for case in CASES])
+@pytest.mark.parametrize('backend', ['pandas', 'numba'])
+def test_streaming_extension_matches_recomputation(backend, name, params, series,
+                                                   monkeypatch):
+    monkeypatch.setattr(indicators, 'BACKEND', backend)
+    data = make_history(SERIES[series])
+    cache = indicators.IndicatorCache()
+
+    # Grow the history bar by bar, then by a block, as refreshes do
+    cache.get('TEST', name, data.iloc[:250], **params)
+    for end in range(251, 260):
+        cache.get('TEST', name, data.iloc[:end], **params)
+    extended = cache.get('TEST', name, data, **params)
+    assert cache.stats()['misses'] == 11
+
+    expected = indicators.INDICATOR_FUNCTIONS[name](data, **params)
+    extended = extended if isinstance(extended, tuple) else (extended,)
+    expected = expected if isinstance(expected, tuple) else (expected,)
+    for got, want in zip(extended, expected):
+        assert got.index.equals(want.index)
+        np.testing.assert_allclose(got.to_numpy(dtype=float), want.to_numpy(dtype=float),
+                                   rtol=1e-9, atol=1e-8, equal_nan=True)
@@ -0,0 +1,335 @@
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Optional
+
+import pandas as pd
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Estimate the in-memory size of a cached value in bytes.
+
+    DataFrames and Series are measured with ``memory_usage(deep=True)``;
+    tuples, lists and dicts are measured recursively.
+
+    Args:
+        value: Value to measure
+
+    Returns:
+        int: Approximate size in bytes
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+
+class _Entry:
+    """A cached value with its size, refresh time and expiry time."""
+
+    __slots__ = ('value', 'size', 'stale_at', 'expires_at')
+
+    def __init__(self, value: Any, size: int, stale_at: float,
+                 expires_at: float):
+        self.value = value
+        self.size = size
+        self.stale_at = stale_at
+        self.expires_at = expires_at
+
+
+class _PendingLoad:
+    """An in-flight load that concurrent callers wait on."""
+
+    __slots__ = ('event', 'value', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache with a byte budget, per-entry TTL and
+    single-flight loading.
+
+    With ``stale_ttl`` set, entries older than their TTL are still served
+    for up to ``stale_ttl`` more seconds by ``get_or_load``, which reloads
+    them on a background thread instead of making the caller wait
+    (stale-while-revalidate).
+    """
+
+    def __init__(self, max_bytes: int, ttl: Optional[float] = None,
+                 sizeof: Callable[[Any], int] = estimate_size,
+                 stale_ttl: Optional[float] = None, refresh_workers: int = 2):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.sizeof = sizeof
+        self.logger = logging.getLogger(__name__)
+
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._current_bytes = 0
+        self._refresh_workers = refresh_workers
+        self._refresh_executor = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale_hits = 0
+        self.refreshes = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a cached value.
+
+        Args:
+            key: Cache key
+            default: Value returned when the key is missing or expired
+
+        Returns:
+            Cached value or ``default``
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return entry.value
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """
+        Store a value, evicting least recently used entries if needed.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl (float): Entry lifetime in seconds (default: cache TTL)
+        """
+        size = self.sizeof(value)
+        ttl = self.ttl if ttl is None else ttl
+        stale_at = time.monotonic() + ttl if ttl is not None else float('inf')
+        expires_at = stale_at + (self.stale_ttl or 0)
+
+        with self._lock:
+            self._remove(key)
+            if size > self.max_bytes:
+                self.logger.warning(
+                    f"Not caching {key!r}: {size} bytes exceeds the "
+                    f"{self.max_bytes} byte budget")
+                return
+
+            self._entries[key] = _Entry(value, size, stale_at, expires_at)
+            self._current_bytes += size
+            self._evict()
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any],
+                    ttl: Optional[float] = None) -> Any:
+        """
+        Get a cached value, loading it on a miss.
+
+        Concurrent misses for the same key share a single call to
+        ``loader``. Results that are ``None`` are returned but not cached.
+        A stale entry is returned at once while ``loader`` refreshes it in
+        the background.
+
+        Args:
+            key: Cache key
+            loader (callable): Zero-argument function producing the value
+            ttl (float): Entry lifetime in seconds (default: cache TTL)
+
+        Returns:
+            Cached or freshly loaded value
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self.hits += 1
+                if entry.stale_at <= time.monotonic():
+                    self.stale_hits += 1
+                    if key not in self._pending:
+                        self._pending[key] = _PendingLoad()
+                        self._submit_refresh(key, loader, ttl)
+                return entry.value
+
+            self.misses += 1
+            pending = self._pending.get(key)
+            is_owner = pending is None
+            if is_owner:
+                pending = _PendingLoad()
+                self._pending[key] = pending
+
+        if not is_owner:
+            pending.event.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+
+        return self._load(key, loader, ttl, pending)
+
+    def refresh(self, key: Hashable, loader: Callable[[], Any],
+                ttl: Optional[float] = None) -> Any:
+        """
+        Reload a value whether or not it has expired.
+
+        The current value stays available to readers until the new one is
+        stored; if ``loader`` returns ``None`` it is kept. A refresh already
+        in flight for the key is joined instead of started again.
+
+        Args:
+            key: Cache key
+            loader (callable): Zero-argument function producing the value
+            ttl (float): Entry lifetime in seconds (default: cache TTL)
+
+        Returns:
+            Freshly loaded value
+        """
+        with self._lock:
+            pending = self._pending.get(key)
+            is_owner = pending is None
+            if is_owner:
+                pending = _PendingLoad()
+                self._pending[key] = pending
+
+        if not is_owner:
+            pending.event.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+
+        value = self._load(key, loader, ttl, pending)
+        with self._lock:
+            self.refreshes += 1
+        return value
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a live value, fresh or stale, without counting it as a use.
+
+        Args:
+            key: Cache key
+            default: Value returned when the key is missing or expired
+
+        Returns:
+            Cached value or ``default``
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= time.monotonic():
+                return default
+            return entry.value
+
+    def invalidate(self, key: Hashable):
+        """Remove a single entry."""
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: Hit, miss and eviction counters plus current usage
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'stale_hits': self.stale_hits,
+                'refreshes': self.refreshes,
+                'entries': len(self._entries),
+                'bytes': self._current_bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+    def keys(self) -> list:
+        """Get the keys of all entries, least recently used first."""
+        with self._lock:
+            return list(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._lookup(key) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _load(self, key: Hashable, loader: Callable[[], Any],
+              ttl: Optional[float], pending: _PendingLoad) -> Any:
+        """Run a load registered as ``pending`` and store its result."""
+        try:
+            pending.value = loader()
+            if pending.value is not None:
+                self.put(key, pending.value, ttl)
+            return pending.value
+        except Exception as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+            pending.event.set()
+
+    def _submit_refresh(self, key: Hashable, loader: Callable[[], Any],
+                        ttl: Optional[float]):
+        """Reload a stale entry on the refresh pool. Caller holds the lock."""
+        if self._refresh_executor is None:
+            self._refresh_executor = ThreadPoolExecutor(
+                max_workers=self._refresh_workers,
+                thread_name_prefix='cache-refresh')
+        pending = self._pending[key]
+
+        def run():
+            try:
+                self._load(key, loader, ttl, pending)
+                with self._lock:
+                    self.refreshes += 1
+            except Exception as e:
+                self.logger.warning(f"Background refresh of {key!r} failed: {e}")
+
+        self._refresh_executor.submit(run)
+
+    def _lookup(self, key: Hashable) -> Optional[_Entry]:
+        """Find a live entry and mark it as recently used. Caller holds the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _remove(self, key: Hashable):
+        """Drop an entry if present. Caller holds the lock."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._current_bytes -= entry.size
+
+    def _evict(self):
+        """Evict least recently used entries until within budget. Caller holds the lock."""
+        while self._current_bytes > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._current_bytes -= entry.size
+            self.evictions += 1
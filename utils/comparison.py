@@ -0,0 +1,185 @@
+"""
+Aligned close prices of several symbols for performance comparisons.
+
+Closes are aligned on one index with a single outer join: daily and coarser
+bars on their session date, so symbols listed in different timezones line
+up, and intraday bars on their time in the first symbol's timezone. Dates
+one market was closed on (holidays) are forward-filled from its previous
+close when a time range is charted.
+
+Aligned panels are cached per symbol set. A new set is built from the
+cached panel sharing the most symbols with it, so adding a symbol to a
+comparison loads and joins only that symbol, and removing one drops a
+column.
+"""
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from utils.cache import LRUCache
+from utils.resampling import is_intraday
+from utils.time_utils import slice_time_range
+
+
+def align_closes(histories: Dict[str, pd.DataFrame], interval: str,
+                 tz=None) -> pd.DataFrame:
+    """
+    Join the closes of several histories on one index.
+
+    Args:
+        histories (dict): History per symbol
+        interval (str): Bar interval of the histories
+        tz: Timezone intraday bars are aligned in (default: UTC)
+
+    Returns:
+        pd.DataFrame: One column per symbol, NaN where a symbol has no bar
+    """
+    if not histories:
+        return pd.DataFrame()
+    intraday = is_intraday(interval)
+    closes = [pd.Series(hist['Close'].to_numpy(), name=symbol,
+                        index=_alignment_index(hist.index, intraday, tz))
+              for symbol, hist in histories.items()]
+    return pd.concat(closes, axis=1, join='outer', sort=True)
+
+
+def _alignment_index(index: pd.DatetimeIndex, intraday: bool, tz) -> pd.DatetimeIndex:
+    """Map a history's dates to the keys it is aligned on."""
+    if intraday:
+        if index.tz is None:
+            return index
+        return index.tz_convert(tz or 'UTC')
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.normalize()
+
+
+def performance(closes: pd.DataFrame, time_range: str) -> pd.DataFrame:
+    """
+    Percent change of each symbol over a time range.
+
+    Gaps are forward-filled from the previous close, including from before
+    the range. Each symbol is measured from its first close in the range,
+    so one listed during the range starts at 0% on its first bar.
+
+    Args:
+        closes (pd.DataFrame): Result of ``align_closes``
+        time_range (str): Time range
+
+    Returns:
+        pd.DataFrame: Percent change per symbol
+    """
+    window = slice_time_range(closes.ffill(), time_range)
+    if window.empty:
+        return window
+    return (window / window.bfill().iloc[0] - 1) * 100
+
+
+class _Panel:
+    """Aligned closes of a symbol set and the histories they were taken from."""
+
+    def __init__(self, closes: pd.DataFrame, sources: Dict[str, weakref.ref]):
+        self.closes = closes
+        self.sources = sources
+
+    def is_current(self, symbol: str, hist: pd.DataFrame) -> bool:
+        """Whether the symbol's column was built from ``hist``."""
+        source = self.sources.get(symbol)
+        return source is not None and source() is hist
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.closes.memory_usage(index=True).sum())
+
+
+class ComparisonPanels:
+    """
+    Cache of aligned close panels, updated by symbol deltas.
+
+    Args:
+        data_fetcher: StockDataFetcher the histories come from
+        max_bytes (int): Memory budget of the cached panels
+    """
+
+    def __init__(self, data_fetcher, max_bytes: int = 32 * 1024 * 1024):
+        self.data_fetcher = data_fetcher
+        self._cache = LRUCache(max_bytes, sizeof=lambda panel: panel.nbytes)
+
+    def get(self, symbols: List[str], interval: str) -> Tuple[Optional[pd.DataFrame], List[str]]:
+        """
+        Get the aligned closes of ``symbols``.
+
+        Histories are fetched concurrently. Columns of a cached panel whose
+        history has not changed since are reused; only new or refreshed
+        symbols are joined in.
+
+        Args:
+            symbols (list): Symbols, in column order
+            interval (str): Bar interval
+
+        Returns:
+            tuple: (closes, symbols without data); closes is None if no
+                symbol has data
+        """
+        histories = self.data_fetcher.get_stock_histories(symbols, interval)
+        missing = [s for s in symbols if histories.get(s) is None or histories[s].empty]
+        histories = {s: histories[s] for s in symbols if s not in missing}
+        if not histories:
+            return None, missing
+
+        key = (interval, frozenset(histories))
+        panel = self._cache.get(key)
+        if panel is None or not all(
+                panel.is_current(s, hist) for s, hist in histories.items()):
+            panel = self._build(histories, interval, self._closest(key))
+            self._cache.put(key, panel)
+        return panel.closes[list(histories)], missing
+
+    def _closest(self, key) -> Optional[_Panel]:
+        """Get the cached panel of the same interval sharing the most symbols."""
+        interval, symbols = key
+        best, best_score = None, (0, 0)
+        for cached_key in self._cache.keys():
+            if cached_key[0] != interval:
+                continue
+            shared = len(symbols & cached_key[1])
+            score = (shared, -len(cached_key[1] - symbols))
+            if shared and score > best_score:
+                panel = self._cache.peek(cached_key)
+                if panel is not None:
+                    best, best_score = panel, score
+        return best
+
+    def _build(self, histories: Dict[str, pd.DataFrame], interval: str,
+               base: Optional[_Panel]) -> _Panel:
+        """Build a panel from ``base``, joining in only the symbols it lacks."""
+        first = next(iter(histories.values()))
+        tz = first.index.tz
+
+        keep = [] if base is None else [
+            s for s in base.closes.columns
+            if s in histories and base.is_current(s, histories[s])]
+        added = {s: hist for s, hist in histories.items() if s not in keep}
+
+        if keep:
+            closes = base.closes[keep]
+            if len(keep) < len(base.closes.columns):
+                # Dates only the dropped symbols had
+                closes = closes.dropna(how='all')
+            if added:
+                closes = pd.concat([closes, align_closes(added, interval, tz)],
+                                   axis=1, join='outer', sort=True)
+        else:
+            closes = align_closes(added, interval, tz)
+
+        sources = {s: weakref.ref(hist) for s, hist in histories.items()}
+        return _Panel(closes, sources)
+
+    def clear(self):
+        """Remove all cached panels."""
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        """Get hit, miss and eviction counters."""
+        return self._cache.stats()
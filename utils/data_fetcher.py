@@ -1,57 +1,413 @@
-import yfinance as yf
 import pandas as pd
 import logging
-from typing import Optional, Tuple
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import (
+    CACHE_CONFIG, DATA_PROVIDER, DATA_STORE, DEFAULTS, HISTORY_FORMAT,
+    INTERVAL_CONFIG, INTERVALS, REFRESH_CONFIG, SHARED_CACHE, WATCHLIST
+)
+from utils.cache import LRUCache
+from utils.data_store import HistoryStore
+from utils.history_format import (
+    compact_history, history_memory, history_size, shared_index_bytes
+)
+from utils.providers import DataProvider, create_provider
+from utils.metrics import FETCH_SECONDS
+from utils.refresh import AccessTracker
+from utils.resampling import resample_ohlcv
+from utils.shared_cache import SharedHistoryCache
 
 
 class StockDataFetcher:
     """Handle stock data retrieval with caching and error handling."""
 
-    def __init__(self):
-        self.cache = {}
+    def __init__(self, store: Optional[HistoryStore] = None,
+                 provider: Optional[DataProvider] = None,
+                 shared_cache: Optional[SharedHistoryCache] = None,
+                 metric_symbols: Optional[Iterable[str]] = None):
+        self.provider = provider if provider is not None else create_provider(
+            DATA_PROVIDER['name'], **DATA_PROVIDER['options'])
+        self.cache = LRUCache(
+            CACHE_CONFIG['max_bytes'], ttl=CACHE_CONFIG['ttl'],
+            sizeof=history_size, stale_ttl=CACHE_CONFIG['stale_ttl'])
+        self.info_cache = LRUCache(
+            CACHE_CONFIG['info_max_bytes'], ttl=CACHE_CONFIG['info_ttl'])
+        # (source history, resampled history) per (symbol, interval)
+        self.resampled_cache = LRUCache(
+            INTERVAL_CONFIG['resampled_max_bytes'],
+            sizeof=lambda entry: history_size(entry[1]))
         self.logger = logging.getLogger(__name__)
+        self.store = store if store is not None else HistoryStore(
+            DATA_STORE['directory'],
+            enabled=DATA_STORE['enabled'] and self.provider.persist)
+        # Host-wide cache read by all worker processes of a deployment
+        self.shared_cache = shared_cache if shared_cache is not None else SharedHistoryCache(
+            SHARED_CACHE['directory'], ttl=SHARED_CACHE['ttl'],
+            enabled=SHARED_CACHE['enabled'])
+        # Request frequency per symbol, read by the refresh scheduler
+        self.access_tracker = AccessTracker(REFRESH_CONFIG['half_life'])
+        # Symbols with their own series in the fetch metrics; the watchlist
+        # in use, set again when a different one is pre-warmed
+        self.metric_symbols = frozenset(
+            metric_symbols if metric_symbols is not None else WATCHLIST['symbols'])
+        self._info_executor = ThreadPoolExecutor(
+            max_workers=CACHE_CONFIG['info_workers'],
+            thread_name_prefix='stock-info')
+        self._history_executor = ThreadPoolExecutor(
+            max_workers=CACHE_CONFIG['history_workers'],
+            thread_name_prefix='stock-history')
 
-    def get_stock_data(self, symbol: str) -> Tuple[Optional[pd.DataFrame], Optional[dict]]:
+    def get_stock_data(self, symbol: str, interval: str = DEFAULTS['interval']
+                       ) -> Tuple[Optional[pd.DataFrame], Optional[dict]]:
         """
         Fetch stock data and info for a given symbol.
 
+        Only the history is loaded synchronously. If the info is not cached
+        yet a placeholder is returned and the real info is loaded in the
+        background.
+
         Args:
             symbol (str): Stock ticker symbol
+            interval (str): Bar interval, a key of INTERVALS
 
         Returns:
             tuple: (historical_data, stock_info) or (None, None) if error
         """
+        hist = self.get_stock_history(symbol, interval)
+        if hist is None:
+            return None, None
+
+        info = self.get_stock_info(symbol, wait=False)
+        return hist, info or self.placeholder_info(symbol)
+
+    def get_stock_history(self, symbol: str,
+                          interval: str = DEFAULTS['interval']) -> Optional[pd.DataFrame]:
+        """
+        Fetch historical data for a given symbol.
+
+        An expired copy is returned immediately while newer bars are
+        fetched in the background. Intervals that are not downloaded are
+        resampled from their source interval and cached until the source
+        changes.
+
+        Args:
+            symbol (str): Stock ticker symbol
+            interval (str): Bar interval, a key of INTERVALS
+
+        Returns:
+            pd.DataFrame: Historical data or None if error
+        """
         try:
-            # Check cache first
-            if symbol in self.cache:
-                return self.cache[symbol]
+            hist = self._get_interval_history(symbol, interval)
+        except Exception as e:
+            self.logger.error(f"Error fetching {interval} data for {symbol}: {e}")
+            return None
 
-            ticker = yf.Ticker(symbol)
+        # Only symbols with data compete for background refreshes, so
+        # mistyped ones are not re-fetched
+        if hist is not None and not hist.empty:
+            self.access_tracker.record(symbol)
+        return hist
 
-            # Get historical data
-            hist = ticker.history(period='max')
-            if hist.empty:
-                self.logger.warning(
-                    f"No historical data found for symbol: {symbol}")
-                return None, None
+    def get_stock_histories(self, symbols: List[str],
+                            interval: str = DEFAULTS['interval']
+                            ) -> Dict[str, Optional[pd.DataFrame]]:
+        """
+        Fetch the histories of several symbols concurrently.
 
-            # Get stock info
-            try:
-                info = ticker.info
-                if not info or 'symbol' not in info:
-                    info = {'symbol': symbol, 'shortName': symbol}
-            except Exception as e:
-                self.logger.warning(f"Could not fetch info for {symbol}: {e}")
-                info = {'symbol': symbol, 'shortName': symbol}
+        Args:
+            symbols (list): Stock ticker symbols
+            interval (str): Bar interval, a key of INTERVALS
 
-            # Cache the result
-            self.cache[symbol] = (hist, info)
+        Returns:
+            dict: History per symbol, None where it could not be fetched
+        """
+        if len(symbols) < 2:
+            return {symbol: self.get_stock_history(symbol, interval) for symbol in symbols}
+        futures = {symbol: self._history_executor.submit(
+            self.get_stock_history, symbol, interval) for symbol in symbols}
+        return {symbol: future.result() for symbol, future in futures.items()}
+
+    def _get_interval_history(self, symbol: str, interval: str) -> Optional[pd.DataFrame]:
+        """Get the cached history of an interval, loading or resampling it on a miss."""
+        if interval not in INTERVALS:
+            raise ValueError(f"Unknown bar interval: {interval!r}")
+
+        source = INTERVALS[interval]['source']
+        if source != interval:
+            hist = self._get_interval_history(symbol, source)
+            if hist is None or hist.empty:
+                return hist
+            return self._resampled(symbol, interval, hist)
+
+        if interval == '1d':
+            return self.cache.get_or_load(
+                symbol, lambda: self._load_latest(symbol))
+        return self.cache.get_or_load(
+            (symbol, interval), lambda: self._fetch_intraday(symbol, interval),
+            ttl=INTERVAL_CONFIG['intraday_ttl'])
+
+    def _resampled(self, symbol: str, interval: str,
+                   source: pd.DataFrame) -> pd.DataFrame:
+        """
+        Resample a source history, reusing the last result while the source is unchanged.
+
+        The source is held by a weak reference: a refreshed source is a new
+        frame, so the cached result is recomputed on the next request.
+        """
+        key = (symbol, interval)
+        cached = self.resampled_cache.get(key)
+        if cached is not None and cached[0]() is source:
+            return cached[1]
 
-            return hist, info
+        resampled = resample_ohlcv(source, interval)
+        self.resampled_cache.put(key, (weakref.ref(source), resampled))
+        return resampled
 
+    def refresh_history(self, symbol: str,
+                        max_age: Optional[float] = None) -> Optional[pd.DataFrame]:
+        """
+        Fetch the bars since the cached history's last bar.
+
+        Readers keep getting the cached history until the refreshed one
+        replaces it.
+
+        Args:
+            symbol (str): Stock ticker symbol
+            max_age (float): Accept a shared copy refreshed by another
+                worker within this many seconds (default: cache TTL)
+
+        Returns:
+            pd.DataFrame: Refreshed history or None if nothing is available
+        """
+        return self.cache.refresh(
+            symbol, lambda: self._load_latest(symbol, max_age))
+
+    def get_stock_info(self, symbol: str, wait: bool = True) -> Optional[dict]:
+        """
+        Get stock information only.
+
+        Args:
+            symbol (str): Stock ticker symbol
+            wait (bool): Block until the info is loaded. When False, return
+                the cached info or None and load it in the background.
+
+        Returns:
+            dict: Stock information, or None if not yet available
+        """
+        if not wait:
+            info = self.info_cache.get(symbol)
+            if info is None:
+                self.prefetch_stock_info(symbol)
+            return info
+
+        info = self.info_cache.get_or_load(
+            symbol, lambda: self._fetch_info(symbol))
+        return info or self.placeholder_info(symbol)
+
+    def prefetch_stock_info(self, symbol: str):
+        """
+        Start loading stock info in the background.
+
+        Args:
+            symbol (str): Stock ticker symbol
+        """
+        self._info_executor.submit(self.get_stock_info, symbol)
+
+    @staticmethod
+    def placeholder_info(symbol: str) -> dict:
+        """
+        Get minimal info used until the real info is available.
+
+        Args:
+            symbol (str): Stock ticker symbol
+
+        Returns:
+            dict: Info containing only the symbol
+        """
+        return {'symbol': symbol, 'shortName': symbol}
+
+    def _load_latest(self, symbol: str,
+                     max_age: Optional[float] = None) -> Optional[pd.DataFrame]:
+        """Load history through the shared cache, updating the cached copy."""
+        current = self.cache.peek(symbol)
+        return self.shared_cache.get_or_load(
+            symbol, lambda: self._fetch_history(symbol, current),
+            max_age=max_age)
+
+    def _fetch_history(self, symbol: str,
+                       current: Optional[pd.DataFrame] = None) -> Optional[pd.DataFrame]:
+        """
+        Download history for a symbol, bypassing the cache.
+
+        Args:
+            symbol (str): Stock ticker symbol
+            current (pd.DataFrame): History already held in memory; only
+                newer bars are fetched
+
+        Returns:
+            pd.DataFrame: Historical data or None if no data was found
+        """
+        # Metadata is independent of the history, so start it right away
+        if symbol not in self.info_cache:
+            self.prefetch_stock_info(symbol)
+
+        with FETCH_SECONDS.time(symbol=self._metric_symbol(symbol), kind='history'):
+            hist = self._load_history(symbol, current)
+        if hist is None or hist.empty:
+            self.logger.warning(
+                f"No historical data found for symbol: {symbol}")
+            return None
+
+        return self._compact(hist)
+
+    def _metric_symbol(self, symbol: str) -> str:
+        """
+        Get the ``symbol`` label of fetch metrics.
+
+        Symbols come from user input, so only watchlist symbols get a
+        series of their own; the rest share ``'other'``.
+        """
+        return symbol if symbol in self.metric_symbols else 'other'
+
+    def _fetch_intraday(self, symbol: str, interval: str) -> Optional[pd.DataFrame]:
+        """
+        Download the recent intraday bars of a symbol, bypassing the cache.
+
+        Intraday bars are neither stored on disk nor shared between workers;
+        they expire after ``INTERVAL_CONFIG['intraday_ttl']``.
+
+        Args:
+            symbol (str): Stock ticker symbol
+            interval (str): Intraday bar interval
+
+        Returns:
+            pd.DataFrame: Intraday bars or None if none were found
+        """
+        if symbol not in self.info_cache:
+            self.prefetch_stock_info(symbol)
+
+        with FETCH_SECONDS.time(symbol=self._metric_symbol(symbol), kind='intraday'):
+            hist = self.provider.get_intraday(symbol, interval)
+        if hist is None or hist.empty:
+            self.logger.warning(f"No {interval} bars found for symbol: {symbol}")
+            return None
+
+        hist = compact_history(hist, columns=HISTORY_FORMAT['columns'],
+                               price_dtype=HISTORY_FORMAT['price_dtype'],
+                               shared_index=False)
+        # Keeps its indicators apart from the daily ones (see utils/resampling.py)
+        hist.attrs['interval'] = interval
+        return hist
+
+    def _fetch_info(self, symbol: str) -> Optional[dict]:
+        """
+        Download info for a symbol, bypassing the cache.
+
+        Args:
+            symbol (str): Stock ticker symbol
+
+        Returns:
+            dict: Stock information or None if it could not be fetched
+        """
+        try:
+            with FETCH_SECONDS.time(symbol=self._metric_symbol(symbol), kind='info'):
+                info = self.provider.get_info(symbol)
         except Exception as e:
-            self.logger.error(f"Error fetching data for {symbol}: {e}")
-            return None, None
+            self.logger.warning(f"Could not fetch info for {symbol}: {e}")
+            return None
+
+        return info or self.placeholder_info(symbol)
+
+    def _load_history(self, symbol: str,
+                      current: Optional[pd.DataFrame] = None) -> Optional[pd.DataFrame]:
+        """
+        Load history from the local store and fetch only the missing bars.
+
+        Args:
+            symbol (str): Stock ticker symbol
+            current (pd.DataFrame): Compact history held in memory, updated
+                instead of the stored one
+
+        Returns:
+            pd.DataFrame: Up-to-date history or None if nothing is available
+        """
+        stored = current if current is not None else self.store.load(symbol)
+        if stored is None:
+            return self._merge_history(
+                symbol, None, self.provider.get_history(symbol))
+
+        # Re-fetch from the last stored bar so a session that was still open
+        # when it was stored gets its final values
+        start = stored.index[-1].strftime('%Y-%m-%d')
+        try:
+            fresh = self.provider.get_history_range(symbol, start)
+        except Exception as e:
+            self.logger.warning(
+                f"Incremental fetch failed for {symbol}, serving stored history: {e}")
+            return stored
+
+        if fresh is None or fresh.empty:
+            return stored
+
+        self.logger.info(
+            f"Fetched {len(fresh)} bar(s) since {start} for {symbol}")
+        if current is not None:
+            # Merge into the full-precision copy on disk, not the compact one
+            persisted = self.store.load(symbol)
+            if persisted is not None:
+                stored = persisted
+        return self._merge_history(symbol, stored, fresh)
+
+    def ingest_history(self, symbol: str, fresh: Optional[pd.DataFrame],
+                       stored: Optional[pd.DataFrame] = None) -> Optional[pd.DataFrame]:
+        """
+        Add externally downloaded bars for a symbol, e.g. from a bulk download.
+
+        The bars are merged with ``stored``, persisted and cached.
+
+        Args:
+            symbol (str): Stock ticker symbol
+            fresh (pd.DataFrame): Newly downloaded bars
+            stored (pd.DataFrame): Previously stored history, if any
+
+        Returns:
+            pd.DataFrame: Merged history or None if there is no data
+        """
+        hist = self._merge_history(symbol, stored, fresh)
+        if hist is None or hist.empty:
+            return None
+
+        hist = self.shared_cache.put(symbol, hist)
+        self.cache.put(symbol, hist)
+        return hist
+
+    def _merge_history(self, symbol: str, stored: Optional[pd.DataFrame],
+                       fresh: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+        """
+        Merge fresh bars into stored history and persist any change.
+
+        The store keeps the merged history as the provider returned it; only
+        the returned copy is converted to the compact in-memory form.
+        """
+        if HistoryStore.has_new_actions(stored, fresh):
+            self.logger.info(
+                f"New split or dividend for {symbol}, downloading its full history")
+            full = self.provider.get_history(symbol)
+            if full is not None and not full.empty:
+                stored, fresh = None, full
+        hist = HistoryStore.merge(stored, fresh)
+        if fresh is not None and not fresh.empty:
+            self.store.save(symbol, hist)
+        return self._compact(hist)
+
+    @staticmethod
+    def _compact(hist: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+        """Convert history to the in-memory form set by HISTORY_FORMAT."""
+        return compact_history(hist, columns=HISTORY_FORMAT['columns'],
+                               price_dtype=HISTORY_FORMAT['price_dtype'])
 
     def validate_symbol(self, symbol: str) -> bool:
         """
@@ -63,22 +419,48 @@ class StockDataFetcher:
         Returns:
             bool: True if valid, False otherwise
         """
-        hist, info = self.get_stock_data(symbol)
+        hist = self.get_stock_history(symbol)
         return hist is not None and not hist.empty
 
     def clear_cache(self):
-        """Clear the data cache."""
+        """Clear the data, resampled and info caches."""
         self.cache.clear()
+        self.resampled_cache.clear()
+        self.info_cache.clear()
 
-    def get_stock_info(self, symbol: str) -> Optional[dict]:
+    def get_cache_stats(self) -> dict:
         """
-        Get stock information only.
+        Get hit, miss and eviction counters for the data cache.
 
-        Args:
-            symbol (str): Stock ticker symbol
+        Returns:
+            dict: Cache statistics
+        """
+        return self.cache.stats()
+
+    def get_memory_report(self) -> dict:
+        """
+        Get the memory held by each cached history.
 
         Returns:
-            dict: Stock information or None if error
+            dict: ``symbols`` maps each cached symbol to its bytes per
+                column, index bytes (0 when shared), total and row count;
+                intraday and resampled histories are listed as
+                ``symbol@interval``. ``shared_index`` is the date calendar
+                shared by the symbols and ``total`` the sum of both
         """
-        _, info = self.get_stock_data(symbol)
-        return info
+        symbols = {}
+        for key in self.cache.keys():
+            hist = self.cache.peek(key)
+            if isinstance(hist, pd.DataFrame):
+                symbols[key if isinstance(key, str) else '@'.join(key)] = history_memory(hist)
+        for key in self.resampled_cache.keys():
+            entry = self.resampled_cache.peek(key)
+            if entry is not None:
+                symbols['@'.join(key)] = history_memory(entry[1])
+        shared_index = shared_index_bytes()
+        return {
+            'symbols': symbols,
+            'shared_index': shared_index,
+            'total': shared_index + sum(
+                report['total'] for report in symbols.values()),
+        }
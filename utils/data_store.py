@@ -0,0 +1,156 @@
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from utils.providers import safe_file_stem
+
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+
+class HistoryStore:
+    """Persist OHLCV history on disk as one Parquet file per symbol."""
+
+    def __init__(self, directory: str, enabled: bool = True):
+        self.directory = Path(directory).expanduser()
+        self.logger = logging.getLogger(__name__)
+        self.enabled = enabled and PARQUET_AVAILABLE
+
+        if enabled and not PARQUET_AVAILABLE:
+            self.logger.warning(
+                "pyarrow is not installed; on-disk history store disabled")
+
+    def path_for(self, symbol: str) -> Path:
+        """
+        Get the file path used to store a symbol.
+
+        Args:
+            symbol (str): Stock ticker symbol
+
+        Returns:
+            Path: Location of the symbol's Parquet file
+        """
+        return self.directory / f"{safe_file_stem(symbol)}.parquet"
+
+    def load(self, symbol: str) -> Optional[pd.DataFrame]:
+        """
+        Load stored history for a symbol.
+
+        Args:
+            symbol (str): Stock ticker symbol
+
+        Returns:
+            pd.DataFrame: Stored history or None if nothing is stored
+        """
+        if not self.enabled:
+            return None
+
+        path = self.path_for(symbol)
+        if not path.exists():
+            return None
+
+        try:
+            data = pd.read_parquet(path)
+        except Exception as e:
+            self.logger.warning(f"Could not read stored history for {symbol}: {e}")
+            return None
+
+        return data if not data.empty else None
+
+    def save(self, symbol: str, data: pd.DataFrame):
+        """
+        Atomically write history for a symbol.
+
+        Args:
+            symbol (str): Stock ticker symbol
+            data (pd.DataFrame): History to persist
+        """
+        if not self.enabled or data is None or data.empty:
+            return
+
+        path = self.path_for(symbol)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Write next to the target and rename so readers never see a
+            # partially written file
+            fd, tmp_path = tempfile.mkstemp(
+                dir=self.directory, suffix='.parquet.tmp')
+            os.close(fd)
+            try:
+                data.to_parquet(tmp_path)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        except Exception as e:
+            self.logger.warning(f"Could not persist history for {symbol}: {e}")
+
+    def delete(self, symbol: str):
+        """Remove stored history for a symbol."""
+        path = self.path_for(symbol)
+        if path.exists():
+            path.unlink()
+
+    @staticmethod
+    def has_new_actions(stored: pd.DataFrame, fresh: pd.DataFrame) -> bool:
+        """
+        Whether fresh bars after the stored history carry a split or dividend.
+
+        Stored prices are adjusted for the splits and dividends known when
+        they were downloaded. A new one changes the adjustment of every
+        earlier bar, so the history must be downloaded again instead of
+        merged. Check the provider's frame: compact histories drop the
+        ``Stock Splits`` and ``Dividends`` columns.
+
+        Args:
+            stored (pd.DataFrame): Previously stored history
+            fresh (pd.DataFrame): Newly fetched bars, as the provider returned them
+
+        Returns:
+            bool: True if the stored history needs a full download
+        """
+        if stored is None or stored.empty or fresh is None or fresh.empty:
+            return False
+        actions = fresh.columns.intersection(['Stock Splits', 'Dividends'])
+        if actions.empty:
+            return False
+
+        last, index = stored.index[-1], fresh.index
+        if (last.tz is None) != (index.tz is None):
+            last, index = last.tz_localize(None), index.tz_localize(None)
+        new = fresh.loc[index > last, actions]
+        return bool(new.fillna(0).ne(0).to_numpy().any())
+
+    @staticmethod
+    def merge(stored: pd.DataFrame, fresh: pd.DataFrame) -> pd.DataFrame:
+        """
+        Merge newly fetched bars into stored history.
+
+        Bars present in both frames are taken from ``fresh`` so that a
+        partially completed session is replaced by its final values.
+
+        Args:
+            stored (pd.DataFrame): Previously stored history
+            fresh (pd.DataFrame): Newly fetched bars
+
+        Returns:
+            pd.DataFrame: Combined history sorted by date
+        """
+        if fresh is None or fresh.empty:
+            return stored
+        if stored is None or stored.empty:
+            return fresh
+
+        if stored.index.tz is not None and fresh.index.tz is not None:
+            fresh = fresh.tz_convert(stored.index.tz)
+
+        combined = pd.concat([stored, fresh[stored.columns.intersection(fresh.columns)]])
+        combined = combined[~combined.index.duplicated(keep='last')]
+        return combined.sort_index()
@@ -0,0 +1,202 @@
+"""
+Reduce long series to a bounded number of points for display.
+
+OHLCV bars are aggregated into buckets of consecutive bars (first open,
+max high, min low, last close, summed volume). Line indicators are reduced
+with Largest-Triangle-Three-Buckets (LTTB), which keeps the visual shape of
+the line, and bar indicators keep the most extreme value per bucket.
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from utils import indicator_kernels
+
+
+def bucket_starts(length: int, max_points: int) -> np.ndarray:
+    """
+    Split ``length`` consecutive bars into at most ``max_points`` buckets.
+
+    Args:
+        length (int): Number of bars
+        max_points (int): Maximum number of buckets
+
+    Returns:
+        np.ndarray: Start position of each bucket
+    """
+    buckets = max(1, min(length, max_points))
+    return np.unique(np.linspace(0, length, buckets, endpoint=False).astype(np.int64))
+
+
+def aggregate_ohlcv(data: pd.DataFrame, starts: np.ndarray) -> pd.DataFrame:
+    """
+    Aggregate OHLCV bars into buckets.
+
+    Each bucket is stamped with the date of its first bar.
+
+    Args:
+        data (pd.DataFrame): Stock data with OHLCV columns
+        starts (np.ndarray): Start position of each bucket (sorted)
+
+    Returns:
+        pd.DataFrame: One row per bucket
+    """
+    aggregated = {}
+    if 'Open' in data.columns:
+        aggregated['Open'] = data['Open'].to_numpy()[starts]
+    if 'High' in data.columns:
+        aggregated['High'] = np.maximum.reduceat(data['High'].to_numpy(), starts)
+    if 'Low' in data.columns:
+        aggregated['Low'] = np.minimum.reduceat(data['Low'].to_numpy(), starts)
+    if 'Close' in data.columns:
+        ends = np.append(starts[1:], len(data)) - 1
+        aggregated['Close'] = data['Close'].to_numpy()[ends]
+    if 'Volume' in data.columns:
+        volume = data['Volume'].to_numpy()
+        # Compact histories store volume in 32 bits; sum buckets in 64
+        aggregated['Volume'] = np.add.reduceat(
+            volume, starts, dtype=np.int64 if volume.dtype.kind in 'iu' else None)
+
+    return pd.DataFrame(aggregated, index=data.index[starts])
+
+
+def downsample_ohlcv(data: pd.DataFrame, max_points: Optional[int]) -> pd.DataFrame:
+    """
+    Aggregate OHLCV data to at most ``max_points`` bars.
+
+    Args:
+        data (pd.DataFrame): Stock data with OHLCV columns
+        max_points (int): Point budget; None or 0 disables downsampling
+
+    Returns:
+        pd.DataFrame: ``data`` itself if within budget, otherwise aggregated bars
+    """
+    if not max_points or len(data) <= max_points:
+        return data
+    return aggregate_ohlcv(data, bucket_starts(len(data), max_points))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Select points with the Largest-Triangle-Three-Buckets algorithm.
+
+    The bucket means are computed for all buckets at once; the selection,
+    which depends on the previously selected point, runs in a numba kernel
+    when numba is installed.
+
+    Args:
+        x (np.ndarray): Increasing numeric x values
+        y (np.ndarray): y values without NaNs
+        max_points (int): Number of points to keep (at least 3)
+
+    Returns:
+        np.ndarray: Positions of the selected points
+    """
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    # First and last points are always kept; the rest is split into buckets
+    x = np.ascontiguousarray(x, dtype=np.float64)
+    y = np.ascontiguousarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+
+    # Each bucket is compared with the mean of the next one; the last with
+    # the last point
+    counts = np.diff(edges)
+    next_x = np.append(np.add.reduceat(x[:edges[-1]], edges[:-1])[1:] / counts[1:], x[-1])
+    next_y = np.append(np.add.reduceat(y[:edges[-1]], edges[:-1])[1:] / counts[1:], y[-1])
+
+    if indicator_kernels.NUMBA_AVAILABLE:
+        return indicator_kernels.lttb(x, y, edges, next_x, next_y)
+
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for i in range(max_points - 2):
+        start, stop = edges[i], edges[i + 1]
+        # Twice the triangle area formed with the previous point and the
+        # average of the next bucket
+        area = np.abs(
+            (x[previous] - next_x[i]) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (next_y[i] - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        selected[i + 1] = previous
+    return selected
+
+
+def lttb_positions(series: pd.Series, max_points: Optional[int]) -> np.ndarray:
+    """
+    Get the positions in ``series`` that ``downsample_series`` keeps.
+
+    Args:
+        series (pd.Series): Series indexed by date
+        max_points (int): Point budget; None or 0 disables downsampling
+
+    Returns:
+        np.ndarray: Sorted positions of the selected points
+    """
+    if not max_points or len(series) <= max_points:
+        return np.arange(len(series))
+
+    values = series.to_numpy(dtype=np.float64)
+    valid = np.flatnonzero(~np.isnan(values))
+    if len(valid) <= max_points:
+        return valid
+
+    index = series.index
+    x = (index.asi8[valid].astype(np.float64) if isinstance(index, pd.DatetimeIndex)
+         else valid.astype(np.float64))
+    return valid[lttb_indices(x, values[valid], max_points)]
+
+
+def downsample_series(series: pd.Series, max_points: Optional[int]) -> pd.Series:
+    """
+    Reduce a line series to at most ``max_points`` points with LTTB.
+
+    NaN values (e.g. indicator warm-up) are dropped before selection.
+
+    Args:
+        series (pd.Series): Series indexed by date
+        max_points (int): Point budget; None or 0 disables downsampling
+
+    Returns:
+        pd.Series: Selected points of ``series``
+    """
+    if not max_points or len(series) <= max_points:
+        return series
+    return series.iloc[lttb_positions(series, max_points)]
+
+
+def downsample_buckets(series: pd.Series, max_points: Optional[int],
+                       how: str = 'absmax') -> pd.Series:
+    """
+    Reduce a series by keeping one extreme value per bucket of bars.
+
+    Args:
+        series (pd.Series): Series indexed by date
+        max_points (int): Point budget; None or 0 disables downsampling
+        how (str): 'max', 'min' or 'absmax' (largest magnitude, for bars)
+
+    Returns:
+        pd.Series: One value per bucket, stamped with the bucket's first date
+    """
+    if not max_points or len(series) <= max_points:
+        return series
+
+    starts = bucket_starts(len(series), max_points)
+    values = series.to_numpy(dtype=np.float64)
+    if how == 'max':
+        reduced = np.fmax.reduceat(values, starts)
+    elif how == 'min':
+        reduced = np.fmin.reduceat(values, starts)
+    elif how == 'absmax':
+        highs = np.fmax.reduceat(values, starts)
+        lows = np.fmin.reduceat(values, starts)
+        reduced = np.where(np.abs(highs) >= np.abs(lows), highs, lows)
+    else:
+        raise ValueError(f"Unknown bucket reduction: {how}")
+    return pd.Series(reduced, index=series.index[starts], name=series.name)
@@ -0,0 +1,158 @@
+"""
+Compact in-memory representation of OHLCV history.
+
+Provider histories carry columns the chart never reads (Dividends, Stock
+Splits) and store everything as float64. ``compact_history`` keeps only the
+charted columns, stores prices as float32 and volume in the smallest
+integer type that holds it, and makes the date index a view into a
+calendar shared by all symbols, so the same RAM budget holds several times
+more symbols.
+"""
+import threading
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.cache import estimate_size
+
+# Longest date index seen per timezone; symbol indexes are views into it
+_calendars = {}
+_calendars_lock = threading.Lock()
+
+
+def compact_history(data: Optional[pd.DataFrame],
+                    columns: Iterable[str] = ('Open', 'High', 'Low', 'Close', 'Volume'),
+                    price_dtype: str = 'float32',
+                    shared_index: bool = True) -> Optional[pd.DataFrame]:
+    """
+    Convert history to its compact in-memory form.
+
+    Already compact histories are returned without copying their columns.
+
+    Args:
+        data (pd.DataFrame): OHLCV history
+        columns (iterable): Columns to keep; missing ones are skipped
+        price_dtype (str): dtype of the price columns
+        shared_index (bool): Back the index by the shared calendar; off for
+            intraday bars, which would displace the daily calendar
+
+    Returns:
+        pd.DataFrame: Compact history, or ``data`` if it is None or empty
+    """
+    if data is None or data.empty:
+        return data
+
+    columns = [column for column in columns if column in data.columns]
+    if list(data.columns) == columns and all(
+            data[column].dtype == price_dtype
+            for column in columns if column != 'Volume'):
+        index = share_index(data.index) if shared_index else data.index
+        return data if index is data.index else data.set_axis(index)
+
+    compact = {}
+    for column in columns:
+        values = data[column].to_numpy()
+        if column == 'Volume':
+            values = _compact_integers(values)
+        else:
+            values = values.astype(price_dtype, copy=False)
+        compact[column] = values
+
+    index = share_index(data.index) if shared_index else data.index
+    return pd.DataFrame(compact, index=index, copy=False)
+
+
+def share_index(index: pd.Index) -> pd.Index:
+    """
+    Get an equal date index backed by the shared calendar.
+
+    Dates are stored as int64 epoch nanoseconds where they fit in that
+    range. An index matching a run of the calendar of its timezone is
+    returned as a view into it; a longer index replaces the calendar for the
+    symbols that follow.
+
+    Args:
+        index (pd.Index): Date index of a history
+
+    Returns:
+        pd.Index: Equal index, sharing memory with other symbols when possible
+    """
+    if not isinstance(index, pd.DatetimeIndex) or len(index) == 0:
+        return index
+    if index.unit != 'ns':
+        try:
+            index = index.as_unit('ns')
+        except pd.errors.OutOfBoundsDatetime:
+            # Before 1677 (long synthetic series): keep the coarser unit
+            return index
+
+    key = str(index.tz)
+    with _calendars_lock:
+        calendar = _calendars.get(key)
+        if calendar is not None:
+            start = int(calendar.searchsorted(index[0]))
+            view = calendar[start:start + len(index)]
+            if len(view) == len(index) and np.array_equal(view.asi8, index.asi8):
+                return view
+        if calendar is None or len(index) > len(calendar):
+            _calendars[key] = index
+    return index
+
+
+def is_shared_index(index: pd.Index) -> bool:
+    """Whether ``index`` is a view into a shared calendar."""
+    if not isinstance(index, pd.DatetimeIndex):
+        return False
+    with _calendars_lock:
+        calendar = _calendars.get(str(index.tz))
+    return calendar is not None and np.shares_memory(calendar.asi8, index.asi8)
+
+
+def shared_index_bytes() -> int:
+    """Memory held by the shared calendars, counted once for all symbols."""
+    with _calendars_lock:
+        return sum(int(calendar.nbytes) for calendar in _calendars.values())
+
+
+def history_memory(data: pd.DataFrame) -> Dict[str, int]:
+    """
+    Measure the memory held by one history.
+
+    Args:
+        data (pd.DataFrame): History
+
+    Returns:
+        dict: Bytes per column, ``index`` bytes (0 when shared), ``total``
+            and the number of ``rows``
+    """
+    report = {column: int(data[column].to_numpy().nbytes) for column in data.columns}
+    report['index'] = 0 if is_shared_index(data.index) else int(data.index.nbytes)
+    report['total'] = sum(report.values())
+    report['rows'] = len(data)
+    return report
+
+
+def history_size(data) -> int:
+    """Size of a cached history in bytes, not counting a shared index."""
+    if isinstance(data, pd.DataFrame):
+        return history_memory(data)['total']
+    return estimate_size(data)
+
+
+def _compact_integers(values: np.ndarray) -> np.ndarray:
+    """Store whole-number values in the smallest integer type that holds them."""
+    if values.dtype.kind == 'f':
+        if not np.isfinite(values).all() or not np.array_equal(values, np.round(values)):
+            return values
+    elif values.dtype.kind not in 'iu':
+        return values
+
+    if len(values) == 0:
+        return values.astype(np.uint32)
+    low, high = values.min(), values.max()
+    for dtype in (np.uint32, np.int64) if low >= 0 else (np.int32, np.int64):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return values.astype(dtype, copy=False)
+    return values
@@ -0,0 +1,319 @@
+"""
+Fused single-pass indicator kernels over float64 arrays, and the LTTB point
+selection of utils.downsampling.
+
+The kernels are JIT-compiled with numba when it is installed and release
+the GIL, so several can run on a thread pool at once. They mirror the
+pandas semantics used in utils.indicators (``min_periods=1`` rolling
+windows, sample standard deviation, ``ewm(adjust=False)``), so either
+backend can be used interchangeably.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Fallback decorator that leaves the function as plain Python."""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda function: function
+
+
+@njit(cache=True, nogil=True)
+def rolling_mean(values, period):
+    """
+    Rolling mean over ``period`` values, ignoring NaNs.
+
+    Args:
+        values (np.ndarray): float64 input
+        period (int): Window length
+
+    Returns:
+        np.ndarray: Rolling mean
+    """
+    n = values.shape[0]
+    out = np.empty(n)
+    total = 0.0
+    count = 0
+    for i in range(n):
+        value = values[i]
+        if value == value:
+            total += value
+            count += 1
+        if i >= period:
+            old = values[i - period]
+            if old == old:
+                total -= old
+                count -= 1
+        out[i] = total / count if count > 0 else np.nan
+    return out
+
+
+@njit(cache=True, nogil=True)
+def rolling_mean_std(values, period):
+    """
+    Rolling mean and sample standard deviation in a single pass.
+
+    Uses Welford's algorithm with removal of the value leaving the window.
+    Like pandas, a window of identical values has a standard deviation of
+    exactly zero; the accumulators are reset there, so no rounding residue
+    of earlier windows is carried over.
+
+    Args:
+        values (np.ndarray): float64 input
+        period (int): Window length
+
+    Returns:
+        tuple: (mean, std) arrays
+    """
+    n = values.shape[0]
+    mean_out = np.empty(n)
+    std_out = np.empty(n)
+    mean = 0.0
+    m2 = 0.0
+    count = 0
+    # Run of equal values ending at the newest one, as pandas counts it
+    same = 0
+    previous = np.nan
+    for i in range(n):
+        value = values[i]
+        if value == value:
+            count += 1
+            delta = value - mean
+            mean += delta / count
+            m2 += delta * (value - mean)
+            same = same + 1 if value == previous else 1
+            previous = value
+        if i >= period:
+            old = values[i - period]
+            if old == old:
+                count -= 1
+                if count == 0:
+                    mean = 0.0
+                    m2 = 0.0
+                else:
+                    delta = old - mean
+                    mean -= delta / count
+                    m2 -= delta * (old - mean)
+
+        if count > 0 and same >= count:
+            # Flat window
+            mean = previous
+            m2 = 0.0
+        elif m2 < 0.0:
+            m2 = 0.0
+
+        if count == 0:
+            mean_out[i] = np.nan
+            std_out[i] = np.nan
+        else:
+            mean_out[i] = mean
+            std_out[i] = np.sqrt(m2 / (count - 1)) if count > 1 else np.nan
+    return mean_out, std_out
+
+
+@njit(cache=True, nogil=True)
+def _ema_step(weighted, old_weight, value, alpha):
+    """Advance ``ewm(adjust=False)`` by one value; returns (weighted, old_weight)."""
+    if weighted == weighted:
+        old_weight *= 1.0 - alpha
+        if value == value:
+            if weighted != value:
+                weighted = (old_weight * weighted + alpha * value) / (old_weight + alpha)
+            old_weight = 1.0
+    elif value == value:
+        weighted = value
+    return weighted, old_weight
+
+
+@njit(cache=True, nogil=True)
+def ema(values, span):
+    """
+    Exponential moving average matching ``ewm(span, adjust=False).mean()``.
+
+    Args:
+        values (np.ndarray): float64 input
+        span (float): EMA span
+
+    Returns:
+        np.ndarray: Exponential moving average
+    """
+    alpha = 2.0 / (span + 1.0)
+    n = values.shape[0]
+    out = np.empty(n)
+    weighted = np.nan
+    old_weight = 1.0
+    for i in range(n):
+        weighted, old_weight = _ema_step(weighted, old_weight, values[i], alpha)
+        out[i] = weighted
+    return out
+
+
+@njit(cache=True, nogil=True)
+def macd(values, fast_period, slow_period, signal_period):
+    """
+    MACD line, signal line and histogram from one pass of chained EMAs.
+
+    Args:
+        values (np.ndarray): float64 input
+        fast_period (int): Fast EMA period
+        slow_period (int): Slow EMA period
+        signal_period (int): Signal line EMA period
+
+    Returns:
+        tuple: (macd_line, signal_line, histogram) arrays
+    """
+    fast_alpha = 2.0 / (fast_period + 1.0)
+    slow_alpha = 2.0 / (slow_period + 1.0)
+    signal_alpha = 2.0 / (signal_period + 1.0)
+
+    n = values.shape[0]
+    macd_out = np.empty(n)
+    signal_out = np.empty(n)
+    hist_out = np.empty(n)
+
+    fast = np.nan
+    slow = np.nan
+    signal = np.nan
+    fast_weight = 1.0
+    slow_weight = 1.0
+    signal_weight = 1.0
+    for i in range(n):
+        fast, fast_weight = _ema_step(fast, fast_weight, values[i], fast_alpha)
+        slow, slow_weight = _ema_step(slow, slow_weight, values[i], slow_alpha)
+        line = fast - slow
+        signal, signal_weight = _ema_step(signal, signal_weight, line, signal_alpha)
+        macd_out[i] = line
+        signal_out[i] = signal
+        hist_out[i] = line - signal
+    return macd_out, signal_out, hist_out
+
+
+@njit(cache=True, nogil=True)
+def rsi(values, period):
+    """
+    RSI from rolling average gains and losses in a single pass.
+
+    Args:
+        values (np.ndarray): float64 closing prices
+        period (int): RSI period
+
+    Returns:
+        np.ndarray: RSI values, 50 where undefined
+    """
+    n = values.shape[0]
+    out = np.empty(n)
+    gains = np.zeros(n)
+    losses = np.zeros(n)
+    gain_total = 0.0
+    loss_total = 0.0
+    # Counting losses in the window keeps an all-gain window exactly at zero
+    # loss instead of leaving running-sum rounding residue
+    loss_count = 0
+    for i in range(n):
+        if i > 0:
+            delta = values[i] - values[i - 1]
+            if delta > 0:
+                gains[i] = delta
+            elif delta < 0:
+                losses[i] = -delta
+                loss_count += 1
+        gain_total += gains[i]
+        loss_total += losses[i]
+        if i >= period:
+            gain_total -= gains[i - period]
+            loss_total -= losses[i - period]
+            if losses[i - period] > 0:
+                loss_count -= 1
+
+        count = min(i + 1, period)
+        avg_gain = gain_total / count
+        avg_loss = loss_total / count
+        if loss_count == 0:
+            out[i] = 50.0
+        else:
+            out[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return out
+
+
+@njit(cache=True, nogil=True)
+def ema_2d(values, span):
+    """
+    Row-wise ``ema`` over a 2-D (symbols x dates) array.
+
+    Args:
+        values (np.ndarray): float64 array, one series per row
+        span (float): EMA span
+
+    Returns:
+        np.ndarray: Exponential moving averages, same shape as ``values``
+    """
+    out = np.empty_like(values)
+    for row in range(values.shape[0]):
+        out[row] = ema(values[row], span)
+    return out
+
+
+@njit(cache=True, nogil=True)
+def macd_2d(values, fast_period, slow_period, signal_period):
+    """
+    Row-wise ``macd`` over a 2-D (symbols x dates) array.
+
+    Args:
+        values (np.ndarray): float64 array, one series per row
+        fast_period (int): Fast EMA period
+        slow_period (int): Slow EMA period
+        signal_period (int): Signal line EMA period
+
+    Returns:
+        tuple: (macd_line, signal_line, histogram) arrays
+    """
+    macd_out = np.empty_like(values)
+    signal_out = np.empty_like(values)
+    hist_out = np.empty_like(values)
+    for row in range(values.shape[0]):
+        macd_out[row], signal_out[row], hist_out[row] = macd(
+            values[row], fast_period, slow_period, signal_period)
+    return macd_out, signal_out, hist_out
+
+
+@njit(cache=True, nogil=True)
+def lttb(x, y, edges, next_x, next_y):
+    """
+    Largest-Triangle-Three-Buckets point selection.
+
+    Args:
+        x (np.ndarray): float64 increasing x values
+        y (np.ndarray): float64 y values without NaNs
+        edges (np.ndarray): int64 bucket boundaries; bucket ``i`` holds
+            positions ``edges[i]`` to ``edges[i + 1] - 1``
+        next_x (np.ndarray): Mean x of the bucket after each bucket
+        next_y (np.ndarray): Mean y of the bucket after each bucket
+
+    Returns:
+        np.ndarray: Positions of the selected points, first and last included
+    """
+    buckets = edges.shape[0] - 1
+    selected = np.empty(buckets + 2, dtype=np.int64)
+    selected[0] = 0
+    selected[buckets + 1] = x.shape[0] - 1
+
+    previous = 0
+    for i in range(buckets):
+        previous_x = x[previous]
+        previous_y = y[previous]
+        best = edges[i]
+        best_area = -1.0
+        for j in range(edges[i], edges[i + 1]):
+            area = abs((previous_x - next_x[i]) * (y[j] - previous_y)
+                       - (previous_x - x[j]) * (next_y[i] - previous_y))
+            if area > best_area:
+                best_area = area
+                best = j
+        previous = best
+        selected[i + 1] = best
+    return selected
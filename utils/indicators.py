@@ -1,6 +1,60 @@
+import copy
+import logging
+
 import pandas as pd
 import numpy as np
 
+from config import INDICATOR_CONFIG
+from utils import indicator_kernels
+from utils.cache import LRUCache
+from utils.downsampling import lttb_positions
+from utils.streaming_indicators import STREAMING_INDICATORS, extend_indicator
+
+
+def resolve_backend(name):
+    """
+    Resolve an indicator backend setting to 'numba' or 'pandas'.
+
+    Args:
+        name (str): 'auto', 'numba' or 'pandas'
+
+    Returns:
+        str: Backend that will be used
+    """
+    if name == 'auto':
+        return 'numba' if indicator_kernels.NUMBA_AVAILABLE else 'pandas'
+    if name == 'numba' and not indicator_kernels.NUMBA_AVAILABLE:
+        logging.getLogger(__name__).warning(
+            "numba is not installed; using the pandas indicator backend")
+        return 'pandas'
+    if name not in ('numba', 'pandas'):
+        raise ValueError(f"Unknown indicator backend: {name}")
+    return name
+
+
+# Backend used by the calculate_* functions; change with set_backend()
+BACKEND = resolve_backend(INDICATOR_CONFIG['backend'])
+
+
+def set_backend(name):
+    """
+    Select the indicator backend.
+
+    Args:
+        name (str): 'auto', 'numba' or 'pandas'
+
+    Returns:
+        str: Backend that will be used
+    """
+    global BACKEND
+    BACKEND = resolve_backend(name)
+    return BACKEND
+
+
+def _as_float_array(series):
+    """Get a contiguous float64 array for the numba kernels."""
+    return np.ascontiguousarray(series.to_numpy(dtype=np.float64))
+
 
 def calculate_rsi(data, period=14):
     """
@@ -16,6 +70,10 @@ def calculate_rsi(data, period=14):
     if 'Close' not in data.columns or len(data) < period:
         return pd.Series(dtype=float)
 
+    if BACKEND == 'numba':
+        values = indicator_kernels.rsi(_as_float_array(data['Close']), period)
+        return pd.Series(values, index=data.index, name='Close')
+
     delta = data['Close'].diff(1)
     gain = delta.where(delta > 0, 0)
     loss = -delta.where(delta < 0, 0)
@@ -45,6 +103,10 @@ def calculate_moving_average(data, period=20, column='Close'):
     if column not in data.columns:
         return pd.Series(dtype=float)
 
+    if BACKEND == 'numba':
+        values = indicator_kernels.rolling_mean(_as_float_array(data[column]), period)
+        return pd.Series(values, index=data.index, name=column)
+
     return data[column].rolling(window=period, min_periods=1).mean()
 
 
@@ -65,8 +127,18 @@ def calculate_bollinger_bands(data, period=20, std_dev=2, column='Close'):
         empty_series = pd.Series(dtype=float)
         return empty_series, empty_series, empty_series
 
-    middle_band = calculate_moving_average(data, period, column)
-    std = data[column].rolling(window=period, min_periods=1).std()
+    if BACKEND == 'numba':
+        # Mean and standard deviation come out of the same pass
+        mean, std = indicator_kernels.rolling_mean_std(
+            _as_float_array(data[column]), period)
+        middle_band = pd.Series(mean, index=data.index, name=column)
+        std = pd.Series(std, index=data.index, name=column)
+    else:
+        middle_band = calculate_moving_average(data, period, column)
+        window = data[column].rolling(window=period, min_periods=1)
+        std = window.std()
+        # Flat windows get exactly zero width instead of rounding residue
+        std = std.mask(std.notna() & (window.max() == window.min()), 0.0)
 
     upper_band = middle_band + (std * std_dev)
     lower_band = middle_band - (std * std_dev)
@@ -92,6 +164,13 @@ def calculate_macd(data, fast_period=12, slow_period=26, signal_period=9, column
         empty_series = pd.Series(dtype=float)
         return empty_series, empty_series, empty_series
 
+    if BACKEND == 'numba':
+        macd_line, signal_line, histogram = indicator_kernels.macd(
+            _as_float_array(data[column]), fast_period, slow_period, signal_period)
+        return (pd.Series(macd_line, index=data.index, name=column),
+                pd.Series(signal_line, index=data.index, name=column),
+                pd.Series(histogram, index=data.index, name=column))
+
     exp1 = data[column].ewm(span=fast_period, adjust=False).mean()
     exp2 = data[column].ewm(span=slow_period, adjust=False).mean()
 
@@ -100,3 +179,144 @@ def calculate_macd(data, fast_period=12, slow_period=26, signal_period=9, column
     histogram = macd_line - signal_line
 
     return macd_line, signal_line, histogram
+
+
+# Indicator functions addressable by name, e.g. for IndicatorCache
+INDICATOR_FUNCTIONS = {
+    'rsi': calculate_rsi,
+    'ma': calculate_moving_average,
+    'bb': calculate_bollinger_bands,
+    'macd': calculate_macd,
+}
+
+
+class IndicatorCache:
+    """
+    Cache indicators computed once on a symbol's full history.
+
+    Entries are keyed by (symbol and bar interval, indicator, params, last
+    bar), so a new or updated bar invalidates them naturally. Results are
+    sliced to the requested view, which means switching time ranges costs a
+    slice rather than a recompute, and long-period indicators have warm-up
+    data at the left edge of the view. When the history has only gained bars
+    since the last computation, the previous result is extended with the
+    streaming indicators instead of being recomputed.
+    """
+
+    def __init__(self, max_bytes: int = INDICATOR_CONFIG['cache_max_bytes']):
+        self._cache = LRUCache(max_bytes)
+
+    def get(self, symbol, name, data, view=None, **params):
+        """
+        Get an indicator for a symbol, computing it on a miss.
+
+        Args:
+            symbol (str): Stock ticker symbol
+            name (str): Indicator name, a key of INDICATOR_FUNCTIONS
+            data (pd.DataFrame): Full historical data for the symbol
+            view (pd.Index): Dates to return (default: all of ``data``)
+            **params: Indicator parameters
+
+        Returns:
+            pd.Series or tuple: Indicator values restricted to ``view``
+        """
+        function = INDICATOR_FUNCTIONS[name]
+        if len(data) == 0 or 'Close' not in data.columns:
+            return function(data, **params)
+
+        series_key, key = self._keys(symbol, name, data, params)
+        result, _ = self._cache.get_or_load(
+            key, lambda: self._compute(series_key, name, data, params))
+
+        # The latest entry of each series lives in the same LRU, so it is
+        # bounded by the byte budget and evicted with the rest
+        self._cache.put(self._latest_key(series_key), key)
+
+        if view is None or len(view) == 0:
+            return result
+
+        start = data.index.searchsorted(view[0], side='left')
+        stop = data.index.searchsorted(view[-1], side='right')
+        if isinstance(result, tuple):
+            return tuple(series.iloc[start:stop] for series in result)
+        return result.iloc[start:stop]
+
+    def get_thinned(self, symbol, name, data, view, max_points, output=None,
+                    **params):
+        """
+        Get an indicator line restricted to ``view`` and reduced with LTTB.
+
+        The selected positions are cached next to the indicator, per view
+        and point budget, so rendering the same time range again skips the
+        selection.
+
+        Args:
+            symbol (str): Stock ticker symbol
+            name (str): Indicator name, a key of INDICATOR_FUNCTIONS
+            data (pd.DataFrame): Full historical data for the symbol
+            view (pd.Index): Dates to return
+            max_points (int): Point budget
+            output (int): Position of the line in a tuple result
+            **params: Indicator parameters
+
+        Returns:
+            pd.Series: At most ``max_points`` points of the line
+        """
+        result = self.get(symbol, name, data, view=view, **params)
+        series = result if output is None else result[output]
+        if (not max_points or len(series) <= max_points or len(view) == 0
+                or 'Close' not in data.columns):
+            return series
+
+        _, key = self._keys(symbol, name, data, params)
+        positions = self._cache.get_or_load(
+            key + ('lttb', output, view[0], view[-1], max_points),
+            lambda: lttb_positions(series, max_points))
+        return series.iloc[positions]
+
+    @staticmethod
+    def _keys(symbol, name, data, params) -> tuple:
+        """Get the key of an indicator series and of its entry for ``data``."""
+        # Intraday and resampled histories are series of their own
+        interval = data.attrs.get('interval')
+        if interval is not None:
+            symbol = f"{symbol}@{interval}"
+        series_key = (symbol, name, tuple(sorted(params.items())))
+        return series_key, series_key + (data.index[-1], len(data), data['Close'].iloc[-1])
+
+    @staticmethod
+    def _latest_key(series_key) -> tuple:
+        """Get the key under which the latest entry key of a series is cached."""
+        return ('latest',) + series_key
+
+    def _compute(self, series_key, name, data, params):
+        """Compute an indicator, extending the previous result when possible."""
+        previous_key = self._cache.peek(self._latest_key(series_key))
+        previous = self._cache.get(previous_key) if previous_key else None
+
+        if previous is not None and previous[1] is not None:
+            last_bar, length, last_close = previous_key[3:]
+            if (len(data) > length and data.index[length - 1] == last_bar
+                    and data['Close'].iloc[length - 1] == last_close):
+                result, stream = previous
+                # Cached streams are shared; advance a private copy
+                stream = copy.deepcopy(stream)
+                return extend_indicator(stream, result, data.iloc[length:]), stream
+
+        result = INDICATOR_FUNCTIONS[name](data, **params)
+        # Indicators without a streaming version are recomputed on new bars
+        stream = (STREAMING_INDICATORS[name].from_history(data, **params)
+                  if name in STREAMING_INDICATORS else None)
+        return result, stream
+
+    def clear(self):
+        """Remove all cached indicators."""
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        """Get hit, miss and eviction counters."""
+        return self._cache.stats()
+
+
+# Shared across ChartBuilder instances and callbacks
+indicator_cache = IndicatorCache()
@@ -0,0 +1,323 @@
+"""
+Latency, payload and cache metrics in the Prometheus text format.
+
+Stages of the chart callbacks, the data fetcher and the chart builder are
+timed with ``stage_timer``; whole callbacks with ``instrumented``. The
+metrics live in the process-wide ``REGISTRY`` and are rendered by
+``REGISTRY.render()`` for a ``/metrics`` route. Values are per process: with
+several WSGI workers each worker reports its own.
+"""
+import cProfile
+import functools
+import io
+import logging
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+# Default buckets, in seconds and in bytes
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0)
+BYTE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+def _escape(value) -> str:
+    """Escape a label value for the text format."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        """Add ``amount`` to the series selected by ``labels``."""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} counter'
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            labels = _format_labels(dict(zip(self.labelnames, key)))
+            yield f'{self.name}{labels} {_format_value(value)}'
+
+
+class Histogram:
+    """Cumulative histogram with labels."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        """Record one observation in the series selected by ``labels``."""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> Iterable[str]:
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} histogram'
+        with self._lock:
+            series = [(key, list(counts), total, count)
+                      for key, (counts, total, count) in self._series.items()]
+        for key, counts, total, count in series:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                bucket_labels = _format_labels(
+                    {**labels, 'le': _format_value(float(bound))})
+                yield f'{self.name}_bucket{bucket_labels} {cumulative}'
+            yield f'{self.name}_sum{_format_labels(labels)} {_format_value(total)}'
+            yield f'{self.name}_count{_format_labels(labels)} {count}'
+
+
+class MetricsRegistry:
+    """
+    Metrics of one process.
+
+    Besides the metrics it owns, the registry calls collectors at render
+    time for values kept elsewhere, such as cache counters.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames=(),
+                  buckets=LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def set_collector(self, name: str, collector: Callable[[], Iterable[tuple]]):
+        """
+        Add or replace a collector.
+
+        Args:
+            name (str): Collector name; a later collector with the same
+                name replaces it
+            collector (callable): Returns (metric name, type, help,
+                [(labels, value), ...]) tuples
+        """
+        with self._lock:
+            self._collectors[name] = collector
+
+    def render(self) -> str:
+        """
+        Render all metrics.
+
+        Returns:
+            str: Prometheus text exposition format (version 0.0.4)
+        """
+        with self._lock:
+            metrics = list(self._metrics)
+            collectors = list(self._collectors.values())
+
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collector in collectors:
+            try:
+                families = list(collector())
+            except Exception as e:
+                logging.getLogger(__name__).warning(f"Metrics collector failed: {e}")
+                continue
+            for name, kind, documentation, samples in families:
+                lines.append(f'# HELP {name} {documentation}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in samples:
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'stockcharts_stage_duration_seconds',
+    'Duration of one stage of a chart callback', ['stage'])
+CALLBACK_SECONDS = REGISTRY.histogram(
+    'stockcharts_callback_duration_seconds',
+    'Duration of a Dash callback, excluding serialization', ['callback'])
+FETCH_SECONDS = REGISTRY.histogram(
+    'stockcharts_fetch_duration_seconds',
+    'Duration of upstream fetches per symbol', ['symbol', 'kind'])
+PAYLOAD_BYTES = REGISTRY.histogram(
+    'stockcharts_payload_bytes',
+    'Size of callback responses', ['callback'], buckets=BYTE_BUCKETS)
+CALLBACK_ERRORS = REGISTRY.counter(
+    'stockcharts_callback_errors_total',
+    'Callbacks that raised an exception', ['callback'])
+
+
+def stage_timer(stage: str):
+    """Time a callback stage into ``stockcharts_stage_duration_seconds``."""
+    return STAGE_SECONDS.time(stage=stage)
+
+
+def instrumented(name: str):
+    """
+    Decorate a Dash callback to record its duration.
+
+    The name and duration are also left on ``flask.g`` so the request hooks
+    can label the payload and time the serialization that follows.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            except Exception as e:
+                # PreventUpdate is control flow, not a failure
+                if type(e).__name__ != 'PreventUpdate':
+                    CALLBACK_ERRORS.inc(callback=name)
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                CALLBACK_SECONDS.observe(elapsed, callback=name)
+                _note_callback(name, elapsed)
+        return wrapper
+    return decorator
+
+
+def _note_callback(name: str, elapsed: float):
+    """Record the callback on the Flask request, if there is one."""
+    try:
+        from flask import g, has_request_context
+    except ImportError:
+        return
+    if has_request_context():
+        g.stockcharts_callback = name
+        g.stockcharts_callback_seconds = elapsed
+
+
+class RequestProfiler:
+    """
+    cProfile hook for single requests.
+
+    A request is profiled when it carries the ``X-StockCharts-Profile``
+    header or the ``stockcharts_profile`` cookie. The profile is written to
+    ``directory`` and its top entries are logged. cProfile allows one active
+    profiler per process, so a request arriving while another is profiled
+    runs unprofiled.
+    """
+
+    HEADER = 'X-StockCharts-Profile'
+    COOKIE = 'stockcharts_profile'
+
+    def __init__(self, directory: str, top: int = 25):
+        self.directory = Path(directory).expanduser()
+        self.top = top
+        self.logger = logging.getLogger(__name__)
+        self._active = threading.Lock()
+
+    def wanted(self, request) -> bool:
+        """Whether ``request`` asks to be profiled."""
+        flag = request.headers.get(self.HEADER) or request.cookies.get(self.COOKIE)
+        return (flag or '').lower() in ('1', 'true', 'yes')
+
+    def start(self) -> Optional[cProfile.Profile]:
+        """
+        Start profiling the current request.
+
+        Returns:
+            cProfile.Profile: Running profile, or None if another request
+                is being profiled
+        """
+        if not self._active.acquire(blocking=False):
+            self.logger.info("Another request is being profiled; not profiling this one")
+            return None
+        try:
+            profile = cProfile.Profile()
+            profile.enable()
+        except Exception:
+            self._active.release()
+            raise
+        return profile
+
+    def discard(self, profile: cProfile.Profile):
+        """Stop a profile without saving it."""
+        try:
+            profile.disable()
+        finally:
+            self._active.release()
+
+    def finish(self, profile: cProfile.Profile, label: str) -> Optional[Path]:
+        """
+        Stop a profile, save it and log its most expensive calls.
+
+        Returns:
+            Path: Saved ``.prof`` file, or None if it could not be written
+        """
+        self.discard(profile)
+        stream = io.StringIO()
+        pstats.Stats(profile, stream=stream).sort_stats('cumulative').print_stats(self.top)
+        self.logger.info(f"Profile of {label}:\n{stream.getvalue()}")
+
+        safe_label = ''.join(c if c.isalnum() else '_' for c in label).strip('_')
+        path = self.directory / f"{time.strftime('%Y%m%d-%H%M%S')}-{safe_label}.prof"
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            profile.dump_stats(str(path))
+        except OSError as e:
+            self.logger.warning(f"Could not save profile: {e}")
+            return None
+        return path
@@ -0,0 +1,265 @@
+"""
+Technical indicators over a 2-D price panel (symbols x dates).
+
+Each function computes an indicator for every symbol in one vectorized pass
+along the time axis, so the cost scales with the total number of bars
+rather than with the number of symbols. Missing bars are NaN and are
+skipped the way pandas' ``min_periods=1`` rolling windows and
+``ewm(adjust=False)`` skip them; windows are measured in panel dates.
+"""
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils import indicator_kernels
+from utils import indicators
+
+
+def build_price_panel(frames: Dict[str, pd.DataFrame], column: str = 'Close'
+                      ) -> Tuple[List[str], pd.DatetimeIndex, np.ndarray]:
+    """
+    Align per-symbol history into a NaN-padded 2-D array.
+
+    Args:
+        frames (dict): Mapping of symbol to historical data
+        column (str): Column to extract
+
+    Returns:
+        tuple: (symbols, dates, prices) where prices has shape
+            (len(symbols), len(dates))
+    """
+    symbols = [s for s, frame in frames.items()
+               if frame is not None and column in frame.columns]
+    if not symbols:
+        return [], pd.DatetimeIndex([]), np.empty((0, 0))
+
+    aligned = pd.concat({s: frames[s][column] for s in symbols},
+                        axis=1, join='outer').sort_index()
+    prices = np.ascontiguousarray(aligned.to_numpy(dtype=np.float64).T)
+    return symbols, aligned.index, prices
+
+
+def panel_moving_average(prices: np.ndarray, period: int = 20) -> np.ndarray:
+    """
+    Simple moving average for every row of a price panel.
+
+    Args:
+        prices (np.ndarray): (symbols x dates) prices, NaN for missing bars
+        period (int): Window length in dates
+
+    Returns:
+        np.ndarray: Moving averages, same shape as ``prices``
+    """
+    sums, counts, offset = _window_sums(prices, period)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = sums[0] / counts
+    mean[counts == 0] = np.nan
+    return mean + offset
+
+
+def panel_rolling_std(prices: np.ndarray, period: int = 20) -> np.ndarray:
+    """
+    Rolling sample standard deviation for every row of a price panel.
+
+    Args:
+        prices (np.ndarray): (symbols x dates) prices, NaN for missing bars
+        period (int): Window length in dates
+
+    Returns:
+        np.ndarray: Standard deviations, NaN where fewer than 2 bars exist
+    """
+    sums, counts, _ = _window_sums(prices, period, squares=True)
+    total, total_sq = sums
+    with np.errstate(invalid='ignore', divide='ignore'):
+        variance = (total_sq - total * total / counts) / (counts - 1)
+    variance[counts < 2] = np.nan
+    return np.sqrt(np.maximum(variance, 0.0))
+
+
+def panel_bollinger_bands(prices: np.ndarray, period: int = 20,
+                          std_dev: float = 2) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Bollinger Bands for every row of a price panel.
+
+    Args:
+        prices (np.ndarray): (symbols x dates) prices, NaN for missing bars
+        period (int): Window length in dates
+        std_dev (float): Standard deviation multiplier
+
+    Returns:
+        tuple: (upper_band, middle_band, lower_band) arrays
+    """
+    sums, counts, offset = _window_sums(prices, period, squares=True)
+    total, total_sq = sums
+    with np.errstate(invalid='ignore', divide='ignore'):
+        middle = total / counts
+        variance = (total_sq - total * middle) / (counts - 1)
+    middle[counts == 0] = np.nan
+    variance[counts < 2] = np.nan
+    std = np.sqrt(np.maximum(variance, 0.0))
+
+    middle += offset
+    return middle + std * std_dev, middle, middle - std * std_dev
+
+
+def panel_ema(prices: np.ndarray, span: float) -> np.ndarray:
+    """
+    Exponential moving average (``adjust=False``) for every row.
+
+    Args:
+        prices (np.ndarray): (symbols x dates) prices, NaN for missing bars
+        span (float): EMA span
+
+    Returns:
+        np.ndarray: Exponential moving averages, same shape as ``prices``
+    """
+    prices = np.ascontiguousarray(prices, dtype=np.float64)
+    if indicators.BACKEND == 'numba':
+        return indicator_kernels.ema_2d(prices, span)
+
+    # The recursion runs along time; each step is vectorized over symbols
+    alpha = 2.0 / (span + 1.0)
+    out = np.empty_like(prices)
+    weighted = np.full(prices.shape[0], np.nan)
+    old_weight = np.ones(prices.shape[0])
+    for t in range(prices.shape[1]):
+        weighted, old_weight = _ema_step(weighted, old_weight, prices[:, t], alpha)
+        out[:, t] = weighted
+    return out
+
+
+def panel_macd(prices: np.ndarray, fast_period: int = 12, slow_period: int = 26,
+               signal_period: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    MACD for every row of a price panel.
+
+    Args:
+        prices (np.ndarray): (symbols x dates) prices, NaN for missing bars
+        fast_period (int): Fast EMA period
+        slow_period (int): Slow EMA period
+        signal_period (int): Signal line EMA period
+
+    Returns:
+        tuple: (macd_line, signal_line, histogram) arrays
+    """
+    prices = np.ascontiguousarray(prices, dtype=np.float64)
+    if indicators.BACKEND == 'numba':
+        return indicator_kernels.macd_2d(
+            prices, fast_period, slow_period, signal_period)
+
+    macd_line = panel_ema(prices, fast_period) - panel_ema(prices, slow_period)
+    signal_line = panel_ema(macd_line, signal_period)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+def panel_rsi(prices: np.ndarray, period: int = 14) -> np.ndarray:
+    """
+    RSI for every row of a price panel.
+
+    Price changes are measured against the previous available bar, so a
+    missing bar does not break the series. Rows with no data are 50.
+
+    Args:
+        prices (np.ndarray): (symbols x dates) prices, NaN for missing bars
+        period (int): RSI period in dates
+
+    Returns:
+        np.ndarray: RSI values, same shape as ``prices``
+    """
+    valid = ~np.isnan(prices)
+    previous = _forward_fill(prices)
+    previous = np.concatenate(
+        [np.full((prices.shape[0], 1), np.nan), previous[:, :-1]], axis=1)
+
+    delta = prices - previous
+    gains = np.where(delta > 0, delta, 0.0)
+    losses = np.where(delta < 0, -delta, 0.0)
+    # Only bars that exist count towards the averages
+    gains[~valid] = np.nan
+    losses[~valid] = np.nan
+
+    avg_gain = panel_moving_average(gains, period)
+    avg_loss = panel_moving_average(losses, period)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rsi = 100 - 100 / (1 + avg_gain / np.where(avg_loss == 0, np.nan, avg_loss))
+    return np.where(np.isnan(rsi), 50.0, rsi)
+
+
+def compute_panel_indicators(prices: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Compute the chart's standard indicator set for every symbol.
+
+    Args:
+        prices (np.ndarray): (symbols x dates) closing prices
+
+    Returns:
+        dict: 2-D arrays aligned with ``prices``, keyed by series name
+    """
+    upper, middle, lower = panel_bollinger_bands(prices)
+    macd_line, signal_line, histogram = panel_macd(prices)
+    return {
+        'ma20': panel_moving_average(prices, 20),
+        'ma50': panel_moving_average(prices, 50),
+        'bb_upper': upper,
+        'bb_middle': middle,
+        'bb_lower': lower,
+        'rsi': panel_rsi(prices),
+        'macd': macd_line,
+        'macd_signal': signal_line,
+        'macd_histogram': histogram,
+    }
+
+
+def _window_sums(prices: np.ndarray, period: int, squares: bool = False):
+    """
+    Rolling sums and valid-bar counts along the time axis via cumulative sums.
+
+    Values are shifted by each row's first valid price before summing to
+    limit cancellation error; that offset is returned so means can be
+    shifted back. Variance is unaffected by the shift.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    valid = ~np.isnan(prices)
+
+    first_valid = np.argmax(valid, axis=1)
+    offset = prices[np.arange(prices.shape[0]), first_valid]
+    offset = np.where(np.isnan(offset), 0.0, offset)[:, None]
+    centred = np.where(valid, prices - offset, 0.0)
+
+    def _rolling(values):
+        cumulative = np.zeros((values.shape[0], values.shape[1] + 1))
+        np.cumsum(values, axis=1, out=cumulative[:, 1:])
+        lagged = np.zeros_like(cumulative[:, 1:])
+        lagged[:, period:] = cumulative[:, 1:-period] if period > 0 else 0
+        return cumulative[:, 1:] - lagged
+
+    sums = [_rolling(centred)]
+    if squares:
+        sums.append(_rolling(centred * centred))
+    counts = _rolling(valid.astype(np.float64))
+    return sums, counts, offset
+
+
+def _ema_step(weighted, old_weight, values, alpha):
+    """Vectorized ``ewm(adjust=False)`` step matching pandas NaN handling."""
+    has_value = ~np.isnan(values)
+    started = ~np.isnan(weighted)
+
+    old_weight = np.where(started, old_weight * (1.0 - alpha), old_weight)
+    update = started & has_value
+    with np.errstate(invalid='ignore'):
+        blended = (old_weight * weighted + alpha * values) / (old_weight + alpha)
+    weighted = np.where(update, blended, weighted)
+    old_weight = np.where(update, 1.0, old_weight)
+    weighted = np.where(~started & has_value, values, weighted)
+    return weighted, old_weight
+
+
+def _forward_fill(values: np.ndarray) -> np.ndarray:
+    """Forward-fill NaNs along the time axis."""
+    valid = ~np.isnan(values)
+    index = np.where(valid, np.arange(values.shape[1]), 0)
+    np.maximum.accumulate(index, axis=1, out=index)
+    filled = values[np.arange(values.shape[0])[:, None], index]
+    return filled
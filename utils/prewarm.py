@@ -0,0 +1,162 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional
+
+
+class WatchlistWarmer:
+    """
+    Pre-load a watchlist of symbols into a StockDataFetcher.
+
+    Symbols are requested in batches through the provider's bulk download
+    and batches run concurrently on a bounded thread pool.
+    """
+
+    def __init__(self, data_fetcher, symbols: List[str], batch_size: int = 10,
+                 max_workers: int = 4):
+        self.data_fetcher = data_fetcher
+        self.symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+        self.batch_size = max(1, batch_size)
+        self.max_workers = max(1, max_workers)
+        self.logger = logging.getLogger(__name__)
+
+        self.loaded = []
+        self.failed = []
+        self.elapsed = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self) -> threading.Thread:
+        """
+        Warm the watchlist on a daemon thread.
+
+        Returns:
+            threading.Thread: The running warm-up thread
+        """
+        self._thread = threading.Thread(
+            target=self.run, name='watchlist-warmer', daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for a background warm-up to finish.
+
+        Args:
+            timeout (float): Maximum seconds to wait
+
+        Returns:
+            bool: True if warming has finished
+        """
+        if self._thread is None:
+            return True
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def run(self) -> dict:
+        """
+        Warm all symbols using bulk downloads on a bounded thread pool.
+
+        Returns:
+            dict: Loaded and failed symbols plus elapsed seconds
+        """
+        started = time.perf_counter()
+        total = len(self.symbols)
+        if total == 0:
+            return self.summary()
+
+        self.logger.info(f"Pre-warming {total} watchlist symbol(s)")
+
+        # Metadata is fetched on its own executor while the history loads
+        for symbol in self.symbols:
+            self.data_fetcher.prefetch_stock_info(symbol)
+
+        batches = [self.symbols[i:i + self.batch_size]
+                   for i in range(0, total, self.batch_size)]
+
+        # Workers sharing a history cache warm one at a time; later ones
+        # find the symbols already shared and skip the download
+        with self.data_fetcher.shared_cache.lock('watchlist'), \
+                ThreadPoolExecutor(max_workers=self.max_workers,
+                                   thread_name_prefix='prewarm') as executor:
+            futures = {executor.submit(self._warm_batch, batch): batch
+                       for batch in batches}
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    loaded = future.result()
+                except Exception as e:
+                    self.logger.warning(f"Pre-warm batch {batch} failed: {e}")
+                    loaded = []
+
+                with self._lock:
+                    self.loaded.extend(loaded)
+                    self.failed.extend(s for s in batch if s not in loaded)
+                    done = len(self.loaded) + len(self.failed)
+
+                self.logger.info(
+                    f"Pre-warmed {done}/{total} symbols "
+                    f"({time.perf_counter() - started:.1f}s)")
+
+        self.elapsed = time.perf_counter() - started
+        self.logger.info(
+            f"Pre-warm finished: {len(self.loaded)} loaded, "
+            f"{len(self.failed)} failed in {self.elapsed:.1f}s")
+        if self.failed:
+            self.logger.warning(f"Could not pre-warm: {', '.join(self.failed)}")
+
+        return self.summary()
+
+    def summary(self) -> dict:
+        """Get the result of the last warm-up."""
+        with self._lock:
+            return {
+                'loaded': list(self.loaded),
+                'failed': list(self.failed),
+                'elapsed': self.elapsed,
+            }
+
+    def _warm_batch(self, symbols: List[str]) -> List[str]:
+        """
+        Load one batch of symbols and hand them to the fetcher.
+
+        Symbols without stored history are downloaded in full; symbols with
+        stored history only fetch bars from the earliest last-stored date.
+
+        Args:
+            symbols (list): Symbols in the batch
+
+        Returns:
+            list: Symbols that were loaded
+        """
+        store = self.data_fetcher.store
+        provider = self.data_fetcher.provider
+
+        # Symbols another worker already loaded come from the shared cache
+        loaded = [s for s in symbols
+                  if self.data_fetcher.shared_cache.get(s) is not None
+                  and self.data_fetcher.get_stock_history(s) is not None]
+        symbols = [s for s in symbols if s not in loaded]
+        if not symbols:
+            return loaded
+
+        stored = {symbol: store.load(symbol) for symbol in symbols}
+
+        full = [s for s in symbols if stored[s] is None]
+        incremental = [s for s in symbols if stored[s] is not None]
+
+        fresh = {}
+        if full:
+            fresh.update(provider.get_history_many(full))
+        if incremental:
+            start = min(stored[s].index[-1] for s in incremental)
+            fresh.update(provider.get_history_many(
+                incremental, start=start.strftime('%Y-%m-%d')))
+
+        for symbol in symbols:
+            hist = self.data_fetcher.ingest_history(
+                symbol, fresh.get(symbol), stored=stored[symbol])
+            if hist is not None and not hist.empty:
+                loaded.append(symbol)
+        return loaded
@@ -0,0 +1,368 @@
+import json
+import logging
+import re
+import zlib
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.resampling import parse_interval
+
+# Longest period Yahoo Finance serves per intraday interval
+_INTRADAY_PERIODS = {
+    '1m': '7d', '2m': '60d', '5m': '60d', '15m': '60d', '30m': '60d',
+    '60m': '730d', '90m': '60d', '1h': '730d',
+}
+
+
+class DataProvider(ABC):
+    """Base class for sources of OHLCV history and symbol metadata."""
+
+    # Whether fetched history should be persisted to the local history store
+    persist = True
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+    @abstractmethod
+    def get_history(self, symbol: str) -> Optional[pd.DataFrame]:
+        """
+        Get the full available history for a symbol.
+
+        Args:
+            symbol (str): Stock ticker symbol
+
+        Returns:
+            pd.DataFrame: OHLCV history indexed by date, or None
+        """
+
+    def get_history_range(self, symbol: str, start, end=None) -> Optional[pd.DataFrame]:
+        """
+        Get history from ``start`` (inclusive) up to ``end``.
+
+        Args:
+            symbol (str): Stock ticker symbol
+            start: First date to include
+            end: Last date to include (default: latest available)
+
+        Returns:
+            pd.DataFrame: OHLCV history indexed by date, or None
+        """
+        hist = self.get_history(symbol)
+        if hist is None:
+            return None
+        return _slice_dates(hist, start, end)
+
+    def get_history_many(self, symbols: List[str], start=None) -> Dict[str, pd.DataFrame]:
+        """
+        Get history for several symbols.
+
+        Args:
+            symbols (list): Stock ticker symbols
+            start: First date to include (default: full history)
+
+        Returns:
+            dict: Mapping of symbol to history for symbols with data
+        """
+        result = {}
+        for symbol in symbols:
+            hist = (self.get_history(symbol) if start is None
+                    else self.get_history_range(symbol, start))
+            if hist is not None and not hist.empty:
+                result[symbol] = hist
+        return result
+
+    def get_intraday(self, symbol: str, interval: str) -> Optional[pd.DataFrame]:
+        """
+        Get the recent intraday history available for a symbol.
+
+        Args:
+            symbol (str): Stock ticker symbol
+            interval (str): Intraday bar interval, e.g. '5m'
+
+        Returns:
+            pd.DataFrame: OHLCV bars indexed by time, or None if the
+                provider has no intraday data
+        """
+        return None
+
+    def get_info(self, symbol: str) -> Optional[dict]:
+        """
+        Get metadata for a symbol.
+
+        Args:
+            symbol (str): Stock ticker symbol
+
+        Returns:
+            dict: Info with at least 'symbol', or None if unavailable
+        """
+        return None
+
+
+class YFinanceProvider(DataProvider):
+    """Fetch data from Yahoo Finance."""
+
+    def __init__(self):
+        super().__init__()
+        import yfinance as yf
+        self.yf = yf
+
+    def get_history(self, symbol: str) -> Optional[pd.DataFrame]:
+        return self.yf.Ticker(symbol).history(period='max')
+
+    def get_history_range(self, symbol: str, start, end=None) -> Optional[pd.DataFrame]:
+        return self.yf.Ticker(symbol).history(
+            start=_format_date(start), end=_format_date(end))
+
+    def get_history_many(self, symbols: List[str], start=None) -> Dict[str, pd.DataFrame]:
+        # One bulk request instead of one Ticker per symbol. Match the
+        # Ticker.history() defaults so stored and bulk data line up.
+        range_kwargs = ({'period': 'max'} if start is None
+                        else {'start': _format_date(start)})
+        data = self.yf.download(
+            symbols, group_by='ticker', auto_adjust=True, actions=True,
+            ignore_tz=False, threads=False, progress=False, **range_kwargs)
+
+        if data is None or data.empty:
+            return {}
+
+        result = {}
+        for symbol in symbols:
+            if isinstance(data.columns, pd.MultiIndex):
+                if symbol not in data.columns.get_level_values(0):
+                    continue
+                frame = data[symbol]
+            else:
+                frame = data
+            frame = frame.dropna(how='all')
+            if not frame.empty:
+                result[symbol] = frame
+        return result
+
+    def get_intraday(self, symbol: str, interval: str) -> Optional[pd.DataFrame]:
+        return self.yf.Ticker(symbol).history(
+            period=_INTRADAY_PERIODS.get(interval, '60d'), interval=interval)
+
+    def get_info(self, symbol: str) -> Optional[dict]:
+        info = self.yf.Ticker(symbol).info
+        if not info or 'symbol' not in info:
+            return None
+
+        # Only a handful of fields are used; keep the cached entry small
+        return {
+            'symbol': info['symbol'],
+            'shortName': info.get('shortName') or info['symbol'],
+            'longName': info.get('longName'),
+            'currency': info.get('currency'),
+            'exchange': info.get('exchange'),
+        }
+
+
+class LocalDirectoryProvider(DataProvider):
+    """
+    Read history from a directory holding one Parquet or CSV file per symbol.
+
+    Files are named after the symbol, e.g. ``AAPL.parquet`` or ``^DJI.csv``;
+    the case of the name does not matter.
+    CSV files need the date in the first column and OHLCV columns named
+    like Yahoo Finance output. An optional ``<symbol>.json`` file supplies
+    the info. Intraday bars are read from a subdirectory named after the
+    interval, e.g. ``5m/AAPL.parquet``.
+    """
+
+    persist = False
+
+    def __init__(self, directory: str):
+        super().__init__()
+        self.directory = Path(directory).expanduser()
+
+    def get_history(self, symbol: str) -> Optional[pd.DataFrame]:
+        data = self._read(self.directory, symbol)
+        if data is None:
+            self.logger.warning(f"No data file for {symbol} in {self.directory}")
+        return data
+
+    def get_intraday(self, symbol: str, interval: str) -> Optional[pd.DataFrame]:
+        return self._read(self.directory / interval, symbol)
+
+    @staticmethod
+    def _read(directory: Path, symbol: str) -> Optional[pd.DataFrame]:
+        """Read the Parquet or CSV file of a symbol in ``directory``."""
+        parquet_path = LocalDirectoryProvider._find(directory, symbol, '.parquet')
+        csv_path = LocalDirectoryProvider._find(directory, symbol, '.csv')
+
+        if parquet_path is not None:
+            data = pd.read_parquet(parquet_path)
+        elif csv_path is not None:
+            data = pd.read_csv(csv_path, index_col=0)
+            data.index = pd.to_datetime(data.index, utc=True)
+        else:
+            return None
+
+        data.index.name = 'Date'
+        return data.sort_index()
+
+    def get_info(self, symbol: str) -> Optional[dict]:
+        path = self._find(self.directory, symbol, '.json')
+        if path is None:
+            return None
+        with open(path) as f:
+            info = json.load(f)
+        info.setdefault('symbol', symbol)
+        return info
+
+    @staticmethod
+    def _find(directory: Path, symbol: str, suffix: str) -> Optional[Path]:
+        """
+        Find the file of a symbol in ``directory``, ignoring the case of its name.
+
+        Symbols are upper-cased before they reach the provider, so a
+        lower-case ``aapl.parquet`` is still found on case-sensitive
+        filesystems.
+        """
+        path = directory / f"{safe_file_stem(symbol)}{suffix}"
+        if path.exists():
+            return path
+        if not directory.is_dir():
+            return None
+
+        name = path.name.casefold()
+        return next((candidate for candidate in sorted(directory.iterdir())
+                     if candidate.name.casefold() == name and candidate.is_file()),
+                    None)
+
+
+class SyntheticProvider(DataProvider):
+    """
+    Generate random-walk OHLCV history of any length.
+
+    The series for a symbol depends only on the symbol, ``seed``, ``bars``
+    and ``end``, so repeated runs produce identical data. Intraday series
+    have ``bars`` bars in 9:30-16:00 sessions and are independent of the
+    daily series.
+    """
+
+    persist = False
+
+    def __init__(self, bars: int = 10000, seed: int = 0, end=None,
+                 start_price: float = 100.0, volatility: float = 0.01):
+        super().__init__()
+        self.bars = bars
+        self.seed = seed
+        self.end = pd.Timestamp(end or pd.Timestamp.today()).normalize()
+        self.start_price = start_price
+        self.volatility = volatility
+
+    def get_history(self, symbol: str) -> Optional[pd.DataFrame]:
+        # Second resolution keeps very long series within datetime bounds
+        index = pd.bdate_range(
+            end=self.end, periods=self.bars, name='Date', unit='s'
+        ).tz_localize('America/New_York', ambiguous=False,
+                      nonexistent='shift_forward')
+        return self._random_walk(symbol, index, self.volatility)
+
+    def get_intraday(self, symbol: str, interval: str) -> Optional[pd.DataFrame]:
+        count, unit = parse_interval(interval)
+        step = count * 60 if unit == 'h' else count
+        per_session = max(390 // step, 1)
+        sessions = pd.bdate_range(
+            end=self.end, periods=-(-self.bars // per_session), unit='s')
+        offsets = (np.timedelta64(9 * 60 + 30, 'm')
+                   + np.arange(per_session) * np.timedelta64(step, 'm'))
+        times = (sessions.to_numpy()[:, None] + offsets[None, :]).ravel()
+        index = pd.DatetimeIndex(times[-self.bars:], name='Date').tz_localize(
+            'America/New_York', ambiguous=False, nonexistent='shift_forward')
+        # Scale the daily volatility down to the bar length
+        return self._random_walk(f"{symbol}@{interval}", index,
+                                 self.volatility * np.sqrt(step / 390))
+
+    def _random_walk(self, key: str, index: pd.DatetimeIndex,
+                     volatility: float) -> pd.DataFrame:
+        """Random-walk OHLCV bars on ``index``, seeded by ``key``."""
+        rng = np.random.default_rng(
+            [self.seed, zlib.crc32(key.upper().encode())])
+        n = len(index)
+
+        returns = rng.normal(0.0, volatility, n)
+        close = self.start_price * np.exp(np.cumsum(returns))
+        open_ = np.empty(n)
+        open_[0] = self.start_price
+        open_[1:] = close[:-1] * (1 + rng.normal(0, volatility / 4, n - 1))
+        spread = np.abs(rng.normal(0, volatility / 2, n))
+        high = np.maximum(open_, close) * (1 + spread)
+        low = np.minimum(open_, close) * (1 - spread)
+        volume = rng.integers(1_000_000, 10_000_000, n)
+
+        return pd.DataFrame({
+            'Open': open_,
+            'High': high,
+            'Low': low,
+            'Close': close,
+            'Volume': volume,
+            'Dividends': 0.0,
+            'Stock Splits': 0.0,
+        }, index=index)
+
+    def get_info(self, symbol: str) -> Optional[dict]:
+        return {'symbol': symbol, 'shortName': f"{symbol} (synthetic)"}
+
+
+def create_provider(name: str, **options) -> DataProvider:
+    """
+    Create a data provider by name.
+
+    Args:
+        name (str): 'yfinance', 'local' or 'synthetic'
+        **options: Provider specific options ('directory' for local;
+            'bars' and 'seed' for synthetic)
+
+    Returns:
+        DataProvider: Configured provider
+    """
+    if name == 'yfinance':
+        return YFinanceProvider()
+    if name == 'local':
+        return LocalDirectoryProvider(options['directory'])
+    if name == 'synthetic':
+        return SyntheticProvider(bars=options.get('bars', 10000),
+                                 seed=options.get('seed', 0))
+    raise ValueError(f"Unknown data provider: {name}")
+
+
+def safe_file_stem(symbol: str) -> str:
+    """
+    Map a symbol to the stem of the files stored for it.
+
+    Args:
+        symbol (str): Stock ticker symbol, or another name such as a lock name
+
+    Returns:
+        str: Upper-cased name with characters unsafe in file names replaced
+    """
+    return re.sub(r'[^A-Za-z0-9._^=-]', '_', symbol.upper())
+
+
+def _format_date(value) -> Optional[str]:
+    """Format a date-like value as YYYY-MM-DD for upstream requests."""
+    if value is None:
+        return None
+    return pd.Timestamp(value).strftime('%Y-%m-%d')
+
+
+def _slice_dates(data: pd.DataFrame, start, end=None) -> pd.DataFrame:
+    """Select rows between two dates, honouring the index timezone."""
+    def _align(value):
+        ts = pd.Timestamp(value)
+        if data.index.tz is not None and ts.tz is None:
+            return ts.tz_localize(data.index.tz)
+        if data.index.tz is None and ts.tz is not None:
+            return ts.tz_localize(None)
+        return ts
+
+    mask = data.index >= _align(start)
+    if end is not None:
+        mask &= data.index <= _align(end)
+    return data[mask]
@@ -0,0 +1,138 @@
+import logging
+import threading
+import time
+from typing import Hashable, List, Optional
+
+
+class AccessTracker:
+    """
+    Thread-safe access frequency per key with exponential decay.
+
+    Each access adds one to the key's score and scores halve every
+    ``half_life`` seconds, so the hottest keys are the ones requested most
+    often recently.
+    """
+
+    def __init__(self, half_life: float = 30 * 60, max_keys: int = 10000):
+        self.half_life = half_life
+        self.max_keys = max_keys
+        self._scores = {}
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+
+    def record(self, key: Hashable):
+        """Count one access to ``key``."""
+        # Scores are kept in units of the start time to avoid decaying every
+        # key on each access: a later access simply weighs more
+        weight = 2.0 ** ((time.monotonic() - self._start) / self.half_life)
+        with self._lock:
+            self._scores[key] = self._scores.get(key, 0.0) + weight
+            if weight > 1e100:
+                self._rebase()
+            if len(self._scores) > self.max_keys:
+                coldest = min(self._scores, key=self._scores.get)
+                del self._scores[coldest]
+
+    def hottest(self, count: int) -> List[Hashable]:
+        """
+        Get the most frequently accessed keys.
+
+        Args:
+            count (int): Maximum number of keys
+
+        Returns:
+            list: Keys, hottest first
+        """
+        with self._lock:
+            ranked = sorted(self._scores, key=self._scores.get, reverse=True)
+        return ranked[:count]
+
+    def score(self, key: Hashable) -> float:
+        """Get the decayed number of accesses to ``key``."""
+        decay = 2.0 ** (-(time.monotonic() - self._start) / self.half_life)
+        with self._lock:
+            return self._scores.get(key, 0.0) * decay
+
+    def _rebase(self):
+        """Move the reference time to now before weights overflow. Caller holds the lock."""
+        decay = 2.0 ** (-(time.monotonic() - self._start) / self.half_life)
+        self._scores = {k: v * decay for k, v in self._scores.items()}
+        self._start = time.monotonic()
+
+
+class RefreshScheduler:
+    """
+    Periodically refresh the most requested symbols of a StockDataFetcher.
+
+    Refreshes fetch only the bars since the cached copy's last bar, and the
+    cached copy keeps being served until the new one replaces it, so users
+    of popular symbols never wait for an upstream fetch.
+    """
+
+    def __init__(self, data_fetcher, interval: float = 5 * 60, top_n: int = 20):
+        self.data_fetcher = data_fetcher
+        self.interval = interval
+        self.top_n = top_n
+        self.logger = logging.getLogger(__name__)
+
+        self.cycles = 0
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self) -> threading.Thread:
+        """
+        Refresh on a daemon thread every ``interval`` seconds.
+
+        Returns:
+            threading.Thread: The running scheduler thread
+        """
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name='refresh-scheduler', daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stop the scheduler after the current cycle.
+
+        Args:
+            timeout (float): Maximum seconds to wait for the thread
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run_once(self) -> List[str]:
+        """
+        Refresh the hottest cached symbols once.
+
+        Returns:
+            list: Symbols that were refreshed
+        """
+        started = time.perf_counter()
+        refreshed = []
+        for symbol in self.data_fetcher.access_tracker.hottest(self.top_n):
+            if self._stop.is_set():
+                break
+            # Symbols that dropped out of the cache are loaded on demand
+            if self.data_fetcher.cache.peek(symbol) is None:
+                continue
+            try:
+                if self.data_fetcher.refresh_history(
+                        symbol, max_age=self.interval) is not None:
+                    refreshed.append(symbol)
+            except Exception as e:
+                self.logger.warning(f"Refresh of {symbol} failed: {e}")
+
+        self.cycles += 1
+        if refreshed:
+            self.logger.info(
+                f"Refreshed {len(refreshed)} hot symbol(s) in "
+                f"{time.perf_counter() - started:.1f}s")
+        return refreshed
+
+    def _run(self):
+        """Scheduler loop."""
+        while not self._stop.wait(self.interval):
+            self.run_once()
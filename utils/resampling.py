@@ -0,0 +1,125 @@
+"""
+Resample OHLCV history to coarser bar intervals.
+
+Coarser intervals are built from the finest interval that is downloaded
+(see ``INTERVALS`` in config.py) instead of being downloaded themselves:
+weekly, monthly and quarterly bars from daily history, and hourly bars from
+intraday history. Bars are grouped by calendar bucket in the wall-clock
+time of the index and aggregated in one vectorized pass (first open, max
+high, min low, last close, summed volume). Each bar is stamped with the
+date of its first source bar, so weeks starting on a holiday and months
+starting on a weekend are stamped with a real trading session.
+
+Intraday buckets start at the session open rather than on the clock, as
+Yahoo Finance's do: with a 09:30 open, hourly bars cover 09:30-10:30,
+10:30-11:30 and so on, and the last one the remaining half hour.
+
+Resampled frames carry their interval in ``attrs['interval']``, which keeps
+their indicators apart from those of the source history in the indicator
+cache.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from utils.downsampling import aggregate_ohlcv
+
+# Interval names follow Yahoo Finance: 5m, 1h, 1d, 1wk, 1mo, 3mo
+_INTERVAL_PATTERN = re.compile(r'^(\d+)(m|h|d|wk|mo)$')
+
+
+def parse_interval(interval: str) -> tuple:
+    """
+    Split an interval name into a count and a unit.
+
+    Args:
+        interval (str): Interval name, e.g. '15m', '1h', '1wk' or '3mo'
+
+    Returns:
+        tuple: (count, unit) with unit 'm', 'h', 'd', 'wk' or 'mo'
+    """
+    match = _INTERVAL_PATTERN.match(interval or '')
+    if match is None or int(match.group(1)) < 1:
+        raise ValueError(f"Unknown bar interval: {interval!r}")
+    return int(match.group(1)), match.group(2)
+
+
+def is_intraday(interval: str) -> bool:
+    """Whether bars of ``interval`` are shorter than a day."""
+    return parse_interval(interval)[1] in ('m', 'h')
+
+
+def bucket_keys(index: pd.DatetimeIndex, interval: str) -> np.ndarray:
+    """
+    Number the calendar bucket of ``interval`` holding each date.
+
+    Args:
+        index (pd.DatetimeIndex): Sorted dates
+        interval (str): Bar interval
+
+    Returns:
+        np.ndarray: int64 bucket number per date, non-decreasing
+    """
+    count, unit = parse_interval(interval)
+    if index.tz is not None:
+        # Sessions are bucketed in exchange time, not UTC
+        index = index.tz_localize(None)
+    dates = index.to_numpy()
+
+    if unit in ('m', 'h'):
+        size = count * 60 if unit == 'h' else count
+        minutes = dates.astype('datetime64[m]').view(np.int64)
+        return (minutes - session_offset(minutes, size)) // size
+    if unit == 'd':
+        return dates.astype('datetime64[D]').view(np.int64) // count
+    if unit == 'wk':
+        # 1970-01-01 was a Thursday; weeks start on Monday
+        days = dates.astype('datetime64[D]').view(np.int64)
+        return (days + 3) // (7 * count)
+    months = dates.astype('datetime64[M]').view(np.int64)
+    return months // count
+
+
+def session_offset(minutes: np.ndarray, size: int) -> int:
+    """
+    Get the offset that aligns intraday buckets to the session open.
+
+    The open is the most common time of the first bar of a day, so a day
+    whose first bars are missing does not move the buckets.
+
+    Args:
+        minutes (np.ndarray): Sorted wall-clock times in minutes since the epoch
+        size (int): Bucket length in minutes
+
+    Returns:
+        int: Minutes past a multiple of ``size`` at which buckets start
+    """
+    if len(minutes) == 0:
+        return 0
+    days = minutes // (24 * 60)
+    first_bars = minutes[np.flatnonzero(np.r_[True, days[1:] != days[:-1]])]
+    offsets, counts = np.unique(first_bars % size, return_counts=True)
+    return int(offsets[np.argmax(counts)])
+
+
+def resample_ohlcv(data: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """
+    Aggregate OHLCV bars into bars of ``interval``.
+
+    Args:
+        data (pd.DataFrame): Sorted OHLCV history of a finer interval
+        interval (str): Target bar interval
+
+    Returns:
+        pd.DataFrame: One bar per non-empty bucket, with
+            ``attrs['interval']`` set
+    """
+    if data.empty:
+        resampled = data.copy()
+    else:
+        keys = bucket_keys(data.index, interval)
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        resampled = aggregate_ohlcv(data, starts)
+    resampled.attrs['interval'] = interval
+    return resampled
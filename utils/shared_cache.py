@@ -0,0 +1,212 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Optional
+
+import pandas as pd
+
+from utils.providers import safe_file_stem
+
+try:
+    import pyarrow as pa
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are serialised
+    fcntl = None
+
+
+class SharedHistoryCache:
+    """
+    Host-wide history cache shared by worker processes.
+
+    Each symbol is stored as an uncompressed Arrow IPC file that readers
+    memory-map, so all workers on a host share the same page-cache pages
+    instead of holding their own copy. Misses are loaded under an exclusive
+    ``fcntl`` file lock per symbol, so a symbol is downloaded by one worker
+    while the others wait and then read its file.
+    """
+
+    def __init__(self, directory: str, ttl: Optional[float] = None,
+                 enabled: bool = True):
+        self.directory = Path(directory).expanduser()
+        self.ttl = ttl
+        self.logger = logging.getLogger(__name__)
+        self.enabled = enabled and ARROW_AVAILABLE
+        self._thread_locks = {}
+        self._thread_locks_guard = threading.Lock()
+
+        if enabled and not ARROW_AVAILABLE:
+            self.logger.warning(
+                "pyarrow is not installed; shared history cache disabled")
+
+    def path_for(self, symbol: str) -> Path:
+        """
+        Get the file path used to cache a symbol.
+
+        Args:
+            symbol (str): Stock ticker symbol
+
+        Returns:
+            Path: Location of the symbol's Arrow file
+        """
+        return self.directory / f"{safe_file_stem(symbol)}.arrow"
+
+    @contextmanager
+    def lock(self, name: str, blocking: bool = True):
+        """
+        Hold a host-wide lock shared by all worker processes.
+
+        Args:
+            name (str): Lock name, e.g. a symbol
+            blocking (bool): Wait for the lock instead of giving up
+
+        Yields:
+            bool: True if the lock was acquired
+        """
+        if not self.enabled:
+            yield True
+            return
+
+        # flock is per open file, so threads of one process also need a
+        # process-local lock to exclude each other
+        with self._thread_locks_guard:
+            thread_lock = self._thread_locks.setdefault(name, threading.Lock())
+        if not thread_lock.acquire(blocking):
+            yield False
+            return
+
+        try:
+            if fcntl is None:
+                yield True
+                return
+
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.directory / f"{safe_file_stem(name)}.lock", 'a') as handle:
+                flags = fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB)
+                try:
+                    fcntl.flock(handle, flags)
+                except BlockingIOError:
+                    yield False
+                    return
+                try:
+                    yield True
+                finally:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+        finally:
+            thread_lock.release()
+
+    def get(self, symbol: str, max_age: Optional[float] = None) -> Optional[pd.DataFrame]:
+        """
+        Get a symbol's history if it is cached and not expired.
+
+        Args:
+            symbol (str): Stock ticker symbol
+            max_age (float): Maximum age in seconds (default: cache TTL)
+
+        Returns:
+            pd.DataFrame: History backed by the memory-mapped file, or None
+        """
+        if not self.enabled:
+            return None
+
+        path = self.path_for(symbol)
+        try:
+            modified = path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+        max_age = self.ttl if max_age is None else max_age
+        if max_age is not None and time.time() - modified > max_age:
+            return None
+
+        try:
+            return self._read(path)
+        except Exception as e:
+            self.logger.warning(f"Could not read shared history for {symbol}: {e}")
+            return None
+
+    def put(self, symbol: str, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Atomically write a symbol's history for all workers.
+
+        Args:
+            symbol (str): Stock ticker symbol
+            data (pd.DataFrame): History to share
+
+        Returns:
+            pd.DataFrame: The history read back from the shared file, or
+                ``data`` if it could not be shared
+        """
+        if not self.enabled or data is None or data.empty:
+            return data
+
+        path = self.path_for(symbol)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            table = pa.Table.from_pandas(data, preserve_index=True)
+            # Write next to the target and rename so readers never map a
+            # partially written file; mapped readers of the old file keep it
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.arrow.tmp')
+            os.close(fd)
+            try:
+                with pa.OSFile(tmp_path, 'wb') as sink:
+                    with pa.ipc.new_file(sink, table.schema) as writer:
+                        writer.write_table(table)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            return self._read(path)
+        except Exception as e:
+            self.logger.warning(f"Could not share history for {symbol}: {e}")
+            return data
+
+    def get_or_load(self, symbol: str,
+                    loader: Callable[[], Optional[pd.DataFrame]],
+                    max_age: Optional[float] = None) -> Optional[pd.DataFrame]:
+        """
+        Get a symbol's history, loading it once per host on a miss.
+
+        Args:
+            symbol (str): Stock ticker symbol
+            loader (callable): Downloads the history; called by at most one
+                worker at a time
+            max_age (float): Reload histories older than this many seconds
+                (default: cache TTL)
+
+        Returns:
+            pd.DataFrame: History or None if the loader found none
+        """
+        if not self.enabled:
+            return loader()
+
+        data = self.get(symbol, max_age)
+        if data is not None:
+            return data
+
+        with self.lock(symbol):
+            # Another worker may have loaded it while we waited
+            data = self.get(symbol, max_age)
+            if data is not None:
+                return data
+            return self.put(symbol, loader())
+
+    def delete(self, symbol: str):
+        """Remove a symbol's shared history."""
+        path = self.path_for(symbol)
+        if path.exists():
+            path.unlink()
+
+    @staticmethod
+    def _read(path: Path) -> pd.DataFrame:
+        """Map an Arrow file; numeric columns are not copied into the process."""
+        source = pa.memory_map(str(path), 'r')
+        table = pa.ipc.open_file(source).read_all()
+        return table.to_pandas(split_blocks=True)
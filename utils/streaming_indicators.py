@@ -0,0 +1,326 @@
+"""
+Incremental versions of the indicators in utils.indicators.
+
+Each class keeps its rolling state and updates in O(1) per appended bar, so
+live charts and the incremental history store can extend indicators
+without reprocessing the whole history. Outputs match the batch functions
+to within float tolerance (RSI only once at least ``period`` bars exist,
+because the batch version returns nothing for shorter inputs).
+"""
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+
+class StreamingSMA:
+    """Simple moving average using a running sum over a fixed window."""
+
+    def __init__(self, period=20, column='Close'):
+        self.period = period
+        self.column = column
+        self._window = deque()
+        self._sum = 0.0
+        self._count = 0
+
+    @classmethod
+    def from_history(cls, data, **params):
+        """
+        Create a stream positioned after the last bar of ``data``.
+
+        Args:
+            data (pd.DataFrame): Stock data
+            **params: Constructor parameters
+
+        Returns:
+            StreamingSMA: Stream ready for the next bar
+        """
+        stream = cls(**params)
+        for value in data[stream.column].to_numpy(dtype=float)[-stream.period:]:
+            stream._push(value)
+        return stream
+
+    def update(self, value):
+        """
+        Add one bar and return the new moving average.
+
+        Args:
+            value (float): New price
+
+        Returns:
+            float: Moving average including ``value``
+        """
+        self._push(value)
+        return self._sum / self._count if self._count else math.nan
+
+    def _push(self, value):
+        value = float(value)
+        self._window.append(value)
+        if not math.isnan(value):
+            self._sum += value
+            self._count += 1
+
+        if len(self._window) > self.period:
+            old = self._window.popleft()
+            if not math.isnan(old):
+                self._sum -= old
+                self._count -= 1
+
+
+class StreamingBollingerBands:
+    """
+    Bollinger Bands using Welford's algorithm over a sliding window.
+
+    As in the batch version, a window of identical values has exactly zero
+    width.
+    """
+
+    def __init__(self, period=20, std_dev=2, column='Close'):
+        self.period = period
+        self.std_dev = std_dev
+        self.column = column
+        self._window = deque()
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        # Run of equal values ending at the newest one
+        self._same = 0
+        self._previous = math.nan
+
+    @classmethod
+    def from_history(cls, data, **params):
+        """Create a stream positioned after the last bar of ``data``."""
+        stream = cls(**params)
+        for value in data[stream.column].to_numpy(dtype=float)[-stream.period:]:
+            stream._push(value)
+        return stream
+
+    def update(self, value):
+        """
+        Add one bar and return the new bands.
+
+        Args:
+            value (float): New price
+
+        Returns:
+            tuple: (upper_band, middle_band, lower_band)
+        """
+        self._push(value)
+        if self._count == 0:
+            return math.nan, math.nan, math.nan
+
+        middle = self._mean
+        if self._count < 2:
+            # Sample standard deviation is undefined for a single value
+            return math.nan, middle, math.nan
+
+        std = math.sqrt(self._m2 / (self._count - 1))
+        return middle + std * self.std_dev, middle, middle - std * self.std_dev
+
+    def _push(self, value):
+        value = float(value)
+        self._window.append(value)
+        if not math.isnan(value):
+            self._count += 1
+            delta = value - self._mean
+            self._mean += delta / self._count
+            self._m2 += delta * (value - self._mean)
+            self._same = self._same + 1 if value == self._previous else 1
+            self._previous = value
+
+        if len(self._window) > self.period:
+            old = self._window.popleft()
+            if not math.isnan(old):
+                self._remove(old)
+
+        if self._count and self._same >= self._count:
+            # Flat window: drop the rounding residue of earlier windows
+            self._mean = self._previous
+            self._m2 = 0.0
+        elif self._m2 < 0.0:
+            self._m2 = 0.0
+
+    def _remove(self, value):
+        self._count -= 1
+        if self._count == 0:
+            self._mean = 0.0
+            self._m2 = 0.0
+            return
+        delta = value - self._mean
+        self._mean -= delta / self._count
+        self._m2 -= delta * (value - self._mean)
+
+
+class StreamingEMA:
+    """
+    Exponential moving average, matching ``ewm(span, adjust=False)``.
+
+    Missing values keep the average but decay its weight, as pandas does
+    without ``ignore_na``, so the next value counts for more.
+    """
+
+    def __init__(self, span, column='Close'):
+        self.span = span
+        self.column = column
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = math.nan
+        self._old_weight = 1.0
+
+    @classmethod
+    def from_history(cls, data, **params):
+        """Create a stream positioned after the last bar of ``data``."""
+        stream = cls(**params)
+        series = data[stream.column]
+        if len(series):
+            stream._resume(series, series.ewm(span=stream.span, adjust=False).mean())
+        return stream
+
+    def _resume(self, series, averages):
+        """Continue from ``averages``, the EMA of ``series``."""
+        self.value = float(averages.iloc[-1])
+        valid = np.flatnonzero(series.notna().to_numpy())
+        if len(valid):
+            # Missing values since the last one decayed its weight
+            self._old_weight = (1.0 - self.alpha) ** (len(series) - 1 - valid[-1])
+
+    def update(self, value):
+        """
+        Add one bar and return the new average.
+
+        Args:
+            value (float): New price
+
+        Returns:
+            float: Exponential moving average including ``value``
+        """
+        value = float(value)
+        if math.isnan(self.value):
+            self.value = value
+        else:
+            self._old_weight *= 1.0 - self.alpha
+            if not math.isnan(value):
+                if self.value != value:
+                    self.value = ((self._old_weight * self.value + self.alpha * value)
+                                  / (self._old_weight + self.alpha))
+                self._old_weight = 1.0
+        return self.value
+
+
+class StreamingMACD:
+    """MACD built from recursive fast, slow and signal EMAs."""
+
+    def __init__(self, fast_period=12, slow_period=26, signal_period=9, column='Close'):
+        self.column = column
+        self._fast = StreamingEMA(fast_period)
+        self._slow = StreamingEMA(slow_period)
+        self._signal = StreamingEMA(signal_period)
+
+    @classmethod
+    def from_history(cls, data, **params):
+        """Create a stream positioned after the last bar of ``data``."""
+        stream = cls(**params)
+        series = data[stream.column]
+        if len(series):
+            fast = series.ewm(span=stream._fast.span, adjust=False).mean()
+            slow = series.ewm(span=stream._slow.span, adjust=False).mean()
+            macd_line = fast - slow
+            signal = macd_line.ewm(span=stream._signal.span, adjust=False).mean()
+            stream._fast._resume(series, fast)
+            stream._slow._resume(series, slow)
+            stream._signal._resume(macd_line, signal)
+        return stream
+
+    def update(self, value):
+        """
+        Add one bar and return the new MACD values.
+
+        Args:
+            value (float): New price
+
+        Returns:
+            tuple: (macd_line, signal_line, histogram)
+        """
+        macd_line = self._fast.update(value) - self._slow.update(value)
+        signal_line = self._signal.update(macd_line)
+        return macd_line, signal_line, macd_line - signal_line
+
+
+class StreamingRSI:
+    """RSI from running averages of gains and losses."""
+
+    def __init__(self, period=14, column='Close'):
+        self.period = period
+        self.column = column
+        self._gains = StreamingSMA(period)
+        self._losses = StreamingSMA(period)
+        self._previous = math.nan
+
+    @classmethod
+    def from_history(cls, data, **params):
+        """Create a stream positioned after the last bar of ``data``."""
+        stream = cls(**params)
+        # One extra bar gives the price change into the first window value
+        values = data[stream.column].to_numpy(dtype=float)[-(stream.period + 1):]
+        if len(values) > stream.period:
+            stream._previous = values[0]
+            values = values[1:]
+        for value in values:
+            stream.update(value)
+        return stream
+
+    def update(self, value):
+        """
+        Add one bar and return the new RSI.
+
+        Args:
+            value (float): New price
+
+        Returns:
+            float: RSI including ``value``
+        """
+        value = float(value)
+        delta = value - self._previous
+        self._previous = value
+
+        # Matches the batch version: no change counts as zero gain and loss
+        avg_gain = self._gains.update(delta if delta > 0 else 0.0)
+        avg_loss = self._losses.update(-delta if delta < 0 else 0.0)
+
+        if avg_loss == 0 or math.isnan(avg_loss) or math.isnan(avg_gain):
+            return 50.0
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+# Streaming counterparts of INDICATOR_FUNCTIONS, taking the same parameters
+STREAMING_INDICATORS = {
+    'rsi': StreamingRSI,
+    'ma': StreamingSMA,
+    'bb': StreamingBollingerBands,
+    'macd': StreamingMACD,
+}
+
+
+def extend_indicator(stream, result, new_data):
+    """
+    Append indicator values for new bars to a previously computed result.
+
+    Args:
+        stream: Streaming indicator positioned after the last bar of ``result``
+        result (pd.Series or tuple): Indicator values computed so far
+        new_data (pd.DataFrame): Bars appended since ``result`` was computed
+
+    Returns:
+        pd.Series or tuple: ``result`` extended to cover ``new_data``
+    """
+    outputs = [stream.update(value) for value in new_data[stream.column]]
+
+    if isinstance(result, tuple):
+        columns = np.array(outputs, dtype=float).reshape(len(outputs), len(result))
+        return tuple(
+            pd.concat([series, pd.Series(columns[:, i], index=new_data.index,
+                                         name=series.name)])
+            for i, series in enumerate(result))
+
+    return pd.concat([result, pd.Series(outputs, index=new_data.index,
+                                        dtype=float, name=result.name)])
@@ -1,43 +1,67 @@
-import datetime
-from datetime import timedelta
+from functools import lru_cache
+
+import pandas as pd
+
 from config import TIME_RANGES
 
 
-def calculate_time_range(selected_time_range):
+@lru_cache(maxsize=1024)
+def calculate_start_date(time_range, last_date):
+    """
+    Get the first calendar date of a time range ending at ``last_date``.
+
+    Results are cached per (time range, last bar date), so repeated
+    requests for the same data resolve without date arithmetic.
+
+    Args:
+        time_range (str): Selected time range
+        last_date (pd.Timestamp): Date of the last bar
+
+    Returns:
+        pd.Timestamp: Start date in the timezone of ``last_date``, or None
+            for the full history
+    """
+    span = TIME_RANGES.get(time_range, 'max')
+    if span == 'max':
+        return None
+    if span == 'ytd':
+        return last_date.normalize().replace(month=1, day=1)
+    # ``span`` calendar days including the last bar's own day
+    return last_date.normalize() - pd.Timedelta(days=int(span) - 1)
+
+
+def get_time_range_slice(index, time_range):
     """
-    Calculate the number of weekdays to go back based on selected time range.
+    Get the positions of the bars in a time range.
 
     Args:
-        selected_time_range (str): The selected time range
+        index (pd.DatetimeIndex): Sorted dates of the historical data
+        time_range (str): Selected time range
 
     Returns:
-        int: Negative number representing days to go back, or 0 for max
+        slice: Positional slice of ``index``
     """
-    today = datetime.date.today()
-    weekday_count = 0
+    if len(index) == 0:
+        return slice(0, 0)
 
-    # Handle YTD (Year to Date) case
-    if selected_time_range == 'ytd' or TIME_RANGES.get(selected_time_range) == 'ytd':
-        start_of_year = datetime.date(today.year, 1, 3)
-        for single_date in (start_of_year + timedelta(days=n)
-                            for n in range((today - start_of_year).days + 1)):
-            if single_date.weekday() < 5:  # Monday-Friday
-                weekday_count += 1
-        return -weekday_count
+    start_date = calculate_start_date(time_range, index[-1])
+    if start_date is None:
+        return slice(0, len(index))
+    return slice(int(index.searchsorted(start_date, side='left')), len(index))
 
-    # Handle normal time ranges
-    logged_days = TIME_RANGES.get(selected_time_range, 0)
-    if logged_days == 'max':
-        return 0
 
-    logged_days = int(logged_days)
-    while logged_days > 0:
-        if today.weekday() < 5:
-            weekday_count += 1
-        today = today - timedelta(days=1)
-        logged_days -= 1
+def slice_time_range(data, time_range):
+    """
+    Select the rows of a time range without copying them.
 
-    return -weekday_count
+    Args:
+        data (pd.DataFrame): Historical stock data with a sorted DatetimeIndex
+        time_range (str): Selected time range
+
+    Returns:
+        pd.DataFrame: Rows in the time range
+    """
+    return data.iloc[get_time_range_slice(data.index, time_range)]
 
 
 def get_date_range_from_data(data, time_range):
@@ -54,12 +78,7 @@ def get_date_range_from_data(data, time_range):
     if len(data.index) == 0:
         return None, None
 
-    time_offset = calculate_time_range(time_range)
-
-    if len(data.index) < abs(time_offset) or time_offset == 0:
-        start_date = data.index[0]
-    else:
-        start_date = data.index[time_offset]
-
-    end_date = data.index[-1]
-    return start_date, end_date
+    positions = get_time_range_slice(data.index, time_range)
+    if positions.start >= positions.stop:
+        return None, None
+    return data.index[positions.start], data.index[-1]
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+StockCharts Pro - WSGI entry point for production serving
+
+Exposes the Flask server behind the Dash app for a multi-worker WSGI
+server, e.g.:
+
+    gunicorn --workers 4 --bind 0.0.0.0:8050 wsgi:server
+
+All workers read histories from one shared, memory-mapped cache
+(SHARED_CACHE in config.py), so each symbol is downloaded once per host and
+its memory is not multiplied by the number of workers. Do not start
+gunicorn with --preload: the background threads are created per worker.
+
+Environment:
+    STOCKCHARTS_SHARED_CACHE_DIR  Shared cache directory
+    STOCKCHARTS_PREWARM           Set to 0 to skip pre-loading the watchlist
+"""
+
+import os
+
+from config import DATA_PROVIDER, REFRESH_CONFIG, SHARED_CACHE, WATCHLIST
+from StockCharts import StockChartsApp
+from utils.providers import create_provider
+from utils.shared_cache import SharedHistoryCache
+
+
+def create_app():
+    """Create the application with the shared history cache enabled."""
+    shared_cache = SharedHistoryCache(
+        SHARED_CACHE['directory'], ttl=SHARED_CACHE['ttl'])
+    provider = create_provider(DATA_PROVIDER['name'], **DATA_PROVIDER['options'])
+    stock_app = StockChartsApp(provider=provider, shared_cache=shared_cache)
+
+    if WATCHLIST['enabled'] and os.environ.get(
+            'STOCKCHARTS_PREWARM', '1').lower() not in ('0', 'false', 'no'):
+        # Workers warm one at a time; later ones read the shared cache
+        stock_app.prewarm(WATCHLIST['symbols'])
+
+    if REFRESH_CONFIG['enabled']:
+        # Each worker refreshes its hot symbols; a copy refreshed by another
+        # worker within the interval is read from the shared cache instead
+        stock_app.start_refresh()
+
+    return stock_app
+
+
+stock_app = create_app()
+server = stock_app.app.server
+application = server  # Default name looked up by uWSGI and mod_wsgi